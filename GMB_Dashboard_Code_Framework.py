@@ -11,14 +11,28 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sqlite3
 import hashlib
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import json
 import requests
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from itertools import islice
+import queue
+import threading
+import argparse
+import time
+import sys
 import os
 
+# The automation scripts import each other flat (run from automation/), so the
+# dashboard uses the same path and each module is only ever loaded once
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'automation')
+if AUTOMATION_DIR not in sys.path:
+    sys.path.append(AUTOMATION_DIR)
+
+from mail_delivery import SMTPDeliveryPool
+
 # Configuration
 DATABASE_PATH = "gmb_dashboard.db"
 API_KEYS = {
@@ -26,116 +40,396 @@ API_KEYS = {
     'analytics_api_key': os.getenv('ANALYTICS_API_KEY', 'your_analytics_key')
 }
 
-class DatabaseManager:
-    """Handle all database operations"""
+# Outgoing report email (use environment variables in production)
+SMTP_CONFIG = {
+    'host': os.getenv('SMTP_HOST', 'smtp.gmail.com'),
+    'port': int(os.getenv('SMTP_PORT', '587')),
+    'username': os.getenv('SMTP_USER', 'your-business@gmail.com'),
+    'password': os.getenv('SMTP_PASSWORD', 'your-app-password'),
+    'use_tls': os.getenv('SMTP_USE_TLS', '1') != '0',
+    'pool_size': int(os.getenv('SMTP_POOL_SIZE', '1'))
+}
+
+# SQLite connection tuning (applied once per pooled connection)
+DB_POOL_SIZE = int(os.getenv('GMB_DB_POOL_SIZE', '8'))
+DB_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers don't block the ingestion writer
+    'synchronous': 'NORMAL',      # safe with WAL, avoids an fsync per commit
+    'cache_size': -20000,         # ~20 MB page cache per connection
+    'mmap_size': 268435456,       # 256 MB memory-mapped reads
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000          # ms to wait on a locked database
+}
+
+# Daily metric columns stored in gmb_performance
+PERFORMANCE_METRICS = [
+    'profile_views', 'search_views', 'maps_views', 'phone_calls',
+    'direction_requests', 'website_clicks', 'photo_views'
+]
+BULK_INSERT_BATCH_SIZE = 5000
+
+# Trend charts for windows of at least this many days are drawn from weekly rollups
+ROLLUP_MIN_DAYS = 90
+
+# Dashboard query/figure cache lifetime
+CACHE_TTL_SECONDS = int(os.getenv('GMB_CACHE_TTL_SECONDS', '300'))
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived, pre-tuned SQLite connections"""
     
-    def __init__(self, db_path: str = DATABASE_PATH):
+    def __init__(self, db_path: str, max_size: int = DB_POOL_SIZE, pragmas: Optional[Dict] = None):
         self.db_path = db_path
-        self.init_database()
+        self.max_size = max_size
+        self.pragmas = DB_PRAGMAS if pragmas is None else pragmas
+        self._idle = queue.LifoQueue()  # LIFO keeps the warmest connection in use
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
     
-    def init_database(self):
-        """Initialize database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clients table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clients (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                business_name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                subscription_tier TEXT DEFAULT 'basic',
-                gmb_location_id TEXT,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
-            )
-        ''')
+    def _create_connection(self) -> sqlite3.Connection:
+        """Open a new connection and apply the tuning pragmas"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+    
+    def _acquire(self) -> sqlite3.Connection:
+        """Check out an idle connection, opening one if the pool is not full"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
         
-        # GMB Performance Data
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS gmb_performance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_id INTEGER,
-                date DATE NOT NULL,
-                profile_views INTEGER DEFAULT 0,
-                search_views INTEGER DEFAULT 0,
-                maps_views INTEGER DEFAULT 0,
-                phone_calls INTEGER DEFAULT 0,
-                direction_requests INTEGER DEFAULT 0,
-                website_clicks INTEGER DEFAULT 0,
-                photo_views INTEGER DEFAULT 0,
-                FOREIGN KEY (client_id) REFERENCES clients (id)
-            )
-        ''')
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            if len(self._all) < self.max_size:
+                conn = self._create_connection()
+                self._all.append(conn)
+                return conn
+        
+        # Pool exhausted - wait for another thread to hand one back
+        return self._idle.get()
+    
+    def _release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool"""
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success and rolls back on error"""
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+    
+    def close_all(self):
+        """Close idle connections; checked-out ones are closed when released"""
+        with self._lock:
+            self._closed = True
+            self._all = []
+        
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class RollupManager:
+    """Maintain weekly/monthly per-client aggregates of gmb_performance"""
+    
+    # period -> (table, bucket start expression, bucket end expression)
+    PERIODS = {
+        'week': (
+            'gmb_performance_weekly',
+            "date({}, 'weekday 0', '-6 days')",  # Monday
+            "date({}, 'weekday 0')"              # Sunday
+        ),
+        'month': (
+            'gmb_performance_monthly',
+            "date({}, 'start of month')",
+            "date({}, 'start of month', '+1 month', '-1 day')"
+        )
+    }
+    
+    @classmethod
+    def create_tables(cls, conn: sqlite3.Connection):
+        """Create one rollup table per period"""
+        metric_columns = ',\n'.join(f'{metric} INTEGER DEFAULT 0' for metric in PERFORMANCE_METRICS)
+        for table, _, _ in cls.PERIODS.values():
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    client_id INTEGER NOT NULL,
+                    period_start DATE NOT NULL,
+                    days_count INTEGER DEFAULT 0,
+                    {metric_columns},
+                    PRIMARY KEY (client_id, period_start)
+                )
+            ''')
+    
+    @classmethod
+    def _aggregate_sql(cls, period: str, where: str) -> str:
+        """INSERT OR REPLACE statement re-aggregating the raw rows matching `where`"""
+        table, start_expr, _ = cls.PERIODS[period]
+        metrics = ', '.join(PERFORMANCE_METRICS)
+        sums = ', '.join(f'SUM({metric})' for metric in PERFORMANCE_METRICS)
+        return f'''
+            INSERT OR REPLACE INTO {table} (client_id, period_start, days_count, {metrics})
+            SELECT client_id, {start_expr.format('date')}, COUNT(*), {sums}
+            FROM gmb_performance
+            WHERE {where}
+            GROUP BY client_id, {start_expr.format('date')}
+        '''
+    
+    @classmethod
+    def refresh(cls, conn: sqlite3.Connection, date_ranges: Dict[int, Tuple[str, str]]):
+        """
+        Re-aggregate the buckets touched by an ingest.
         
-        # Competitor Data
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS competitor_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_id INTEGER,
-                competitor_name TEXT NOT NULL,
-                competitor_gmb_id TEXT,
-                date DATE NOT NULL,
-                rating REAL,
-                review_count INTEGER,
-                photo_count INTEGER,
-                posts_last_30_days INTEGER,
-                FOREIGN KEY (client_id) REFERENCES clients (id)
+        `date_ranges` maps client_id -> (first_date, last_date) written. Whole
+        buckets are recomputed from raw rows, which keeps the rollups exact
+        when INSERT OR REPLACE overwrites an existing day.
+        """
+        for period, (_, start_expr, end_expr) in cls.PERIODS.items():
+            where = (f"client_id = ? AND date >= {start_expr.format('?')} "
+                     f"AND date <= {end_expr.format('?')}")
+            sql = cls._aggregate_sql(period, where)
+            conn.executemany(sql, [
+                (client_id, first_date, last_date)
+                for client_id, (first_date, last_date) in date_ranges.items()
+            ])
+    
+    @classmethod
+    def rebuild(cls, conn: sqlite3.Connection):
+        """Recompute every rollup table from the raw daily rows"""
+        for period, (table, _, _) in cls.PERIODS.items():
+            conn.execute(f'DELETE FROM {table}')
+            conn.execute(cls._aggregate_sql(period, '1 = 1'))
+
+def _migration_base_tables(conn: sqlite3.Connection):
+    """Create the original dashboard tables"""
+    cursor = conn.cursor()
+    
+    # Clients table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            business_name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            subscription_tier TEXT DEFAULT 'basic',
+            gmb_location_id TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1
+        )
+    ''')
+    
+    # GMB Performance Data
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gmb_performance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER,
+            date DATE NOT NULL,
+            profile_views INTEGER DEFAULT 0,
+            search_views INTEGER DEFAULT 0,
+            maps_views INTEGER DEFAULT 0,
+            phone_calls INTEGER DEFAULT 0,
+            direction_requests INTEGER DEFAULT 0,
+            website_clicks INTEGER DEFAULT 0,
+            photo_views INTEGER DEFAULT 0,
+            FOREIGN KEY (client_id) REFERENCES clients (id)
+        )
+    ''')
+    
+    # Competitor Data
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS competitor_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER,
+            competitor_name TEXT NOT NULL,
+            competitor_gmb_id TEXT,
+            date DATE NOT NULL,
+            rating REAL,
+            review_count INTEGER,
+            photo_count INTEGER,
+            posts_last_30_days INTEGER,
+            FOREIGN KEY (client_id) REFERENCES clients (id)
+        )
+    ''')
+    
+    # Client Goals and Settings
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS client_settings (
+            client_id INTEGER PRIMARY KEY,
+            monthly_revenue_target REAL,
+            lead_value REAL DEFAULT 100,
+            conversion_rate REAL DEFAULT 0.1,
+            notification_email TEXT,
+            alert_thresholds TEXT, -- JSON string
+            FOREIGN KEY (client_id) REFERENCES clients (id)
+        )
+    ''')
+
+def _migration_client_date_indexes(conn: sqlite3.Connection):
+    """
+    Add the (client_id, date) indexes, de-duplicating existing rows first.
+    
+    Older databases were created without a uniqueness constraint, so
+    INSERT OR REPLACE appended duplicate days. Keep the newest row for
+    each client/day, then enforce uniqueness so later writes replace.
+    """
+    existing = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    )}
+    
+    if 'idx_gmb_performance_client_date' not in existing:
+        conn.execute('''
+            DELETE FROM gmb_performance
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM gmb_performance GROUP BY client_id, date
             )
         ''')
-        
-        # Client Goals and Settings
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS client_settings (
-                client_id INTEGER PRIMARY KEY,
-                monthly_revenue_target REAL,
-                lead_value REAL DEFAULT 100,
-                conversion_rate REAL DEFAULT 0.1,
-                notification_email TEXT,
-                alert_thresholds TEXT, -- JSON string
-                FOREIGN KEY (client_id) REFERENCES clients (id)
-            )
+        conn.execute('''
+            CREATE UNIQUE INDEX idx_gmb_performance_client_date
+            ON gmb_performance (client_id, date)
         ''')
-        
-        conn.commit()
-        conn.close()
+    
+    if 'idx_competitor_data_client_date' not in existing:
+        conn.execute('''
+            CREATE INDEX idx_competitor_data_client_date
+            ON competitor_data (client_id, date)
+        ''')
+
+def _migration_rollup_tables(conn: sqlite3.Connection):
+    """Create the weekly/monthly rollup tables and backfill them"""
+    RollupManager.create_tables(conn)
+    RollupManager.rebuild(conn)
+
+# Ordered schema migrations: (version, description, function)
+SCHEMA_MIGRATIONS = [
+    (1, 'base tables', _migration_base_tables),
+    (2, 'unique client/date indexes', _migration_client_date_indexes),
+    (3, 'weekly/monthly rollup tables', _migration_rollup_tables)
+]
+
+class SchemaMigrator:
+    """Bring a database up to the latest schema version"""
+    
+    def __init__(self, migrations: List[Tuple] = None):
+        self.migrations = sorted(migrations or SCHEMA_MIGRATIONS, key=lambda m: m[0])
+        self.latest_version = self.migrations[-1][0] if self.migrations else 0
+    
+    @staticmethod
+    def current_version(conn: sqlite3.Connection) -> int:
+        """Return the highest applied version, 0 for an unmanaged database"""
+        try:
+            row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        except sqlite3.OperationalError:
+            return 0
+        return row[0] or 0
+    
+    def migrate(self, conn: sqlite3.Connection) -> List[int]:
+        """Apply pending migrations atomically; returns the versions applied"""
+        # Fast path: an up-to-date database costs a single indexed read
+        if self.current_version(conn) >= self.latest_version:
+            return []
+        
+        conn.commit()  # make sure no implicit transaction is open
+        conn.execute("BEGIN IMMEDIATE")  # serialise concurrent migrators
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Re-read under the write lock in case another process won the race
+            current = self.current_version(conn)
+            applied = []
+            
+            for version, description, migration in self.migrations:
+                if version <= current:
+                    continue
+                migration(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+                applied.append(version)
+            
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        if applied:
+            print(f"Database migrated to schema version {applied[-1]}")
+        return applied
+
+class DatabaseManager:
+    """Handle all database operations"""
+    
+    _PERFORMANCE_INSERT = '''
+        INSERT OR REPLACE INTO gmb_performance 
+        (client_id, date, profile_views, search_views, maps_views, 
+         phone_calls, direction_requests, website_clicks, photo_views)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    def __init__(self, db_path: str = DATABASE_PATH, pool_size: int = DB_POOL_SIZE):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, max_size=pool_size)
+        self.init_database()
+    
+    def connection(self):
+        """Context manager yielding a pooled connection for ad-hoc queries"""
+        return self.pool.connection()
+    
+    def close(self):
+        """Release all pooled connections"""
+        self.pool.close_all()
+    
+    def init_database(self):
+        """Bring the database schema up to date (no DDL when already current)"""
+        with self.pool.connection() as conn:
+            SchemaMigrator().migrate(conn)
     
     def add_client(self, business_name: str, email: str, password: str, 
                    subscription_tier: str = 'basic') -> int:
         """Add new client to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         password_hash = hashlib.sha256(password.encode()).hexdigest()
         
-        cursor.execute('''
-            INSERT INTO clients (business_name, email, password_hash, subscription_tier)
-            VALUES (?, ?, ?, ?)
-        ''', (business_name, email, password_hash, subscription_tier))
-        
-        client_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.pool.connection() as conn:
+            cursor = conn.execute('''
+                INSERT INTO clients (business_name, email, password_hash, subscription_tier)
+                VALUES (?, ?, ?, ?)
+            ''', (business_name, email, password_hash, subscription_tier))
+            client_id = cursor.lastrowid
         
         return client_id
     
     def authenticate_client(self, email: str, password: str) -> Optional[Dict]:
         """Authenticate client login"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         password_hash = hashlib.sha256(password.encode()).hexdigest()
         
-        cursor.execute('''
-            SELECT id, business_name, subscription_tier, is_active
-            FROM clients 
-            WHERE email = ? AND password_hash = ? AND is_active = 1
-        ''', (email, password_hash))
-        
-        result = cursor.fetchone()
-        conn.close()
+        with self.pool.connection() as conn:
+            result = conn.execute('''
+                SELECT id, business_name, subscription_tier, is_active
+                FROM clients 
+                WHERE email = ? AND password_hash = ? AND is_active = 1
+            ''', (email, password_hash)).fetchone()
         
         if result:
             return {
@@ -148,44 +442,120 @@ class DatabaseManager:
     
     def add_performance_data(self, client_id: int, date: str, metrics: Dict):
         """Add GMB performance data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO gmb_performance 
-            (client_id, date, profile_views, search_views, maps_views, 
-             phone_calls, direction_requests, website_clicks, photo_views)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            client_id, date, 
-            metrics.get('profile_views', 0),
-            metrics.get('search_views', 0),
-            metrics.get('maps_views', 0),
-            metrics.get('phone_calls', 0),
-            metrics.get('direction_requests', 0),
-            metrics.get('website_clicks', 0),
-            metrics.get('photo_views', 0)
-        ))
-        
-        conn.commit()
-        conn.close()
+        row = self._performance_row(client_id, date, metrics)
+        
+        with self.pool.connection() as conn:
+            conn.execute(self._PERFORMANCE_INSERT, row)
+            RollupManager.refresh(conn, {client_id: (row[1], row[1])})
+    
+    def add_performance_data_bulk(self, rows: Union[pd.DataFrame, Iterable],
+                                  batch_size: int = BULK_INSERT_BATCH_SIZE) -> int:
+        """
+        Insert many days of performance data for many clients in one transaction.
+        
+        `rows` may be a DataFrame with `client_id`, `date` and metric columns,
+        or any iterable (including generators) of `(client_id, date, metrics)`
+        tuples or flat dicts. Rows are streamed to `executemany` in batches,
+        so the input never has to be materialised in memory.
+        """
+        row_iter = self._iter_performance_rows(rows)
+        inserted = 0
+        date_ranges = {}  # client_id -> (first_date, last_date) for rollup refresh
+        
+        with self.pool.connection() as conn:
+            while True:
+                batch = list(islice(row_iter, batch_size))
+                if not batch:
+                    break
+                conn.executemany(self._PERFORMANCE_INSERT, batch)
+                inserted += len(batch)
+                
+                for row in batch:
+                    client_id, date = row[0], row[1]
+                    first_date, last_date = date_ranges.get(client_id, (date, date))
+                    date_ranges[client_id] = (min(first_date, date), max(last_date, date))
+            
+            RollupManager.refresh(conn, date_ranges)
+        
+        return inserted
+    
+    @staticmethod
+    def _performance_row(client_id: int, date, metrics: Dict) -> Tuple:
+        """Build the gmb_performance parameter tuple for one client/day"""
+        if hasattr(date, 'strftime'):
+            date = date.strftime('%Y-%m-%d')
+        return (client_id, date) + tuple(metrics.get(metric, 0) for metric in PERFORMANCE_METRICS)
+    
+    def _iter_performance_rows(self, rows: Union[pd.DataFrame, Iterable]) -> Iterator[Tuple]:
+        """Normalise DataFrames, (client_id, date, metrics) tuples and dicts to row tuples"""
+        if isinstance(rows, pd.DataFrame):
+            frame = rows.reindex(columns=['client_id', 'date'] + PERFORMANCE_METRICS, fill_value=0)
+            if pd.api.types.is_datetime64_any_dtype(frame['date']):
+                frame['date'] = frame['date'].dt.strftime('%Y-%m-%d')
+            frame[PERFORMANCE_METRICS] = frame[PERFORMANCE_METRICS].fillna(0).astype(int)
+            yield from frame.itertuples(index=False, name=None)
+            return
+        
+        for row in rows:
+            if isinstance(row, dict):
+                metrics = row.get('metrics', row)
+                yield self._performance_row(row['client_id'], row['date'], metrics)
+            else:
+                client_id, date, metrics = row
+                yield self._performance_row(client_id, date, metrics)
     
     def get_performance_data(self, client_id: int, days: int = 30) -> pd.DataFrame:
         """Get performance data for client"""
-        conn = sqlite3.connect(self.db_path)
-        
+        # Range seek on idx_gmb_performance_client_date
         query = '''
             SELECT date, profile_views, search_views, maps_views,
                    phone_calls, direction_requests, website_clicks, photo_views
             FROM gmb_performance 
-            WHERE client_id = ? AND date >= date('now', '-{} days')
+            WHERE client_id = ? AND date >= date('now', ?)
             ORDER BY date DESC
-        '''.format(days)
+        '''
         
-        df = pd.read_sql_query(query, conn, params=(client_id,))
-        conn.close()
+        with self.pool.connection() as conn:
+            df = pd.read_sql_query(query, conn, params=(client_id, f'-{int(days)} days'))
         
         return df
+    
+    def get_performance_rollup(self, client_id: int, period: str = 'week',
+                               days: int = 90) -> pd.DataFrame:
+        """Get weekly/monthly aggregates covering the last `days` days"""
+        table, start_expr, _ = RollupManager.PERIODS[period]
+        query = f'''
+            SELECT period_start AS date, days_count, {', '.join(PERFORMANCE_METRICS)}
+            FROM {table}
+            WHERE client_id = ? AND period_start >= {start_expr.format("date('now', ?)")}
+            ORDER BY period_start DESC
+        '''
+        
+        with self.pool.connection() as conn:
+            df = pd.read_sql_query(query, conn, params=(client_id, f'-{int(days)} days'))
+        
+        return df
+    
+    def get_monthly_rollup(self, client_id: int, month: str) -> Optional[Dict]:
+        """Get one client's aggregates for a calendar month ('YYYY-MM')"""
+        query = f'''
+            SELECT period_start, days_count, {', '.join(PERFORMANCE_METRICS)}
+            FROM gmb_performance_monthly
+            WHERE client_id = ? AND period_start = ?
+        '''
+        
+        with self.pool.connection() as conn:
+            cursor = conn.execute(query, (client_id, f'{month}-01'))
+            row = cursor.fetchone()
+        
+        if row is None:
+            return None
+        return dict(zip([column[0] for column in cursor.description], row))
+    
+    def rebuild_rollups(self):
+        """Recompute all rollup tables from raw daily data"""
+        with self.pool.connection() as conn:
+            RollupManager.rebuild(conn)
 
 class GMBDataCollector:
     """Collect data from Google My Business API"""
@@ -262,12 +632,182 @@ class ROICalculator:
             'payback_period_days': round((monthly_service_cost / (revenue_increase / 30)), 1) if revenue_increase > 0 else 0
         }
 
+# Process-wide resources: built once per server process and shared by all
+# sessions (DatabaseManager's pool is thread-safe, the collector is stateless)
+class ResourceMetrics:
+    """Count shared resource constructions so per-session rebuilds are visible"""
+    
+    def __init__(self):
+        self._constructions = {'DatabaseManager': 0, 'GMBDataCollector': 0}
+        self._lock = threading.Lock()
+    
+    def record(self, resource: str) -> int:
+        """Count one construction; returns the total for that resource"""
+        with self._lock:
+            self._constructions[resource] += 1
+            return self._constructions[resource]
+    
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._constructions)
+
+@st.cache_resource(show_spinner=False)
+def _resource_metrics() -> ResourceMetrics:
+    """Construction counters, cached next to the resources they count so reruns keep them"""
+    return ResourceMetrics()
+
+def _record_construction(resource: str):
+    _resource_metrics().record(resource)
+
+def get_resource_metrics() -> Dict[str, int]:
+    """How many times each shared resource has been constructed"""
+    return _resource_metrics().snapshot()
+
+@st.cache_resource(show_spinner=False)
+def get_database_manager(db_path: str = DATABASE_PATH) -> DatabaseManager:
+    """Shared DatabaseManager for this server process"""
+    _record_construction('DatabaseManager')
+    return DatabaseManager(db_path)
+
+@st.cache_resource(show_spinner=False)
+def get_gmb_collector(api_key: str) -> GMBDataCollector:
+    """Shared GMBDataCollector for this server process"""
+    _record_construction('GMBDataCollector')
+    return GMBDataCollector(api_key)
+
+class DataVersions:
+    """Per-client data version counters used to key cached queries and figures"""
+    
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+    
+    def get(self, client_id: int) -> int:
+        """Current data version for a client"""
+        return self._versions.get(client_id, 0)
+    
+    def bump(self, client_id: int) -> int:
+        """Invalidate a client's cached data after new rows are written"""
+        with self._lock:
+            self._versions[client_id] = self._versions.get(client_id, 0) + 1
+            return self._versions[client_id]
+
+@st.cache_resource(show_spinner=False)
+def get_data_versions() -> DataVersions:
+    """DataVersions shared by every session; cached like the other resources so reruns keep the counts"""
+    return DataVersions()
+
+# Cached loaders/builders. Arguments prefixed with "_" are excluded from the
+# cache key, so entries are keyed by (client_id, days, data_version).
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_performance_data(db_path: str, client_id: int, days: int, data_version: int,
+                          _db: 'DatabaseManager') -> pd.DataFrame:
+    """Cached daily performance rows for one client and time window"""
+    return _db.get_performance_data(client_id, days)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_trend_data(db_path: str, client_id: int, days: int, data_version: int,
+                    _db: 'DatabaseManager') -> pd.DataFrame:
+    """Cached chart series: weekly rollups for long windows, daily rows otherwise"""
+    if days >= ROLLUP_MIN_DAYS:
+        return _db.get_performance_rollup(client_id, 'week', days)
+    return load_performance_data(db_path, client_id, days, data_version, _db=_db)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_performance_figure(client_id: int, days: int, data_version: int,
+                             _df: pd.DataFrame) -> go.Figure:
+    """Build the views-over-time line chart"""
+    fig = px.line(
+        _df, 
+        x='date', 
+        y=['profile_views', 'search_views', 'maps_views'],
+        title="Views Over Time",
+        labels={'value': 'Views', 'date': 'Date'}
+    )
+    
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Views",
+        legend_title="Metric Type"
+    )
+    
+    return fig
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_actions_figure(client_id: int, days: int, data_version: int,
+                         _df: pd.DataFrame) -> go.Figure:
+    """Build the stacked customer actions bar chart"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=_df['date'],
+        y=_df['phone_calls'],
+        name='Phone Calls',
+        marker_color='#FF6B6B'
+    ))
+    
+    fig.add_trace(go.Bar(
+        x=_df['date'],
+        y=_df['direction_requests'],
+        name='Directions',
+        marker_color='#4ECDC4'
+    ))
+    
+    fig.add_trace(go.Bar(
+        x=_df['date'],
+        y=_df['website_clicks'],
+        name='Website Clicks',
+        marker_color='#45B7D1'
+    ))
+    
+    fig.update_layout(
+        title="Customer Actions Over Time",
+        xaxis_title="Date",
+        yaxis_title="Actions",
+        barmode='stack'
+    )
+    
+    return fig
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_competitor_figures(client_id: int, data_version: int) -> Tuple[go.Figure, go.Figure]:
+    """Build the rating and review count comparison charts"""
+    # Sample competitor data
+    competitors = [
+        {"name": "Competitor A", "rating": 4.2, "reviews": 156, "photos": 23},
+        {"name": "Competitor B", "rating": 4.0, "reviews": 89, "photos": 15},
+        {"name": "Your Business", "rating": 4.5, "reviews": 203, "photos": 35}
+    ]
+    
+    df_comp = pd.DataFrame(competitors)
+    
+    rating_fig = px.bar(
+        df_comp, 
+        x='name', 
+        y='rating',
+        title="Average Rating Comparison",
+        color='rating',
+        color_continuous_scale='RdYlGn'
+    )
+    
+    reviews_fig = px.bar(
+        df_comp, 
+        x='name', 
+        y='reviews',
+        title="Review Count Comparison",
+        color='reviews',
+        color_continuous_scale='Blues'
+    )
+    
+    return rating_fig, reviews_fig
+
 class DashboardUI:
     """Main dashboard interface using Streamlit"""
     
     def __init__(self):
-        self.db = DatabaseManager()
-        self.gmb_collector = GMBDataCollector(API_KEYS['gmb_api_key'])
+        self.db = get_database_manager(DATABASE_PATH)
+        self.gmb_collector = get_gmb_collector(API_KEYS['gmb_api_key'])
         
         # Configure Streamlit page
         st.set_page_config(
@@ -317,24 +857,26 @@ class DashboardUI:
                 self.update_client_data(client['id'])
                 st.success("Data updated!")
         
-        # Get performance data
-        df = self.db.get_performance_data(client['id'], days)
+        # Get performance data (cached until TTL expiry or the next write)
+        cache_key = (client['id'], days, get_data_versions().get(client['id']))
+        df = load_performance_data(self.db.db_path, *cache_key, _db=self.db)
         
         if df.empty:
             st.warning("No data available. Please contact support to set up data collection.")
             return
         
-        # Key Metrics Row
+        # Key Metrics Row (day over day, so always from daily rows)
         self.display_key_metrics(df)
         
         # Charts Row
+        trend_df = load_trend_data(self.db.db_path, *cache_key, _db=self.db)
         col1, col2 = st.columns(2)
         
         with col1:
-            self.display_performance_chart(df)
+            self.display_performance_chart(trend_df, cache_key)
         
         with col2:
-            self.display_actions_chart(df)
+            self.display_actions_chart(trend_df, cache_key)
         
         # ROI Analysis
         if client['subscription_tier'] in ['professional', 'enterprise']:
@@ -386,62 +928,15 @@ class DashboardUI:
                 delta=f"{delta:+,}"
             )
     
-    def display_performance_chart(self, df: pd.DataFrame):
+    def display_performance_chart(self, df: pd.DataFrame, cache_key: Tuple):
         """Display performance trend chart"""
         st.subheader("📈 Performance Trends")
-        
-        fig = px.line(
-            df, 
-            x='date', 
-            y=['profile_views', 'search_views', 'maps_views'],
-            title="Views Over Time",
-            labels={'value': 'Views', 'date': 'Date'}
-        )
-        
-        fig.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Views",
-            legend_title="Metric Type"
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_performance_figure(*cache_key, _df=df), use_container_width=True)
     
-    def display_actions_chart(self, df: pd.DataFrame):
+    def display_actions_chart(self, df: pd.DataFrame, cache_key: Tuple):
         """Display customer actions chart"""
         st.subheader("🎯 Customer Actions")
-        
-        # Create stacked bar chart
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=df['date'],
-            y=df['phone_calls'],
-            name='Phone Calls',
-            marker_color='#FF6B6B'
-        ))
-        
-        fig.add_trace(go.Bar(
-            x=df['date'],
-            y=df['direction_requests'],
-            name='Directions',
-            marker_color='#4ECDC4'
-        ))
-        
-        fig.add_trace(go.Bar(
-            x=df['date'],
-            y=df['website_clicks'],
-            name='Website Clicks',
-            marker_color='#45B7D1'
-        ))
-        
-        fig.update_layout(
-            title="Customer Actions Over Time",
-            xaxis_title="Date",
-            yaxis_title="Actions",
-            barmode='stack'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_actions_figure(*cache_key, _df=df), use_container_width=True)
     
     def display_roi_analysis(self, df: pd.DataFrame, client: Dict):
         """Display ROI analysis for professional/enterprise clients"""
@@ -492,38 +987,15 @@ class DashboardUI:
         """Display competitor analysis for enterprise clients"""
         st.subheader("🏆 Competitive Intelligence")
         
-        # Sample competitor data
-        competitors = [
-            {"name": "Competitor A", "rating": 4.2, "reviews": 156, "photos": 23},
-            {"name": "Competitor B", "rating": 4.0, "reviews": 89, "photos": 15},
-            {"name": "Your Business", "rating": 4.5, "reviews": 203, "photos": 35}
-        ]
-        
-        df_comp = pd.DataFrame(competitors)
+        rating_fig, reviews_fig = build_competitor_figures(client_id, get_data_versions().get(client_id))
         
         col1, col2 = st.columns(2)
         
         with col1:
-            fig = px.bar(
-                df_comp, 
-                x='name', 
-                y='rating',
-                title="Average Rating Comparison",
-                color='rating',
-                color_continuous_scale='RdYlGn'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(rating_fig, use_container_width=True)
         
         with col2:
-            fig = px.bar(
-                df_comp, 
-                x='name', 
-                y='reviews',
-                title="Review Count Comparison",
-                color='reviews',
-                color_continuous_scale='Blues'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(reviews_fig, use_container_width=True)
     
     def update_client_data(self, client_id: int):
         """Update client data from GMB API"""
@@ -536,6 +1008,7 @@ class DashboardUI:
         )
         
         self.db.add_performance_data(client_id, today, sample_metrics)
+        get_data_versions().bump(client_id)
     
     def run(self):
         """Main application runner"""
@@ -557,38 +1030,54 @@ class DashboardUI:
 class ReportGenerator:
     """Generate automated reports for clients"""
     
-    def __init__(self, db: DatabaseManager):
+    def __init__(self, db: DatabaseManager, mailer: Optional[SMTPDeliveryPool] = None):
         self.db = db
+        self._mailer = mailer
     
-    def generate_monthly_report(self, client_id: int) -> str:
-        """Generate monthly performance report"""
-        df = self.db.get_performance_data(client_id, 30)
-        
-        if df.empty:
-            return "No data available for report generation."
-        
-        # Calculate summary metrics
-        total_views = df['profile_views'].sum()
-        total_calls = df['phone_calls'].sum()
-        total_directions = df['direction_requests'].sum()
-        total_clicks = df['website_clicks'].sum()
+    @property
+    def mailer(self) -> SMTPDeliveryPool:
+        """SMTP session pool reused for every report in a run"""
+        if self._mailer is None:
+            self._mailer = SMTPDeliveryPool(**SMTP_CONFIG)
+        return self._mailer
+    
+    @staticmethod
+    def _default_month() -> str:
+        """Previous calendar month as 'YYYY-MM'"""
+        return (datetime.now().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+    
+    @staticmethod
+    def summarize(totals):
+        """
+        Add derived report metrics to monthly totals.
         
-        # Generate report
-        report = f"""
+        Works column-wise on a DataFrame (one row per client) as well as on a
+        single client's dict of totals, so batch and single reports share it.
+        """
+        totals['total_actions'] = totals['phone_calls'] + totals['direction_requests'] + totals['website_clicks']
+        totals['avg_daily_views'] = totals['profile_views'] / totals['days_count']
+        totals['estimated_leads'] = totals['total_actions'] * 0.1
+        totals['estimated_revenue'] = totals['estimated_leads'] * 100
+        return totals
+    
+    @staticmethod
+    def render_report(summary, month: str) -> str:
+        """Render the plain-text report for one client's summary metrics"""
+        return f"""
         MONTHLY GMB PERFORMANCE REPORT
         ==============================
         
-        SUMMARY METRICS (Last 30 Days):
-        • Profile Views: {total_views:,}
-        • Phone Calls: {total_calls:,}
-        • Direction Requests: {total_directions:,}
-        • Website Clicks: {total_clicks:,}
+        SUMMARY METRICS ({datetime.strptime(month, '%Y-%m').strftime('%B %Y')}):
+        • Profile Views: {summary['profile_views']:,}
+        • Phone Calls: {summary['phone_calls']:,}
+        • Direction Requests: {summary['direction_requests']:,}
+        • Website Clicks: {summary['website_clicks']:,}
         
         KEY INSIGHTS:
-        • Your GMB listing generated {total_calls + total_directions + total_clicks:,} customer actions
-        • Average daily profile views: {total_views/30:.1f}
-        • Estimated monthly leads: {(total_calls + total_directions + total_clicks) * 0.1:.1f}
-        • Estimated revenue impact: €{(total_calls + total_directions + total_clicks) * 0.1 * 100:,.2f}
+        • Your GMB listing generated {summary['total_actions']:,} customer actions
+        • Average daily profile views: {summary['avg_daily_views']:.1f}
+        • Estimated monthly leads: {summary['estimated_leads']:.1f}
+        • Estimated revenue impact: €{summary['estimated_revenue']:,.2f}
         
         RECOMMENDATIONS:
         • Continue posting regular updates to maintain visibility
@@ -597,35 +1086,72 @@ class ReportGenerator:
         
         Questions? Contact your GMB specialist for a strategy review.
         """
+    
+    def generate_monthly_report(self, client_id: int, month: Optional[str] = None) -> str:
+        """Generate monthly performance report (defaults to the previous calendar month)"""
+        month = month or self._default_month()
+        rollup = self.db.get_monthly_rollup(client_id, month)
+        
+        if not rollup or not rollup['days_count']:
+            return "No data available for report generation."
+        
+        return self.render_report(self.summarize(rollup), month)
+    
+    def generate_batch_reports(self, month: Optional[str] = None) -> pd.DataFrame:
+        """
+        Generate monthly reports for every active client in one pass.
+        
+        A single query joins active clients to their monthly rollup row, the
+        summary metrics are derived column-wise for all clients at once, and
+        the result has one row per client with the rendered `report` text.
+        """
+        month = month or self._default_month()
+        query = f'''
+            SELECT c.id AS client_id, c.business_name, c.email, r.days_count,
+                   {', '.join('r.' + metric for metric in PERFORMANCE_METRICS)}
+            FROM clients c
+            JOIN gmb_performance_monthly r ON r.client_id = c.id
+            WHERE c.is_active = 1 AND r.period_start = ? AND r.days_count > 0
+            ORDER BY c.id
+        '''
+        
+        with self.db.connection() as conn:
+            reports = pd.read_sql_query(query, conn, params=(f'{month}-01',))
+        
+        reports = self.summarize(reports)
+        reports['report'] = [
+            self.render_report(summary, month)
+            for summary in reports.to_dict('records')
+        ]
+        
+        return reports
+    
+    def _build_report_message(self, client_email: str, report_content: str) -> MIMEMultipart:
+        """Build the report email for one client"""
+        msg = MIMEMultipart()
+        msg['From'] = SMTP_CONFIG['username']
+        msg['To'] = client_email
+        msg['Subject'] = "Your Monthly GMB Performance Report"
+        
+        msg.attach(MIMEText(report_content, 'plain'))
         
-        return report
+        return msg
     
     def send_email_report(self, client_email: str, report_content: str):
         """Send email report to client"""
-        # Email configuration (use environment variables in production)
-        smtp_server = "smtp.gmail.com"
-        smtp_port = 587
-        sender_email = "your-business@gmail.com"
-        sender_password = "your-app-password"
-        
         try:
-            msg = MIMEMultipart()
-            msg['From'] = sender_email
-            msg['To'] = client_email
-            msg['Subject'] = "Your Monthly GMB Performance Report"
-            
-            msg.attach(MIMEText(report_content, 'plain'))
-            
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-            server.quit()
-            
-            return True
+            return self.mailer.send(self._build_report_message(client_email, report_content))
         except Exception as e:
             print(f"Error sending email: {e}")
             return False
+    
+    def send_email_reports(self, reports: pd.DataFrame) -> List[bool]:
+        """Send a batch of reports (e.g. from generate_batch_reports) over one SMTP session"""
+        messages = [
+            self._build_report_message(email, report)
+            for email, report in zip(reports['email'], reports['report'])
+        ]
+        return self.mailer.send_many(messages)
 
 def setup_sample_data():
     """Set up sample data for testing"""
@@ -642,23 +1168,66 @@ def setup_sample_data():
     # Add sample performance data for last 30 days
     gmb_collector = GMBDataCollector(API_KEYS['gmb_api_key'])
     
-    for i in range(30):
-        date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-        metrics = gmb_collector.fetch_insights_data(f"location_{client_id}", date, date)
-        
-        # Add some variation to make data more realistic
-        for key in metrics:
-            metrics[key] = max(0, metrics[key] + (i % 7 - 3) * 5)
-        
-        db.add_performance_data(client_id, date, metrics)
+    def sample_rows():
+        for i in range(30):
+            date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
+            metrics = gmb_collector.fetch_insights_data(f"location_{client_id}", date, date)
+            
+            # Add some variation to make data more realistic
+            for key in metrics:
+                metrics[key] = max(0, metrics[key] + (i % 7 - 3) * 5)
+            
+            yield client_id, date, metrics
+    
+    db.add_performance_data_bulk(sample_rows())
     
     print(f"Sample data created for client ID: {client_id}")
     print("Login credentials: owner@samplerestaurant.de / password123")
 
+def run_batch_reports(argv: Optional[List[str]] = None):
+    """CLI: generate (and optionally save) monthly reports for all active clients"""
+    parser = argparse.ArgumentParser(description="Generate monthly GMB reports for all active clients")
+    parser.add_argument('--month', help="Report month as YYYY-MM (default: previous month)")
+    parser.add_argument('--db', default=DATABASE_PATH, help="Path to the dashboard database")
+    parser.add_argument('--output-dir', help="Write one text file per client into this directory")
+    parser.add_argument('--send', action='store_true', help="Email each report to its client")
+    args = parser.parse_args(argv)
+    
+    db = DatabaseManager(args.db)
+    generator = ReportGenerator(db)
+    
+    start = time.perf_counter()
+    reports = generator.generate_batch_reports(args.month)
+    
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for client_id, report in zip(reports['client_id'], reports['report']):
+            with open(os.path.join(args.output_dir, f"client_{client_id}.txt"), 'w', encoding='utf-8') as f:
+                f.write(report)
+    
+    elapsed = time.perf_counter() - start
+    rate = len(reports) / elapsed if elapsed > 0 else 0
+    print(f"Generated {len(reports)} reports in {elapsed:.2f}s ({rate:,.1f} reports/sec)")
+    
+    if args.send and len(reports):
+        start = time.perf_counter()
+        with generator.mailer:
+            sent = sum(generator.send_email_reports(reports))
+            stats = generator.mailer.get_stats()
+        elapsed = time.perf_counter() - start
+        print(f"Sent {sent}/{len(reports)} reports in {elapsed:.2f}s "
+              f"over {stats['connections']} SMTP connection(s)")
+    
+    db.close()
+
 if __name__ == "__main__":
     # Uncomment to set up sample data
     # setup_sample_data()
     
-    # Run the dashboard
-    dashboard = DashboardUI()
-    dashboard.run()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == 'reports':
+        # python GMB_Dashboard_Code_Framework.py reports [--month YYYY-MM] [--output-dir DIR] [--send]
+        run_batch_reports(sys.argv[2:])
+    else:
+        # Run the dashboard
+        dashboard = DashboardUI()
+        dashboard.run()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Assessment Batch Queue
+Durable SQLite queue of submissions drained by a worker pool with retry, backoff and throughput/latency reporting
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+QUEUE_PATH = os.getenv('ASSESSMENT_QUEUE_PATH', 'assessment_queue.db')
+
+class AssessmentQueue:
+    """Submissions waiting to be rendered and sent; safe to enqueue and claim from several processes"""
+    
+    def __init__(self, path: str = QUEUE_PATH, timeout: float = 30):
+        self.path = path
+        self._lock = threading.Lock()
+        
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS assessment_jobs (
+                id INTEGER PRIMARY KEY,
+                recipient TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                not_before REAL NOT NULL,
+                enqueued_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                last_error TEXT
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON assessment_jobs (status, not_before)")
+    
+    def _write(self, sql: str, rows: List[tuple]) -> int:
+        """Run one write transaction, taking the lock up front so a busy database is waited on"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self.conn.total_changes
+                self.conn.executemany(sql, rows)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.total_changes - before
+    
+    def enqueue_many(self, submissions: Iterable[Tuple[str, Dict]]) -> int:
+        """Queue (recipient_email, assessment_data) pairs in one transaction; returns how many"""
+        now = time.time()
+        return self._write(
+            "INSERT INTO assessment_jobs (recipient, payload, not_before, enqueued_at) VALUES (?, ?, ?, ?)",
+            [(recipient, json.dumps(data, ensure_ascii=False), now, now) for recipient, data in submissions]
+        )
+    
+    def enqueue(self, recipient: str, data: Dict):
+        self.enqueue_many([(recipient, data)])
+    
+    def claim(self, limit: int = 1) -> List[Dict]:
+        """Mark up to `limit` ready jobs as running and return them (oldest first)"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(
+                    "SELECT id, recipient, payload, attempts, enqueued_at FROM assessment_jobs "
+                    "WHERE status = 'queued' AND not_before <= ? ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE assessment_jobs SET status = 'running', started_at = ? WHERE id = ?",
+                    [(now, row[0]) for row in rows]
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        
+        return [
+            {'id': job_id, 'recipient': recipient, 'data': json.loads(payload),
+             'attempts': attempts, 'enqueued_at': enqueued_at}
+            for job_id, recipient, payload, attempts, enqueued_at in rows
+        ]
+    
+    def complete(self, job_id: int):
+        self._write("UPDATE assessment_jobs SET status = 'sent', attempts = attempts + 1, finished_at = ?, "
+                    "last_error = NULL WHERE id = ?", [(time.time(), job_id)])
+    
+    def retry(self, job_id: int, error: str, delay: float):
+        """Put a failed job back, not to be claimed again for `delay` seconds"""
+        self._write("UPDATE assessment_jobs SET status = 'queued', attempts = attempts + 1, not_before = ?, "
+                    "last_error = ? WHERE id = ?", [(time.time() + delay, error, job_id)])
+    
+    def fail(self, job_id: int, error: str):
+        self._write("UPDATE assessment_jobs SET status = 'failed', attempts = attempts + 1, finished_at = ?, "
+                    "last_error = ? WHERE id = ?", [(time.time(), error, job_id)])
+    
+    def requeue_stale(self, older_than: float = 600, max_attempts: int = 4) -> int:
+        """Return jobs left running by a crashed worker to the queue
+        
+        The crash counts as an attempt, so a job that keeps crashing its
+        worker is failed after `max_attempts` instead of looping forever.
+        """
+        now = time.time()
+        return self._write(
+            "UPDATE assessment_jobs SET attempts = attempts + 1, "
+            "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'queued' END, "
+            "finished_at = CASE WHEN attempts + 1 >= ? THEN ? ELSE finished_at END, "
+            "last_error = 'worker stopped while sending' WHERE status = 'running' AND started_at < ?",
+            [(max_attempts, max_attempts, now, now - older_than)]
+        )
+    
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until the next queued job may be claimed (0 if one is ready, None if nothing is queued)"""
+        with self._lock:
+            row = self.conn.execute("SELECT MIN(not_before) FROM assessment_jobs WHERE status = 'queued'").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+    
+    def counts(self) -> Dict[str, int]:
+        """Jobs per status"""
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM assessment_jobs GROUP BY status").fetchall()
+        return dict(rows)
+    
+    def close(self):
+        self.conn.close()
+
+class QueueWorker:
+    """Drains an AssessmentQueue through an AssessmentEmailer with a bounded pool of worker threads
+    
+    Each job is rendered, sent over the emailer's pooled SMTP sessions and
+    logged as a lead. A failed send goes back on the queue with exponential
+    backoff until `max_attempts`, then is marked failed.
+    """
+    
+    def __init__(self, emailer, queue: AssessmentQueue, workers: Optional[int] = None,
+                 max_attempts: int = 4, backoff_base: float = 5.0):
+        self.emailer = emailer
+        self.queue = queue
+        self.workers = workers or emailer.pool_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.stats = {'sent': 0, 'failed': 0, 'retries': 0, 'errors': 0}
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with jitter"""
+        return self.backoff_base * (2 ** attempt) * (0.5 + random.random())
+    
+    def _process(self, job: Dict):
+        try:
+            content = self.emailer.create_email_content(job['data'])
+            sent = self.emailer.mailer.send(self.emailer.build_message(job['recipient'], content))
+            error = None if sent else 'send failed'
+        except Exception as e:
+            sent, error = False, str(e)
+        
+        if sent:
+            # Mark it sent before anything else can fail, or a requeue would send it twice
+            self.queue.complete(job['id'])
+            with self._lock:
+                self.stats['sent'] += 1
+                self.latencies.append(time.time() - job['enqueued_at'])
+            try:
+                self.emailer.log_lead(job['data'], content)
+            except Exception as e:
+                print(f"Sent to {job['recipient']} but failed to log the lead: {e}")
+                with self._lock:
+                    self.stats['errors'] += 1
+        elif job['attempts'] + 1 < self.max_attempts:
+            self.queue.retry(job['id'], error, self._backoff(job['attempts']))
+            with self._lock:
+                self.stats['retries'] += 1
+        else:
+            self.queue.fail(job['id'], error)
+            with self._lock:
+                self.stats['failed'] += 1
+    
+    def _work(self):
+        while True:
+            jobs = self.queue.claim(1)
+            if jobs:
+                try:
+                    self._process(jobs[0])
+                except Exception as e:
+                    # Left running; the next run's requeue_stale counts it as an attempt
+                    print(f"Job {jobs[0]['id']} could not be recorded: {e}")
+                    with self._lock:
+                        self.stats['errors'] += 1
+                continue
+            wait = self.queue.next_ready_in()
+            if wait is None:
+                return
+            # Only backed-off jobs are left; sleep until the first is due
+            time.sleep(min(wait, 1.0) or 0.05)
+    
+    def run(self) -> Dict:
+        """Work until nothing is queued (retries included); returns the report"""
+        if not self.emailer._credentials_set():
+            return self.report(0.0)
+        
+        self.queue.requeue_stale(max_attempts=self.max_attempts)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in [executor.submit(self._work) for _ in range(self.workers)]:
+                future.result()
+        return self.report(time.monotonic() - started)
+    
+    def report(self, elapsed: float) -> Dict:
+        """Throughput over the run and enqueue-to-sent latency percentiles (None if nothing was sent)"""
+        with self._lock:
+            report = dict(self.stats)
+            latencies = sorted(self.latencies)
+        report['elapsed_s'] = round(elapsed, 2)
+        report['per_minute'] = round(report['sent'] / elapsed * 60, 1) if elapsed else 0.0
+        for name, q in (('latency_p50_s', 0.5), ('latency_p95_s', 0.95)):
+            report[name] = round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 2) if latencies else None
+        return report
+
+def main():
+    """Drain the assessment queue"""
+    from email_automation import AssessmentEmailer
+    
+    parser = argparse.ArgumentParser(description="Send every queued assessment email")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent senders (and SMTP sessions)")
+    parser.add_argument('--max-attempts', type=int, default=4)
+    args = parser.parse_args()
+    
+    emailer = AssessmentEmailer(pool_size=args.workers)
+    queue = AssessmentQueue()
+    print(f"Queued: {queue.counts()}")
+    try:
+        report = QueueWorker(emailer, queue, workers=args.workers, max_attempts=args.max_attempts).run()
+    finally:
+        emailer.close()
+    
+    print(f"Sent {report['sent']}, failed {report['failed']}, retried {report['retries']} "
+          f"in {report['elapsed_s']}s ({report['per_minute']}/min)")
+    if report['sent']:
+        print(f"Enqueue-to-sent latency: p50 {report['latency_p50_s']}s, p95 {report['latency_p95_s']}s")
+    print(f"Queue now: {queue.counts()}")
+    queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Assessment Outcome Rules
+Declarative answer -> type/recommendations/steps/priority rules, compiled into a lookup over every answer combination
+"""
+
+from itertools import product
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Answers the outcome depends on, in signature order
+SIGNATURE_FIELDS = ('customer_acquisition', 'tech_comfort', 'biggest_challenge', 'previous_attempts')
+
+BUSINESS_TYPES = {
+    'digital_native': {
+        'type': 'Digital Native',
+        'description': 'Sie nutzen bereits digitale Kanäle gut und können diese optimieren.',
+        'icon': '📱'
+    },
+    'traditional': {
+        'type': 'Traditional Business',
+        'description': 'Sie haben eine starke lokale Präsenz und können von digitaler Ergänzung profitieren.',
+        'icon': '🏪'
+    },
+    'hybrid': {
+        'type': 'Hybrid Business',
+        'description': 'Sie haben sowohl traditionelle als auch digitale Potentiale.',
+        'icon': '🔄'
+    }
+}
+
+# (required answers, business type) - first match wins, {} always matches
+TYPE_RULES = [
+    ({'tech_comfort': 'very_comfortable', 'customer_acquisition': 'social_media'}, 'digital_native'),
+    ({'tech_comfort': 'not_comfortable', 'customer_acquisition': 'foot_traffic'}, 'traditional'),
+    ({}, 'hybrid')
+]
+
+# (field, recommendations per answer, recommendations for any other answer), applied in order
+RECOMMENDATION_RULES = [
+    ('customer_acquisition', {
+        'foot_traffic': ['🏪 Google My Business Profil vollständig optimieren für lokale Suchen',
+                         '📸 Instagram für visuelle Kundenbindung nutzen (Fotos von Produkten/Atmosphäre)',
+                         '⭐ Systematisches Review-Management implementieren'],
+        'word_of_mouth': ['🎁 Empfehlungsprogramm für bestehende Kunden erstellen',
+                          '⭐ Zufriedene Kunden aktiv um Google-Bewertungen bitten',
+                          '📱 WhatsApp Business für einfache Kundenkommunikation nutzen'],
+        'social_media': ['📊 Instagram/Facebook Analytics nutzen für bessere Zielgruppenansprache',
+                         '🎯 Bezahlte Social Media Werbung für lokale Zielgruppe testen',
+                         '📸 User-generated Content fördern (Kunden posten über Sie)']
+    }, ['🔍 Google My Business Optimierung für bessere Sichtbarkeit',  # google_search or other
+        '📝 Lokale SEO-Strategie entwickeln',
+        '💰 Google Ads für lokale Suchanfragen testen']),
+    ('tech_comfort', {
+        'very_comfortable': ['📊 Google Analytics einrichten für datenbasierte Entscheidungen'],
+        'not_comfortable': ['🤝 Mit einfachen, bewährten Tools starten (WhatsApp Business, Google My Business)']
+    }, []),
+    ('biggest_challenge', {
+        'not_enough_customers': ['🎯 Lokale Online-Präsenz stärken (Google, Facebook, Instagram)'],
+        'customers_not_spending': ['💡 Upselling-Strategien entwickeln (Kombi-Angebote, Loyalty Programme)'],
+        'competition': ['💎 Einzigartiges Wertversprechen entwickeln und kommunizieren']
+    }, [])
+]
+MAX_RECOMMENDATIONS = 4
+
+NEXT_STEP_RULES = [
+    ('previous_attempts', {
+        'nothing_too_busy': ['Google My Business Profil in 30 Minuten komplett ausfüllen',
+                             'Erste 10 Fotos von Ihrem Business hochladen',
+                             'System für Kundenbewertungen einrichten']
+    }, ['Performance der bisherigen Maßnahmen analysieren',
+        'Profitabelste Kanäle identifizieren und verstärken',
+        'Konkurrenzanalyse durchführen'])
+]
+# Universal steps every lead gets after the rule-driven ones
+ALWAYS_STEPS = ['Kundenfeedback-System implementieren',
+                'Monatliche 15-Minuten Marketing-Reviews einplanen']
+MAX_STEPS = 4
+
+# (field, urgency points per answer); points add up across fields
+PRIORITY_POINTS = [
+    ('biggest_challenge', {'not_enough_customers': 3}),
+    ('previous_attempts', {'nothing_too_busy': 2}),
+    ('customer_acquisition', {'foot_traffic': 2}),
+    ('tech_comfort', {'not_comfortable': 1, 'what_is_digital': 1})
+]
+# (minimum points, level, description) - first match wins
+PRIORITY_LEVELS = [
+    (5, 'HIGH', 'Hohe Priorität - Sofortiger Handlungsbedarf'),
+    (3, 'MEDIUM', 'Mittlere Priorität - Handlungsbedarf in 2-4 Wochen'),
+    (0, 'LOW', 'Niedrige Priorität - Optimierung möglich')
+]
+
+class Outcome(NamedTuple):
+    """Everything the rules decide for one answer signature"""
+    business_type: Dict[str, str]
+    recommendations: Tuple[str, ...]
+    next_steps: Tuple[str, ...]
+    priority: Dict[str, str]
+
+def _referenced_answers() -> Dict[str, Tuple[str, ...]]:
+    """Per field, the answers some rule depends on; any other answer behaves the same"""
+    answers = {field: set() for field in SIGNATURE_FIELDS}
+    for required, _ in TYPE_RULES:
+        for field, answer in required.items():
+            answers[field].add(answer)
+    for field, by_answer, _ in RECOMMENDATION_RULES + NEXT_STEP_RULES:
+        answers[field].update(by_answer)
+    for field, points in PRIORITY_POINTS:
+        answers[field].update(points)
+    return {field: tuple(sorted(values)) for field, values in answers.items()}
+
+# Answers that matter per field; everything else is folded into None in a signature
+ANSWER_DOMAINS = _referenced_answers()
+
+def _evaluate(answers: Dict[str, Optional[str]]) -> Outcome:
+    """Run the rule tables for one combination of answers"""
+    type_key = next(key for required, key in TYPE_RULES
+                    if all(answers[field] == answer for field, answer in required.items()))
+    
+    recommendations = []
+    for field, by_answer, default in RECOMMENDATION_RULES:
+        recommendations.extend(by_answer.get(answers[field], default))
+    
+    steps = []
+    for field, by_answer, default in NEXT_STEP_RULES:
+        steps.extend(by_answer.get(answers[field], default))
+    steps.extend(ALWAYS_STEPS)
+    
+    points = sum(by_answer.get(answers[field], 0) for field, by_answer in PRIORITY_POINTS)
+    level, description = next((level, description) for minimum, level, description in PRIORITY_LEVELS
+                              if points >= minimum)
+    
+    return Outcome(
+        business_type=BUSINESS_TYPES[type_key],
+        recommendations=tuple(recommendations[:MAX_RECOMMENDATIONS]),
+        next_steps=tuple(steps[:MAX_STEPS]),
+        priority={'level': level, 'description': description}
+    )
+
+# Every outcome, precomputed once: signature -> Outcome
+OUTCOMES = {
+    signature: _evaluate(dict(zip(SIGNATURE_FIELDS, signature)))
+    for signature in product(*(ANSWER_DOMAINS[field] + (None,) for field in SIGNATURE_FIELDS))
+}
+
+# Answer -> itself for the answers that matter, in SIGNATURE_FIELDS order
+_ACQUISITION, _TECH_COMFORT, _CHALLENGE, _ATTEMPTS = (
+    {answer: answer for answer in ANSWER_DOMAINS[field]} for field in SIGNATURE_FIELDS
+)
+
+def answer_signature(data: Dict) -> Tuple[Optional[str], ...]:
+    """The answers that decide a lead's outcome, with answers no rule mentions folded into None"""
+    get = data.get
+    return (_ACQUISITION.get(get('customer_acquisition')), _TECH_COMFORT.get(get('tech_comfort')),
+            _CHALLENGE.get(get('biggest_challenge')), _ATTEMPTS.get(get('previous_attempts')))
+
+def assessment_outcome(data: Dict) -> Outcome:
+    """Type, recommendations, steps and priority for a submission - one dict lookup"""
+    return OUTCOMES[answer_signature(data)]
@@ -4,19 +4,44 @@ Berlin Business GMB Opportunity Finder
 Automatically finds and scores businesses for GMB optimization potential
 """
 
-import requests
 import pandas as pd
-import time
-from typing import List, Dict, Optional
-import json
+from typing import List, Dict, Iterator, Optional, Tuple, Union
 from datetime import datetime
 import os
+from places_client import PlacesClient, PLACES_BASE_URL
+from places_cache import PlacesResponseCache, CACHE_PATH
+from scoring_engine import PROFILES as SCORING_PROFILES, score_listing, score_listings
+from listing_tracker import ListingTracker, print_delta
+from pipeline import search_stage, details_stage, score_stage, filter_stage
+from sweep_checkpoint import SweepCheckpoint, SweepProgress, chunked
+from place_index import PlaceIndex
+from grid_sweep import GridSweep
+
+# Details fetched per checkpointed batch during a sweep
+CHECKPOINT_BATCH = 40
 
 class BerlinBusinessFinder:
-    def __init__(self, google_api_key: str):
+    def __init__(self, google_api_key: str, base_url: str = PLACES_BASE_URL,
+                 max_workers: int = 8, requests_per_second: float = 10,
+                 cache_path: Optional[str] = CACHE_PATH):
         self.api_key = google_api_key
-        self.base_url = "https://maps.googleapis.com/maps/api/place"
-        self.session = requests.Session()
+        self.base_url = base_url
+        
+        # On-disk response cache shared with other runs/scripts (None disables it)
+        self.cache = PlacesResponseCache(cache_path) if cache_path else None
+        
+        # Concurrent, rate-limited fetch engine shared by all searches
+        self.client = PlacesClient(
+            google_api_key, base_url=base_url,
+            max_workers=max_workers, requests_per_second=requests_per_second,
+            cache=self.cache
+        )
+        
+        # Changes found by the last tracked find_gmb_opportunities run
+        self.last_delta = None
+        
+        # Searches/details that failed in the last sweep; a sweep with failures is incomplete
+        self.last_failures = 0
         
         # Business categories to target
         self.target_categories = {
@@ -29,234 +54,279 @@ class BerlinBusinessFinder:
         
     def search_businesses_by_category(self, category: str, location: str = "Berlin, Germany", radius: int = 50000) -> List[Dict]:
         """Search for businesses in Berlin by category"""
-        
-        search_url = f"{self.base_url}/textsearch/json"
-        params = {
-            'query': f"{category} in {location}",
-            'key': self.api_key,
-            'radius': radius
-        }
-        
-        all_businesses = []
-        
-        try:
-            response = self.session.get(search_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('status') == 'OK':
-                all_businesses.extend(data.get('results', []))
-                
-                # Handle pagination
-                while 'next_page_token' in data:
-                    time.sleep(2)  # Required delay for next_page_token
-                    params['pagetoken'] = data['next_page_token']
-                    response = self.session.get(search_url, params=params)
-                    data = response.json()
-                    
-                    if data.get('status') == 'OK':
-                        all_businesses.extend(data.get('results', []))
-                    else:
-                        break
-                        
-        except requests.RequestException as e:
-            print(f"Error searching for {category}: {e}")
-            
-        return all_businesses
+        return self.client.text_search(f"{category} in {location}", radius=radius)
     
-    def get_business_details(self, place_id: str) -> Optional[Dict]:
-        """Get detailed information about a specific business"""
-        
-        details_url = f"{self.base_url}/details/json"
-        params = {
-            'place_id': place_id,
-            'fields': 'name,formatted_address,formatted_phone_number,website,opening_hours,photos,reviews,rating,user_ratings_total,url',
-            'key': self.api_key
-        }
-        
-        try:
-            response = self.session.get(details_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('status') == 'OK':
-                return data.get('result', {})
-                
-        except requests.RequestException as e:
-            print(f"Error getting details for place_id {place_id}: {e}")
-            
-        return None
+    def get_business_details(self, place_id: str, fields: str = 'outreach') -> Optional[Dict]:
+        """Get detailed information about a specific business (fields: profile name or mask)"""
+        return self.client.details(place_id, fields)
     
     def score_gmb_listing(self, business_details: Dict) -> Dict:
         """Score a business's GMB listing completeness (0-100)"""
+        return self._scoring_details(score_listing(business_details, 'finder'))
+    
+    def _scoring_details(self, row: Dict) -> Dict:
+        """Per-listing scoring dict (flags, score, fixes) from a scoring engine row"""
+        scoring_details = {
+            flag: True for flag in ('has_name', 'has_address', 'has_phone', 'has_website', 'has_hours')
+            if row[flag]
+        }
+        if row['photo_tier']:
+            scoring_details[f"{row['photo_tier']}_photos"] = True
+        if row['review_tier']:
+            scoring_details[f"{row['review_tier']}_reviews"] = True
         
-        score = 0
-        scoring_details = {}
-        
-        # Basic Information (25 points)
-        if business_details.get('name'):
-            score += 5
-            scoring_details['has_name'] = True
-        
-        if business_details.get('formatted_address'):
-            score += 5
-            scoring_details['has_address'] = True
-            
-        if business_details.get('formatted_phone_number'):
-            score += 5
-            scoring_details['has_phone'] = True
-            
-        if business_details.get('website'):
-            score += 5
-            scoring_details['has_website'] = True
-            
-        if business_details.get('opening_hours'):
-            score += 5
-            scoring_details['has_hours'] = True
-        
-        # Photos (20 points)
-        photos = business_details.get('photos', [])
-        if len(photos) >= 10:
-            score += 20
-            scoring_details['sufficient_photos'] = True
-        elif len(photos) >= 5:
-            score += 15
-            scoring_details['some_photos'] = True
-        elif len(photos) >= 1:
-            score += 10
-            scoring_details['few_photos'] = True
-        
-        # Reviews and Engagement (25 points)
-        rating = business_details.get('rating', 0)
-        review_count = business_details.get('user_ratings_total', 0)
-        
-        if rating >= 4.5 and review_count >= 20:
-            score += 25
-            scoring_details['excellent_reviews'] = True
-        elif rating >= 4.0 and review_count >= 10:
-            score += 20
-            scoring_details['good_reviews'] = True
-        elif rating >= 3.5 and review_count >= 5:
-            score += 15
-            scoring_details['average_reviews'] = True
-        elif review_count > 0:
-            score += 10
-            scoring_details['some_reviews'] = True
-        
-        # Business Description & Categories (15 points)
-        # Note: Google Places API doesn't provide business description directly
-        # This would need additional scraping or manual assessment
-        score += 10  # Assume average for now
+        # Google Places API doesn't provide business description; average is assumed
         scoring_details['description_assumed'] = True
-        
-        # Recent Activity (15 points)
-        # This would require additional API calls to check for recent posts, updates
-        # For now, we'll estimate based on review recency
-        reviews = business_details.get('reviews', [])
-        if reviews:
-            # Check if any reviews are recent (simplified approach)
-            score += 10
+        # Recent activity is estimated from whether the listing has any reviews
+        if row['has_reviews'] or row['review_count']:
             scoring_details['some_activity'] = True
         
+        score = int(row['score'])
         scoring_details['total_score'] = score
         scoring_details['scoring_breakdown'] = {
             'basic_info': min(25, score),
-            'photos': len(photos),
-            'rating': rating,
-            'review_count': review_count
+            'photos': int(row['photo_count']),
+            'rating': row['rating'],
+            'review_count': int(row['review_count'])
         }
+        scoring_details['package'] = row['package']
+        scoring_details['priority_fixes'] = list(row['issues'])
         
         return scoring_details
     
-    def find_gmb_opportunities(self, niche: str = None, min_score: int = 30, max_score: int = 70) -> pd.DataFrame:
-        """Find businesses with GMB optimization opportunities"""
+    def find_gmb_opportunities(self, niche: str = None, min_score: int = 30, max_score: int = 70,
+                               tracker: Optional[ListingTracker] = None,
+                               checkpoint: Optional[SweepCheckpoint] = None,
+                               grid: Optional[GridSweep] = None) -> pd.DataFrame:
+        """Find businesses with GMB optimization opportunities
+        
+        With a tracker, only new or changed listings are re-scored and the
+        changes since its last run are left in `self.last_delta`. With a
+        checkpoint, an interrupted sweep resumes from its finished units; it
+        is only cleared once every search and details request succeeded.
+        With a grid, each category is swept cell by cell across the city
+        instead of through one result-capped text search.
+        """
+        self.last_failures = 0
+        listings, index = self._collect_listings(niche, checkpoint, grid)
+        if self.last_failures:
+            print(f"{self.last_failures} searches/details failed - run again to retry them")
+        elif checkpoint:
+            checkpoint.finish()
+        if not listings:
+            return pd.DataFrame()
+        
+        category_groups, categories, place_ids, details = zip(*listings)
+        if tracker:
+            tracked, self.last_delta = tracker.update(
+                place_ids, details,
+                lambda f: (f['score'] >= min_score) & (f['score'] <= max_score),
+                complete=not self.last_failures and not (niche and niche in self.target_categories)
+            )
+            scored = tracked.loc[list(place_ids)]
+        else:
+            # Score every listing in one vectorized pass
+            scored = score_listings(details, 'finder')
+        
+        score = scored['score'].to_numpy(dtype=int)
+        in_range = (score >= min_score) & (score <= max_score)
+        
+        opportunities = pd.DataFrame({
+            'business_name': [d.get('name', 'Unknown') for d in details],
+            'address': [d.get('formatted_address', '') for d in details],
+            'phone': [d.get('formatted_phone_number', '') for d in details],
+            'website': [d.get('website', '') for d in details],
+            'category_group': category_groups,
+            'category': categories,
+            'gmb_score': score,
+            'rating': [d.get('rating', 0) for d in details],
+            'review_count': [d.get('user_ratings_total', 0) for d in details],
+            'photo_count': scored['photo_count'].to_numpy(),
+            'google_url': [d.get('url', '') for d in details],
+            'place_id': place_ids,
+            'opportunity_level': scored['opportunity_level'].to_numpy(),
+            'estimated_package': scored['package'].to_numpy(),
+            'priority_fixes': list(scored['issues']),
+            'all_categories': [[category for _, category in index.categories(place_id)] for place_id in place_ids]
+        })
+        
+        return opportunities[in_range].reset_index(drop=True)
+    
+    def iter_gmb_opportunities(self, niche: str = None, min_score: int = 30,
+                               max_score: int = 70) -> Iterator[Dict]:
+        """Stream opportunity rows (search -> details -> score -> filter) as categories finish
         
+        Each place is emitted once, under the first category it was found in;
+        categories that match it later in the sweep can't be added to a row
+        that was already written.
+        """
+        index = PlaceIndex()
+        searches = search_stage(self.client, self._searches(niche), radius=50000)
+        listings = details_stage(self.client, searches, per_search=20, fields='outreach', index=index)
+        scored = score_stage(listings, 'finder')
+        for listing, row in filter_stage(scored, lambda row: min_score <= row['score'] <= max_score):
+            yield self._opportunity_record(listing, row, index)
+    
+    def _opportunity_record(self, listing: Tuple[str, str, str, Dict], row: Dict, index: PlaceIndex) -> Dict:
+        """One output row for a scored listing"""
+        category_group, category, place_id, details = listing
+        return {
+            'business_name': details.get('name', 'Unknown'),
+            'address': details.get('formatted_address', ''),
+            'phone': details.get('formatted_phone_number', ''),
+            'website': details.get('website', ''),
+            'category_group': category_group,
+            'category': category,
+            'gmb_score': int(row['score']),
+            'rating': details.get('rating', 0),
+            'review_count': details.get('user_ratings_total', 0),
+            'photo_count': int(row['photo_count']),
+            'google_url': details.get('url', ''),
+            'place_id': place_id,
+            'opportunity_level': row['opportunity_level'],
+            'estimated_package': row['package'],
+            'priority_fixes': list(row['issues']),
+            'all_categories': [category for _, category in index.categories(place_id)]
+        }
+    
+    def _searches(self, niche: str = None) -> List[Tuple[str, str, str]]:
+        """(category_group, category, query) for every category in the niche (all niches by default)"""
         if niche and niche in self.target_categories:
             categories_to_search = {niche: self.target_categories[niche]}
         else:
             categories_to_search = self.target_categories
         
-        all_opportunities = []
-        
-        for category_group, categories in categories_to_search.items():
-            print(f"Searching {category_group} businesses...")
-            
-            for category in categories:
-                print(f"  - Searching {category}...")
-                businesses = self.search_businesses_by_category(category)
-                
-                for business in businesses[:20]:  # Limit to prevent API quota issues
-                    place_id = business.get('place_id')
-                    if not place_id:
-                        continue
-                    
-                    details = self.get_business_details(place_id)
-                    if not details:
-                        continue
-                    
-                    scoring = self.score_gmb_listing(details)
-                    score = scoring['total_score']
-                    
-                    if min_score <= score <= max_score:
-                        opportunity = {
-                            'business_name': details.get('name', 'Unknown'),
-                            'address': details.get('formatted_address', ''),
-                            'phone': details.get('formatted_phone_number', ''),
-                            'website': details.get('website', ''),
-                            'category_group': category_group,
-                            'category': category,
-                            'gmb_score': score,
-                            'rating': details.get('rating', 0),
-                            'review_count': details.get('user_ratings_total', 0),
-                            'photo_count': len(details.get('photos', [])),
-                            'google_url': details.get('url', ''),
-                            'place_id': place_id,
-                            'opportunity_level': self._get_opportunity_level(score),
-                            'estimated_package': self._suggest_package(scoring),
-                            'priority_fixes': self._identify_priority_fixes(scoring)
-                        }
-                        all_opportunities.append(opportunity)
-                
-                time.sleep(1)  # Be respectful to API limits
-        
-        return pd.DataFrame(all_opportunities)
+        return [
+            (category_group, category, f"{category} in Berlin, Germany")
+            for category_group, categories in categories_to_search.items()
+            for category in categories
+        ]
+    
+    def _collect_listings(self, niche: str = None, checkpoint: Optional[SweepCheckpoint] = None,
+                          grid: Optional[GridSweep] = None) -> Tuple[List[Tuple[str, str, str, Dict]], PlaceIndex]:
+        """Search the niche's categories and fetch details
+        
+        Returns one (group, category, place_id, details) listing per unique
+        place, under the first category it was found in, plus the sweep's
+        PlaceIndex holding every category each place matched.
+        """
+        
+        listings = []
+        
+        # Search every category concurrently, then fetch all details concurrently
+        searches = self._searches(niche)
+        if grid:
+            print(f"Sweeping {len(searches)} categories over a {grid.rows}x{grid.cols} grid...")
+            place_ids_by_type = grid.run([category for _, category, _ in searches], checkpoint)
+            print(f"Searched {grid.stats['cells']} cells ({grid.stats['subdivided']} dense cells subdivided)")
+            place_ids_by_query = {query: place_ids_by_type[category] for _, category, query in searches}
+            totals = {query: len(place_ids) for query, place_ids in place_ids_by_query.items()}
+            all_details, failed = self.fetch_details(
+                [place_id for place_ids in place_ids_by_query.values() for place_id in place_ids],
+                fields='outreach', checkpoint=checkpoint
+            )
+            self.last_failures += grid.stats['failed'] + failed
+        else:
+            print(f"Searching {len(searches)} categories...")
+            # Limit to prevent API quota issues
+            place_ids_by_query, totals, all_details = self.fetch_sweep(
+                [query for _, _, query in searches], per_search=20, fields='outreach', checkpoint=checkpoint
+            )
+        
+        index = PlaceIndex()
+        for category_group, category, query in searches:
+            print(f"  - {category_group}/{category}: {totals[query]} businesses")
+            for place_id in place_ids_by_query[query]:
+                details = all_details.get(place_id)
+                if index.add(place_id, category_group, category) and details:
+                    listings.append((category_group, category, place_id, details))
+        
+        if index.duplicates:
+            print(f"Skipped {index.duplicates} duplicate listings found under more than one category")
+        
+        return listings, index
+    
+    def fetch_sweep(self, queries: List[str], per_search: Union[int, Dict[str, int]] = 20, fields: str = 'outreach',
+                    radius: int = 50000, checkpoint: Optional[SweepCheckpoint] = None,
+                    batch_size: int = CHECKPOINT_BATCH) -> Tuple[Dict[str, List[str]], Dict[str, int], Dict[str, Dict]]:
+        """Run text searches and fetch details for each query's top `per_search` places
+        
+        `per_search` is one limit for every query or a limit per query. Each
+        place is fetched once however many queries returned it.
+        With a checkpoint, every finished search and every batch of details is
+        recorded as it completes, and units already recorded are skipped, so
+        an interrupted sweep resumes where it stopped. Failed searches and
+        details are never recorded; `self.last_failures` counts them for this sweep.
+        Returns (place_ids per query, total results per query, details per place_id).
+        """
+        self.last_failures = 0
+        place_ids_by_query = {}
+        totals = {}
+        
+        done = checkpoint.searches(queries) if checkpoint else {}
+        for query, saved in done.items():
+            place_ids_by_query[query] = saved['place_ids']
+            totals[query] = saved['total']
+        
+        failed = 0
+        progress = SweepProgress('searches', len(queries), len(done))
+        for query, results in self.client.iter_search([q for q in queries if q not in done], radius=radius):
+            limit = per_search[query] if isinstance(per_search, dict) else per_search
+            place_ids_by_query[query] = [b.get('place_id') for b in results[:limit] if b.get('place_id')]
+            totals[query] = len(results)
+            # A partial result list is used for this run but searched again on resume
+            if not results.complete:
+                failed += 1
+            elif checkpoint:
+                checkpoint.save_search(query, place_ids_by_query[query], totals[query])
+            progress.advance()
+        
+        place_ids = [place_id for query in queries for place_id in place_ids_by_query[query]]
+        all_details, failed_details = self.fetch_details(place_ids, fields, checkpoint, batch_size)
+        self.last_failures += failed + failed_details
+        
+        return place_ids_by_query, totals, all_details
+    
+    def fetch_details(self, place_ids: List[str], fields: str = 'outreach',
+                      checkpoint: Optional[SweepCheckpoint] = None,
+                      batch_size: int = CHECKPOINT_BATCH) -> Tuple[Dict[str, Dict], int]:
+        """Fetch details for each unique place in checkpointed batches
+        
+        Places that no longer exist map to {}. Failed requests are left out
+        and never checkpointed. Returns (details per place_id, failed count).
+        """
+        place_ids = list(dict.fromkeys(place_ids))
+        all_details = checkpoint.places(place_ids) if checkpoint else {}
+        remaining = [place_id for place_id in place_ids if place_id not in all_details]
+        failed = 0
+        
+        progress = SweepProgress('details', len(place_ids), len(all_details))
+        for batch in chunked(remaining, batch_size):
+            fetched = {
+                place_id: details
+                for place_id, details in self.client.details_many(batch, fields=fields).items() if details is not None
+            }
+            if checkpoint:
+                checkpoint.save_places(fetched)
+            all_details.update(fetched)
+            failed += len(batch) - len(fetched)
+            progress.advance(len(batch))
+        
+        return all_details, failed
     
     def _get_opportunity_level(self, score: int) -> str:
         """Categorize opportunity level based on score"""
-        if score < 40:
-            return "High Opportunity"
-        elif score < 60:
-            return "Medium Opportunity"
-        else:
-            return "Low Opportunity"
+        for limit, level, _ in SCORING_PROFILES['finder']['levels']:
+            if limit is None or score < limit:
+                return level
     
     def _suggest_package(self, scoring: Dict) -> str:
         """Suggest appropriate service package based on scoring"""
-        score = scoring['total_score']
-        
-        if score < 40:
-            return "Premium Package (€700)"
-        elif score < 60:
-            return "Standard Package (€400)"
-        else:
-            return "Basic Touch-up (€200)"
+        return scoring['package']
     
     def _identify_priority_fixes(self, scoring: Dict) -> List[str]:
         """Identify what needs to be fixed first"""
-        fixes = []
-        
-        if not scoring.get('has_hours'):
-            fixes.append("Add business hours")
-        if not scoring.get('has_phone'):
-            fixes.append("Add phone number")
-        if not scoring.get('has_website'):
-            fixes.append("Add website")
-        if scoring.get('few_photos') or not scoring.get('sufficient_photos'):
-            fixes.append("Add more photos")
-        if scoring.get('average_reviews') or not scoring.get('good_reviews'):
-            fixes.append("Improve review strategy")
-        
-        return fixes
+        return list(scoring['priority_fixes'])
 
 def main():
     """Example usage of the Berlin Business Finder"""
@@ -270,10 +340,18 @@ def main():
         return
     
     finder = BerlinBusinessFinder(api_key)
+    tracker = ListingTracker()
+    checkpoint = SweepCheckpoint('find:restaurants')
     
-    # Find opportunities in restaurants niche
+    # Find opportunities in restaurants niche (only new/changed listings are re-scored)
     print("Finding GMB optimization opportunities in Berlin restaurants...")
-    opportunities = finder.find_gmb_opportunities(niche='restaurants')
+    try:
+        opportunities = finder.find_gmb_opportunities(niche='restaurants', tracker=tracker, checkpoint=checkpoint)
+    except KeyboardInterrupt:
+        print("\nInterrupted - progress is checkpointed, run again to resume")
+        return
+    if finder.last_delta:
+        print_delta(finder.last_delta)
     
     if not opportunities.empty:
         # Save results
@@ -283,6 +361,7 @@ def main():
         
         print(f"\nFound {len(opportunities)} opportunities!")
         print(f"Results saved to: {filename}")
+        print(f"Places cache: {finder.cache.get_stats()}")
         
         # Show summary
         print("\n=== OPPORTUNITY SUMMARY ===")
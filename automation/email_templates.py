@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Assessment Email Templates
+Parsed once into static fragments and slots, so rendering only fills in the per-lead values
+"""
+
+import copy
+import html
+import threading
+from datetime import datetime
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+# Slot values repeat a lot (types, priorities, the same business across a resend), so escape each once
+_escape = lru_cache(maxsize=4096)(html.escape)
+
+class CompiledTemplate:
+    """Template parsed once into its literal fragments and named {slots}
+    
+    `{{` and `}}` are literal braces. Slot values are HTML-escaped when
+    `escape` is set, except for the `raw` slots, which take fragments
+    already rendered by the helpers below. `partial` bakes some slots in,
+    so content shared by many renders is rendered once.
+    """
+    
+    def __init__(self, source: str, escape: bool = True, raw: Iterable[str] = ()):
+        literals = ['']
+        slots = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if spec or conversion:
+                raise ValueError(f"Template slots take no format spec or conversion: {{{field}}}")
+            literals[-1] += literal
+            if field is not None:
+                if not field.isidentifier():
+                    raise ValueError(f"Template slot is not a plain name: {{{field}}}")
+                slots.append(field)
+                literals.append('')
+        self.escape = escape
+        self.raw = frozenset(raw)
+        self._set_parts(literals, slots)
+    
+    def _set_parts(self, literals: List[str], slots: List[str]):
+        self._literals = literals
+        self._slots = slots
+        self.slots = list(dict.fromkeys(slots))
+        # (slot, escape it?, literal that follows) - decided once, not per render
+        self._parts = [(slot, self.escape and slot not in self.raw, literal)
+                       for slot, literal in zip(slots, literals[1:])]
+    
+    def render(self, **values) -> str:
+        """Fill in every slot; values for slots this template lacks are ignored, so HTML and text can share them"""
+        parts = [self._literals[0]]
+        for slot, escaped, literal in self._parts:
+            value = str(values[slot])
+            parts.append(_escape(value) if escaped else value)
+            parts.append(literal)
+        return ''.join(parts)
+    
+    def partial(self, **values) -> 'CompiledTemplate':
+        """Copy with the given slots rendered into the static fragments; only the others stay slots"""
+        literals = [self._literals[0]]
+        slots = []
+        for slot, escaped, literal in self._parts:
+            if slot in values:
+                value = str(values[slot])
+                literals[-1] += (html.escape(value) if escaped else value) + literal
+            else:
+                slots.append(slot)
+                literals.append(literal)
+        
+        template = copy.copy(self)
+        template._set_parts(literals, slots)
+        return template
+
+# Recommendation and step lists repeat across leads, so each list is rendered once
+@lru_cache(maxsize=1024)
+def html_items(items: Tuple[str, ...]) -> str:
+    return ''.join(f'<li>{html.escape(item)}</li>' for item in items)
+
+@lru_cache(maxsize=1024)
+def text_bullets(items: Tuple[str, ...]) -> str:
+    return '\n'.join(f'• {item}' for item in items)
+
+@lru_cache(maxsize=1024)
+def text_numbered(items: Tuple[str, ...]) -> str:
+    return '\n'.join(f'{i}. {item}' for i, item in enumerate(items, 1))
+
+class RenderCache:
+    """Partially rendered templates keyed by whatever decides their fixed content (e.g. an answer signature)"""
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Any] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Cached entry for `key`, built (outside the lock) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.stats['hits'] += 1
+                return entry
+            self.stats['misses'] += 1
+        
+        entry = build()
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # Oldest first; entries are cheap to rebuild
+                del self._entries[next(iter(self._entries))]
+                self.stats['evictions'] += 1
+            self._entries[key] = entry
+        return entry
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current size and hit rate"""
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+# The stamp has minute resolution, so strftime runs once per minute rather than per email
+@lru_cache(maxsize=1)
+def _minute_text(minute: datetime) -> str:
+    return minute.strftime('%d.%m.%Y um %H:%M')
+
+def timestamp_text(moment: datetime) -> str:
+    return _minute_text(moment.replace(second=0, microsecond=0))
+
+ASSESSMENT_HTML = CompiledTemplate("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; }}
+                .header {{ background: linear-gradient(135deg, #3498db, #2980b9); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+                .content {{ padding: 30px; background: #f9f9f9; }}
+                .section {{ background: white; padding: 20px; margin: 20px 0; border-radius: 8px; border-left: 4px solid #3498db; }}
+                .recommendations {{ background: #e8f5e8; border-left-color: #27ae60; }}
+                .steps {{ background: #fff3cd; border-left-color: #f39c12; }}
+                .priority {{ background: #ffebee; border-left-color: #e74c3c; }}
+                .cta {{ text-align: center; margin: 30px 0; }}
+                .btn {{ background: #3498db; color: white; padding: 15px 30px; text-decoration: none; border-radius: 25px; display: inline-block; font-weight: bold; }}
+                ul {{ padding-left: 0; list-style: none; }}
+                li {{ padding: 8px 0; border-bottom: 1px solid #eee; }}
+                li:before {{ content: "✓ "; color: #27ae60; font-weight: bold; }}
+                ol li:before {{ content: counter(item) ". "; color: #3498db; font-weight: bold; }}
+                ol {{ counter-reset: item; }}
+                ol li {{ counter-increment: item; }}
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>🚀 Ihre persönlichen Berlin Business Empfehlungen</h1>
+                <p>Für {business_name}</p>
+            </div>
+            
+            <div class="content">
+                <p>Hallo {first_name},</p>
+                
+                <p>vielen Dank für Ihre Teilnahme an unserem Berlin Business Growth Assessment! Basierend auf Ihren Antworten haben wir eine personalisierte Wachstumsstrategie für {business_name} erstellt.</p>
+                
+                <div class="section">
+                    <h3>{type_icon} Ihr Business-Typ: {type_name}</h3>
+                    <p>{type_description}</p>
+                </div>
+                
+                <div class="section recommendations">
+                    <h3>🎯 Ihre Top-Empfehlungen für mehr Kunden:</h3>
+                    <ul>
+                        {recommendations}
+                    </ul>
+                </div>
+                
+                <div class="section steps">
+                    <h3>📋 Ihre nächsten konkreten Schritte:</h3>
+                    <ol>
+                        {next_steps}
+                    </ol>
+                </div>
+                
+                <div class="section priority">
+                    <h3>⚡ Prioritätslevel: {priority_level}</h3>
+                    <p>{priority_description}</p>
+                    <p><strong>Empfehlung:</strong> {priority_recommendation}</p>
+                </div>
+                
+                <div class="cta">
+                    <h3>🎁 Kostenlose 15-Minuten Strategieberatung</h3>
+                    <p>Möchten Sie diese Empfehlungen gemeinsam durchgehen und einen konkreten Umsetzungsplan entwickeln?</p>
+                    <p>Als Berlin Business unterstützen wir Sie gerne mit einer kostenlosen Strategieberatung.</p>
+                    <a href="https://calendly.com/berlinbusiness/strategy" class="btn">Kostenlosen Termin buchen</a>
+                    <p style="font-size: 0.9em; color: #666; margin-top: 15px;">
+                        Oder antworten Sie einfach auf diese Email - wir melden uns innerhalb von 24 Stunden!
+                    </p>
+                </div>
+                
+                <div class="section">
+                    <h3>📊 Benchmark: Wie Sie im Vergleich stehen</h3>
+                    <p>Basierend auf unserer Analyse von über 200 Berlin Businesses in ähnlichen Branchen:</p>
+                    <ul>
+                        <li>85% der Businesses haben noch Optimierungspotential bei Google My Business</li>
+                        <li>Durchschnittlich 40% mehr Kundenanfragen nach professioneller Optimierung</li>
+                        <li>ROI von 300-500% bei richtig umgesetzten lokalen Marketing-Maßnahmen</li>
+                    </ul>
+                </div>
+                
+                <p>Falls Sie Fragen haben oder direkt loslegen möchten, antworten Sie einfach auf diese Email!</p>
+                
+                <p>Viel Erfolg für {business_name}!<br>
+                Ihr Berlin Business Growth Team</p>
+                
+                <hr style="margin: 30px 0; border: none; border-top: 1px solid #ddd;">
+                <p style="font-size: 0.8em; color: #666;">
+                    Diese Analyse wurde erstellt am {created_at} Uhr.<br>
+                    Berlin Business Growth • Wir helfen lokalen Businesses beim digitalen Wachstum.
+                </p>
+            </div>
+        </body>
+        </html>
+        """, raw=('recommendations', 'next_steps'))
+
+ASSESSMENT_TEXT = CompiledTemplate("""
+        Hallo {first_name},
+        
+        vielen Dank für Ihre Teilnahme an unserem Berlin Business Growth Assessment!
+        
+        IHR BUSINESS-TYP: {type_name}
+        {type_description}
+        
+        IHRE TOP-EMPFEHLUNGEN:
+        {recommendations}
+        
+        NÄCHSTE SCHRITTE:
+        {next_steps}
+        
+        PRIORITÄTSLEVEL: {priority_level}
+        {priority_description}
+        
+        Möchten Sie eine kostenlose 15-Minuten Strategieberatung?
+        Antworten Sie einfach auf diese Email!
+        
+        Viel Erfolg für {business_name}!
+        Ihr Berlin Business Growth Team
+        """, escape=False)
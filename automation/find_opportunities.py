@@ -8,6 +8,9 @@ import requests
 import pandas as pd
 import time
 import os
+from places_cache import default_cache
+from places_client import compact_details, resolve_fields
+from scoring_engine import score_listing
 
 def search_businesses(query, api_key):
     """Search for businesses in Berlin"""
@@ -38,16 +41,24 @@ def get_business_details(place_id, api_key):
     url = "https://maps.googleapis.com/maps/api/place/details/json"
     params = {
         'place_id': place_id,
-        'fields': 'name,formatted_address,formatted_phone_number,website,opening_hours,photos,reviews,rating,user_ratings_total',
+        'fields': resolve_fields('scoring'),
         'key': api_key
     }
     
+    # Reuse details fetched by any earlier run or script
+    cache = default_cache()
+    cached = cache.get('details', params)
+    if cached is not None:
+        return cached
+    
     try:
         response = requests.get(url, params=params)
         data = response.json()
         
         if data.get('status') == 'OK':
-            return data.get('result', {})
+            result = compact_details(data.get('result', {}))
+            cache.set('details', params, result)
+            return result
         else:
             return {}
             
@@ -57,84 +68,15 @@ def get_business_details(place_id, api_key):
 def score_gmb_listing(business):
     """Score a business GMB listing 0-100"""
     
-    score = 0
-    issues = []
-    
-    # Basic info (25 points)
-    if business.get('name'):
-        score += 5
-    if business.get('formatted_address'):
-        score += 5
-    if business.get('formatted_phone_number'):
-        score += 5
-    else:
-        issues.append("Missing phone number")
-    if business.get('website'):
-        score += 5
-    else:
-        issues.append("Missing website")
-    if business.get('opening_hours'):
-        score += 5
-    else:
-        issues.append("Missing business hours")
-    
-    # Photos (20 points)
-    photos = business.get('photos', [])
-    photo_count = len(photos)
-    if photo_count >= 10:
-        score += 20
-    elif photo_count >= 5:
-        score += 15
-    elif photo_count >= 1:
-        score += 10
-    else:
-        issues.append("No photos")
-        score += 0
-    
-    if photo_count < 8:
-        issues.append("Need more photos ({} currently)".format(photo_count))
-    
-    # Reviews (25 points) 
-    rating = business.get('rating', 0)
-    review_count = business.get('user_ratings_total', 0)
-    
-    if rating >= 4.5 and review_count >= 20:
-        score += 25
-    elif rating >= 4.0 and review_count >= 10:
-        score += 20
-    elif rating >= 3.5 and review_count >= 5:
-        score += 15
-    elif review_count > 0:
-        score += 10
-    else:
-        issues.append("No reviews")
-        score += 0
-    
-    if review_count < 10:
-        issues.append("Need more reviews ({} currently)".format(review_count))
-    
-    # Description and activity (30 points) - assume average since we can't check easily
-    score += 15
-    
-    # Suggest package based on score
-    if score < 40:
-        package = "Premium Package (€700)"
-        opportunity_level = "HIGH"
-    elif score < 60:
-        package = "Standard Package (€400)"  
-        opportunity_level = "MEDIUM"
-    else:
-        package = "Basic Package (€200)"
-        opportunity_level = "LOW"
-    
+    row = score_listing(business, 'opportunities')
     return {
-        'score': score,
-        'issues': issues,
-        'package': package,
-        'opportunity_level': opportunity_level,
-        'photo_count': photo_count,
-        'rating': rating,
-        'review_count': review_count
+        'score': int(row['score']),
+        'issues': row['issues'],
+        'package': row['package'],
+        'opportunity_level': row['opportunity_level'],
+        'photo_count': int(row['photo_count']),
+        'rating': business.get('rating', 0),
+        'review_count': business.get('user_ratings_total', 0)
     }
 
 def main():
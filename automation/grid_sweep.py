@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Grid-Tiled Geographic Sweep
+Covers Berlin with nearby searches over a lat/lng grid, subdividing cells that hit the result cap
+"""
+
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from places_client import PlacesClient
+from sweep_checkpoint import SweepCheckpoint, SweepProgress
+
+# (south, west, north, east) around the Berlin city limits
+BERLIN_BOUNDS = (52.3383, 13.0884, 52.6755, 13.7611)
+
+# Nearby search stops after 3 pages of 20; a cell returning this many may be hiding more
+RESULT_CAP = 60
+
+METERS_PER_DEGREE = 111320
+
+class Cell(NamedTuple):
+    """Rectangular grid cell; depth counts how often it was subdivided"""
+    south: float
+    west: float
+    north: float
+    east: float
+    depth: int = 0
+    
+    @property
+    def center(self) -> Tuple[float, float]:
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+    
+    @property
+    def radius(self) -> int:
+        """Metres from the center to a corner, so the search circle covers the whole cell"""
+        lat, _ = self.center
+        dy = (self.north - self.south) / 2 * METERS_PER_DEGREE
+        dx = (self.east - self.west) / 2 * METERS_PER_DEGREE * math.cos(math.radians(lat))
+        return math.ceil(math.hypot(dx, dy))
+    
+    @property
+    def key(self) -> str:
+        return f"{self.south:.5f},{self.west:.5f},{self.north:.5f},{self.east:.5f}"
+    
+    def contains(self, lat: float, lng: float) -> bool:
+        """Half-open on the north/east edges so neighbouring cells never both claim a point"""
+        return self.south <= lat < self.north and self.west <= lng < self.east
+    
+    def split(self) -> List['Cell']:
+        """Four quadrants one level deeper"""
+        lat, lng = self.center
+        depth = self.depth + 1
+        return [Cell(self.south, self.west, lat, lng, depth), Cell(self.south, lng, lat, self.east, depth),
+                Cell(lat, self.west, self.north, lng, depth), Cell(lat, lng, self.north, self.east, depth)]
+
+def grid_cells(bounds: Tuple[float, float, float, float] = BERLIN_BOUNDS,
+               rows: int = 4, cols: int = 4) -> List[Cell]:
+    """Partition (south, west, north, east) bounds into rows x cols cells"""
+    south, west, north, east = bounds
+    lat_step = (north - south) / rows
+    lng_step = (east - west) / cols
+    return [
+        Cell(south + r * lat_step, west + c * lng_step, south + (r + 1) * lat_step, west + (c + 1) * lng_step)
+        for r in range(rows) for c in range(cols)
+    ]
+
+def _location(result: Dict) -> Optional[Tuple[float, float]]:
+    location = (result.get('geometry') or {}).get('location')
+    if not location:
+        return None
+    return location.get('lat'), location.get('lng')
+
+class GridSweep:
+    """Nearby-search sweep of every place type over a grid, adaptively refined where dense
+    
+    Each (type, cell) search covers its cell with one circle. Cells whose
+    search returns RESULT_CAP results are split into quadrants and searched
+    again, down to `max_depth`; sparse cells are never split, so the request
+    count follows business density rather than grid resolution. Every level
+    runs as one concurrent wave across all types and cells.
+    """
+    
+    def __init__(self, client: PlacesClient, bounds: Tuple[float, float, float, float] = BERLIN_BOUNDS,
+                 rows: int = 4, cols: int = 4, max_depth: int = 6, result_cap: int = RESULT_CAP):
+        self.client = client
+        self.bounds = bounds
+        self.rows = rows
+        self.cols = cols
+        self.max_depth = max_depth
+        self.result_cap = result_cap
+        self.stats = {'cells': 0, 'subdivided': 0, 'capped': 0, 'failed': 0}
+    
+    def run(self, place_types: Iterable[str],
+            checkpoint: Optional[SweepCheckpoint] = None) -> Dict[str, List[str]]:
+        """Sweep every type; returns unique place_ids per type, in the order found
+        
+        Only results located inside the searched cell are kept, so the
+        overlapping corners of neighbouring search circles add nothing.
+        With a checkpoint, finished cell searches are recorded and skipped
+        on resume; failed ones are counted in stats['failed'] and never
+        recorded, so a resumed run searches them again.
+        """
+        place_types = list(place_types)
+        self.stats = dict.fromkeys(self.stats, 0)
+        found = {place_type: {} for place_type in place_types}
+        frontier = [(place_type, cell) for place_type in place_types
+                    for cell in grid_cells(self.bounds, self.rows, self.cols)]
+        
+        while frontier:
+            units = {f"{place_type}@{cell.key}": (place_type, cell) for place_type, cell in frontier}
+            done = checkpoint.searches(units) if checkpoint else {}
+            progress = SweepProgress(f"grid level {frontier[0][1].depth}", len(units), len(done))
+            
+            searches = {
+                unit: {'location': f"{cell.center[0]:.6f},{cell.center[1]:.6f}", 'radius': cell.radius, 'type': place_type}
+                for unit, (place_type, cell) in units.items() if unit not in done
+            }
+            
+            frontier = []
+            for unit, saved in done.items():
+                frontier.extend(self._record(found, *units[unit], saved['place_ids'], saved['total']))
+            for unit, results in self.client.iter_nearby(searches):
+                place_type, cell = units[unit]
+                place_ids = [r['place_id'] for r in results
+                             if r.get('place_id') and _location(r) and cell.contains(*_location(r))]
+                if not results.complete:
+                    self.stats['failed'] += 1
+                elif checkpoint:
+                    checkpoint.save_search(unit, place_ids, len(results))
+                frontier.extend(self._record(found, place_type, cell, place_ids, len(results)))
+                progress.advance()
+        
+        return {place_type: list(place_ids) for place_type, place_ids in found.items()}
+    
+    def _record(self, found: Dict[str, Dict[str, None]], place_type: str, cell: Cell,
+                place_ids: List[str], total: int) -> List[Tuple[str, Cell]]:
+        """Add a cell's places; returns the child searches to run if it hit the cap"""
+        found[place_type].update(dict.fromkeys(place_ids))
+        self.stats['cells'] += 1
+        if total < self.result_cap:
+            return []
+        self.stats['capped'] += 1
+        if cell.depth >= self.max_depth:
+            return []
+        self.stats['subdivided'] += 1
+        return [(place_type, child) for child in cell.split()]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Assessment Lead Store
+Append-only SQLite table of assessment leads, safe for concurrent writers
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterable, Iterator, Optional
+
+LEADS_PATH = os.getenv('ASSESSMENT_LEADS_PATH', 'assessment_leads.db')
+# JSON array the emailer used to rewrite on every submission
+LEGACY_LEADS_FILE = 'assessment_leads.json'
+
+LEAD_COLUMNS = ['timestamp', 'first_name', 'last_name', 'email', 'business_name', 'whatsapp',
+                'priority_level', 'business_type', 'assessment_responses']
+
+class LeadStore:
+    """Leads appended one row at a time; writers in other threads or processes wait on SQLite's lock"""
+    
+    def __init__(self, path: str = LEADS_PATH, timeout: float = 30):
+        self.path = path
+        self._lock = threading.Lock()
+        
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS leads (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                first_name TEXT,
+                last_name TEXT,
+                email TEXT,
+                business_name TEXT,
+                whatsapp TEXT,
+                priority_level TEXT,
+                business_type TEXT,
+                assessment_responses TEXT,
+                UNIQUE (timestamp, email)
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_leads_email ON leads (email)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_leads_priority ON leads (priority_level, timestamp)")
+    
+    @staticmethod
+    def _row(lead: Dict) -> tuple:
+        return tuple(
+            json.dumps(lead.get(c), ensure_ascii=False) if c == 'assessment_responses' else lead.get(c)
+            for c in LEAD_COLUMNS
+        )
+    
+    def add_many(self, leads: Iterable[Dict]) -> int:
+        """Append leads in one transaction; a lead already stored (same timestamp and email) is skipped"""
+        rows = [self._row(lead) for lead in leads]
+        with self._lock:
+            # Take the write lock up front so a busy database is waited on, never failed
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self.conn.total_changes
+                self.conn.executemany(
+                    f"INSERT OR IGNORE INTO leads ({', '.join(LEAD_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in LEAD_COLUMNS)})",
+                    rows
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.total_changes - before
+    
+    def add(self, lead: Dict) -> bool:
+        """Append one lead; cost does not depend on how many are stored"""
+        return self.add_many([lead]) == 1
+    
+    def leads(self, priority_level: Optional[str] = None) -> Iterator[Dict]:
+        """Stored leads in the order they were logged, optionally for one priority level"""
+        query = f"SELECT {', '.join(LEAD_COLUMNS)} FROM leads"
+        params = ()
+        if priority_level:
+            query += " WHERE priority_level = ?"
+            params = (priority_level,)
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY id", params).fetchall()
+        for row in rows:
+            lead = dict(zip(LEAD_COLUMNS, row))
+            lead['assessment_responses'] = json.loads(lead['assessment_responses'] or 'null')
+            yield lead
+    
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+    
+    def import_json(self, path: str = LEGACY_LEADS_FILE) -> int:
+        """Load a legacy JSON array of leads; safe to re-run, returns how many were new"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.add_many(json.load(f))
+    
+    def close(self):
+        self.conn.close()
+
+def main():
+    """One-time import of the legacy JSON lead file"""
+    path = sys.argv[1] if len(sys.argv) > 1 else LEGACY_LEADS_FILE
+    store = LeadStore()
+    imported = store.import_json(path)
+    print(f"Imported {imported} leads from {path} ({store.count()} stored in {store.path})")
+    store.close()
+
+if __name__ == "__main__":
+    main()
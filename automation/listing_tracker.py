@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Incremental Listing Tracker
+Fingerprints each place's scoring inputs so refreshes only re-score what changed
+"""
+
+import json
+import os
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scoring_engine import FEATURE_COLUMNS, PROFILES, extract_features, profile_version, score_listings
+
+TRACKER_PATH = os.getenv('LISTING_TRACKER_PATH', 'listing_state.db')
+
+# Scoring results kept per place so unchanged rows never go through the engine again
+RESULT_COLUMNS = ['score', 'opportunity_level', 'package', 'priority', 'issue_count', 'issues', 'improvements']
+
+def fingerprint(features: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of each row's scoring inputs (signed, so it fits an SQLite INTEGER)"""
+    return pd.util.hash_pandas_object(features[FEATURE_COLUMNS], index=False).to_numpy().view(np.int64)
+
+class ListingTracker:
+    """Last scored state of every place, per scoring profile
+    
+    Stored results are tagged with the profile's rules version; when the
+    rules change, every place is re-scored on its next sweep.
+    """
+    
+    def __init__(self, path: str = TRACKER_PATH, profile: str = 'finder'):
+        self.path = path
+        self.profile = profile
+        self.scored = 'levels' in PROFILES[profile]
+        self.rules_version = profile_version(profile)
+        
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS listing_state (
+                profile TEXT NOT NULL,
+                place_id TEXT NOT NULL,
+                fingerprint INTEGER NOT NULL,
+                score INTEGER,
+                opportunity_level TEXT,
+                package TEXT,
+                priority INTEGER,
+                issue_count INTEGER,
+                issues TEXT,
+                improvements TEXT,
+                is_prospect INTEGER NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (profile, place_id)
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS profile_state (
+                profile TEXT PRIMARY KEY,
+                rules_version TEXT NOT NULL
+            )
+        ''')
+        self.conn.commit()
+    
+    def _stored_version(self):
+        row = self.conn.execute("SELECT rules_version FROM profile_state WHERE profile = ?", (self.profile,)).fetchone()
+        return row[0] if row else None
+    
+    def _load_state(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT place_id, fingerprint, score, opportunity_level, package, priority, "
+            "issue_count, issues, improvements, is_prospect FROM listing_state WHERE profile = ?",
+            self.conn, params=(self.profile,)
+        ).set_index('place_id')
+    
+    def update(self, place_ids: Iterable[str], details: Iterable[Dict],
+               is_prospect: Callable[[pd.DataFrame], pd.Series],
+               complete: bool = False) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        """Score a sweep incrementally and record it
+        
+        Only places that are new or whose fingerprint changed are scored; the
+        rest reuse their stored results, unless the profile's rules changed
+        since they were stored. `is_prospect` marks the rows worth
+        contacting. With `complete` (the sweep covered everything tracked),
+        prospects that were not seen at all are reported as dropped.
+        
+        Returns (per-place frame, delta) where delta has 'new', 'improved'
+        and 'dropped' frames.
+        """
+        place_ids = list(place_ids)
+        frame = extract_features(details)
+        frame.insert(0, 'place_id', place_ids)
+        frame = frame.drop_duplicates('place_id').set_index('place_id')
+        frame['fingerprint'] = fingerprint(frame)
+        
+        previous = self._load_state()
+        known = frame.index.isin(previous.index)
+        before = previous.reindex(frame.index)
+        changed = ~known | (before['fingerprint'].to_numpy() != frame['fingerprint'].to_numpy())
+        frame['changed'] = changed
+        # Stored results from older rules are stale, but only changed listings count as improved
+        rescore = changed | (self._stored_version() != self.rules_version)
+        
+        # Unchanged rows reuse stored results (issue lists are kept as JSON)...
+        for column in RESULT_COLUMNS:
+            frame[column] = before[column].astype(object)
+        for column in ('issues', 'improvements'):
+            frame[column] = [json.loads(v) if isinstance(v, str) else [] for v in frame[column]]
+        
+        # ...changed rows go through the engine in one vectorized pass
+        if rescore.any():
+            rescored = score_listings(frame.loc[rescore, FEATURE_COLUMNS], self.profile)
+            if not self.scored:
+                rescored['score'] = None
+            else:
+                rescored['improvements'] = [[] for _ in range(len(rescored))]
+            for column in RESULT_COLUMNS:
+                frame.loc[rescore, column] = pd.Series(list(rescored[column]), index=rescored.index, dtype=object)
+        
+        # Prospect rules are cheap, so every row is re-evaluated (thresholds may change between runs)
+        frame['is_prospect'] = np.asarray(is_prospect(frame), dtype=bool)
+        
+        was_prospect = before['is_prospect'].fillna(0).astype(bool).to_numpy()
+        now_prospect = frame['is_prospect'].to_numpy()
+        if self.scored:
+            improved = known & changed & (frame['score'].to_numpy(dtype=float) > before['score'].to_numpy(dtype=float))
+        else:
+            improved = known & changed & (frame['issue_count'].to_numpy(dtype=float) < before['issue_count'].to_numpy(dtype=float))
+        
+        dropped = frame[was_prospect & ~now_prospect].assign(reason='no longer qualifies')
+        if complete:
+            missing = previous[(previous['is_prospect'] == 1) & ~previous.index.isin(frame.index)]
+            dropped = pd.concat([dropped, missing[['score', 'opportunity_level', 'package']].assign(reason='not found')])
+        else:
+            missing = previous.iloc[0:0]
+        
+        delta = {
+            'new': frame[now_prospect & ~was_prospect],
+            'improved': frame[improved],
+            'dropped': dropped
+        }
+        
+        self._save(frame, rescore, missing.index)
+        return frame, delta
+    
+    def _save(self, frame: pd.DataFrame, rescored: np.ndarray, missing: Iterable[str]):
+        now = time.time()
+        updates = frame[rescored]
+        rows = [
+            (self.profile, place_id, int(fp), None if pd.isna(score) else int(score), level, package,
+             int(priority), int(issue_count), json.dumps(issues), json.dumps(improvements), int(prospect), now, now)
+            for place_id, fp, score, level, package, priority, issue_count, issues, improvements, prospect in zip(
+                updates.index, updates['fingerprint'], updates['score'], updates['opportunity_level'],
+                updates['package'], updates['priority'], updates['issue_count'], updates['issues'],
+                updates['improvements'], updates['is_prospect']
+            )
+        ]
+        
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO listing_state (profile, place_id, fingerprint, score, opportunity_level, package,
+                    priority, issue_count, issues, improvements, is_prospect, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (profile, place_id) DO UPDATE SET
+                    fingerprint = excluded.fingerprint, score = excluded.score,
+                    opportunity_level = excluded.opportunity_level, package = excluded.package,
+                    priority = excluded.priority, issue_count = excluded.issue_count,
+                    issues = excluded.issues, improvements = excluded.improvements,
+                    is_prospect = excluded.is_prospect, last_seen = excluded.last_seen
+            ''', rows)
+            unchanged = frame[~rescored]
+            self.conn.executemany(
+                "UPDATE listing_state SET is_prospect = ?, last_seen = ? WHERE profile = ? AND place_id = ?",
+                [(int(prospect), now, self.profile, place_id)
+                 for place_id, prospect in zip(unchanged.index, unchanged['is_prospect'])]
+            )
+            self.conn.executemany(
+                "UPDATE listing_state SET is_prospect = 0 WHERE profile = ? AND place_id = ?",
+                [(self.profile, place_id) for place_id in missing]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO profile_state (profile, rules_version) VALUES (?, ?)",
+                (self.profile, self.rules_version)
+            )
+    
+    def close(self):
+        self.conn.close()
+
+def print_delta(delta: Dict[str, pd.DataFrame]):
+    """One-line-per-bucket summary of a refresh"""
+    print("\n=== CHANGES SINCE LAST RUN ===")
+    print(f"New prospects: {len(delta['new'])}")
+    print(f"Improved listings: {len(delta['improved'])}")
+    print(f"Dropped prospects: {len(delta['dropped'])}")
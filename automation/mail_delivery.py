@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Pooled SMTP Mail Delivery
+Keeps authenticated SMTP sessions open across a batch of messages
+"""
+
+import smtplib
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Dict, Iterable, List, Optional
+
+def is_connection_error(error: Exception) -> bool:
+    """True when the session itself is unusable and must be replaced
+    
+    Every SMTPException is also an OSError, so among them only a disconnect
+    counts; the rest are message-level rejections on a healthy session.
+    """
+    return isinstance(error, smtplib.SMTPServerDisconnected) or not isinstance(error, smtplib.SMTPException)
+
+class SMTPDeliveryPool:
+    """Small pool of logged-in SMTP sessions shared by a batch of sends"""
+    
+    def __init__(self, host: str, port: int = 587, username: Optional[str] = None,
+                 password: Optional[str] = None, use_tls: bool = True, pool_size: int = 1,
+                 timeout: float = 30, max_retries: int = 2):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        
+        self._idle = queue.LifoQueue()
+        self._open_sessions = 0
+        self._lock = threading.Lock()
+        self.stats = {'sent': 0, 'failed': 0, 'connections': 0, 'reconnects': 0}
+    
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a new SMTP session"""
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            self._discard(server, counted=False)
+            raise
+        
+        self._count('connections')
+        return server
+    
+    def _acquire(self) -> smtplib.SMTP:
+        """Reuse an idle session, open a new one, or wait for one to be released"""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            
+            with self._lock:
+                can_open = self._open_sessions < self.pool_size
+                if can_open:
+                    self._open_sessions += 1
+            
+            if can_open:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._open_sessions -= 1
+                    raise
+            
+            # Pool is full; re-check periodically in case a session was discarded
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+    
+    def _discard(self, server: smtplib.SMTP, counted: bool = True):
+        """Drop a broken session without raising"""
+        try:
+            server.close()
+        except Exception:
+            pass
+        if counted:
+            with self._lock:
+                self._open_sessions -= 1
+    
+    def send(self, msg: Message) -> bool:
+        """Send one message, reconnecting if the pooled session has gone away"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                server = self._acquire()
+            except (smtplib.SMTPException, OSError) as e:
+                print(f"Error connecting to {self.host}:{self.port}: {e}")
+                break
+            
+            try:
+                server.send_message(msg)
+            except (smtplib.SMTPException, OSError) as e:
+                if not is_connection_error(e):
+                    # Refused sender/recipient or data; smtplib has reset the session, so keep it
+                    self._idle.put(server)
+                    print(f"Error sending email to {msg['To']}: {e}")
+                    break
+                
+                # Stale or dropped session - replace it and try again
+                self._discard(server)
+                if attempt < self.max_retries:
+                    self._count('reconnects')
+                    continue
+                print(f"Error sending email to {msg['To']}: {e}")
+                break
+            
+            self._idle.put(server)
+            self._count('sent')
+            return True
+        
+        self._count('failed')
+        return False
+    
+    def send_many(self, messages: Iterable[Message]) -> List[bool]:
+        """Send a batch over the pooled sessions; returns one success flag per message"""
+        if self.pool_size == 1:
+            return [self.send(msg) for msg in messages]
+        
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            return list(executor.map(self.send, messages))
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Delivery counters (sent, failed, connections opened, reconnects)"""
+        with self._lock:
+            return dict(self.stats)
+    
+    def close(self):
+        """Politely end every idle session"""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+            with self._lock:
+                self._open_sessions -= 1
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -4,24 +4,92 @@ Berlin Business Niche Analyzer
 Determines which niches have the most GMB optimization opportunities
 """
 
+import numpy as np
 import pandas as pd
 from berlin_business_finder import BerlinBusinessFinder
+from sweep_checkpoint import SweepCheckpoint
+from place_index import PlaceIndex
+from scoring_engine import score_listings
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
 
 class NicheAnalyzer:
     def __init__(self, api_key: str):
         self.finder = BerlinBusinessFinder(api_key)
         
-    def analyze_all_niches(self, sample_size: int = 50) -> Dict:
-        """Analyze opportunity potential across all niches"""
+    def analyze_all_niches(self, sample_size: int = 50, checkpoint: Optional[SweepCheckpoint] = None) -> Dict:
+        """Analyze opportunity potential across all niches
+        
+        With a checkpoint, finished searches and details are recorded as they
+        complete and skipped on a rerun, so an interrupted analysis resumes.
+        A business found under several categories is fetched and scored once
+        and counted once in every niche it belongs to.
+        """
         
         niche_analysis = {}
         
-        for niche_name, categories in self.finder.target_categories.items():
-            print(f"\nAnalyzing {niche_name} niche...")
-            
+        # Sample businesses from each category of every niche in one sweep
+        # Limit sample to prevent API quota issues
+        searches = [
+            (niche_name, category, f"{category} in Berlin, Germany")
+            for niche_name, categories in self.finder.target_categories.items()
+            for category in categories
+        ]
+        per_search = {
+            query: min(sample_size // len(self.finder.target_categories[niche_name]), 20)
+            for niche_name, _, query in searches
+        }
+        place_ids_by_query, _, all_details = self.finder.fetch_sweep(
+            [query for _, _, query in searches], per_search=per_search, fields='scoring', checkpoint=checkpoint
+        )
+        index = PlaceIndex.from_searches(searches, place_ids_by_query)
+        if index.duplicates:
+            print(f"Skipped {index.duplicates} duplicate listings found under more than one category")
+        
+        # One row per (niche, place); a place in several niches is scored once and counted in each
+        memberships = [
+            (niche_name, place_id)
+            for niche_name in self.finder.target_categories
+            for place_id in index.places(niche_name) if all_details.get(place_id)
+        ]
+        place_ids = list(dict.fromkeys(place_id for _, place_id in memberships))
+        scored = score_listings([all_details[place_id] for place_id in place_ids], 'finder')
+        scored.index = place_ids
+        
+        print(f"\nAggregating {len(place_ids)} businesses across {len(self.finder.target_categories)} niches...")
+        frame = scored.loc[[place_id for _, place_id in memberships],
+                           ['score', 'rating', 'review_count', 'package', 'issues']].reset_index(drop=True)
+        frame.insert(0, 'niche', [niche_name for niche_name, _ in memberships])
+        
+        score = frame['score'].to_numpy()
+        frame['opportunity'] = (score >= 30) & (score <= 70)
+        frame['high'] = score < 40
+        frame['medium'] = (score >= 40) & (score < 60)
+        frame['low'] = score >= 60
+        # Premium, Standard and Basic package prices
+        frame['revenue'] = np.select([frame['high'], frame['medium']], [700, 400], default=200)
+        
+        summary = frame.groupby('niche', sort=False).agg(
+            total_businesses=('score', 'size'),
+            opportunities=('opportunity', 'sum'),
+            high_opportunity=('high', 'sum'),
+            medium_opportunity=('medium', 'sum'),
+            low_opportunity=('low', 'sum'),
+            avg_score=('score', 'mean'),
+            revenue_potential=('revenue', 'sum'),
+            avg_review_count=('review_count', 'mean'),
+            avg_rating=('rating', 'mean')
+        )
+        
+        # Counts keep first-seen order, so equally common issues rank as they were found
+        issue_counts = (frame[['niche', 'issues']].explode('issues').dropna()
+                        .groupby(['niche', 'issues'], sort=False).size().reset_index(name='count'))
+        issue_counts['rank'] = -issue_counts['count']
+        issue_counts = issue_counts.sort_values('rank', kind='stable')
+        package_counts = frame.groupby(['niche', 'package'], sort=False).size()
+        
+        for niche_name in self.finder.target_categories:
             niche_data = {
                 'total_businesses': 0,
                 'opportunities': 0,
@@ -36,83 +104,27 @@ class NicheAnalyzer:
                 'recommended_packages': {}
             }
             
-            all_businesses = []
-            
-            # Sample businesses from each category in the niche
-            for category in categories:
-                businesses = self.finder.search_businesses_by_category(category)
-                # Limit sample to prevent API quota issues
-                sample_businesses = businesses[:min(sample_size // len(categories), 20)]
-                all_businesses.extend(sample_businesses)
-            
-            scores = []
-            issues = []
-            packages = []
-            ratings = []
-            review_counts = []
-            
-            for business in all_businesses:
-                place_id = business.get('place_id')
-                if not place_id:
-                    continue
-                    
-                details = self.finder.get_business_details(place_id)
-                if not details:
-                    continue
+            if niche_name in summary.index:
+                row = summary.loc[niche_name]
+                for key in ('total_businesses', 'opportunities', 'high_opportunity', 'medium_opportunity',
+                            'low_opportunity', 'revenue_potential'):
+                    niche_data[key] = int(row[key])
+                for key in ('avg_score', 'avg_rating', 'avg_review_count'):
+                    niche_data[key] = round(float(row[key]), 1)
                 
-                scoring = self.finder.score_gmb_listing(details)
-                score = scoring['total_score']
-                scores.append(score)
-                
-                # Collect common issues
-                fixes = self.finder._identify_priority_fixes(scoring)
-                issues.extend(fixes)
-                
-                # Collect package recommendations
-                package = self.finder._suggest_package(scoring)
-                packages.append(package)
-                
-                # Collect rating and review data
-                rating = details.get('rating', 0)
-                review_count = details.get('user_ratings_total', 0)
-                ratings.append(rating)
-                review_counts.append(review_count)
-                
-                # Categorize opportunity level
-                if score < 40:
-                    niche_data['high_opportunity'] += 1
-                elif score < 60:
-                    niche_data['medium_opportunity'] += 1
-                else:
-                    niche_data['low_opportunity'] += 1
-            
-            if scores:
-                niche_data['total_businesses'] = len(scores)
-                niche_data['opportunities'] = len([s for s in scores if 30 <= s <= 70])
-                niche_data['avg_score'] = round(sum(scores) / len(scores), 1)
-                niche_data['avg_rating'] = round(sum(ratings) / len(ratings), 1) if ratings else 0
-                niche_data['avg_review_count'] = round(sum(review_counts) / len(review_counts), 1) if review_counts else 0
-                
-                # Calculate revenue potential
-                high_revenue = niche_data['high_opportunity'] * 700  # Premium packages
-                medium_revenue = niche_data['medium_opportunity'] * 400  # Standard packages
-                low_revenue = niche_data['low_opportunity'] * 200  # Basic packages
-                niche_data['revenue_potential'] = high_revenue + medium_revenue + low_revenue
-                
-                # Find most common issues
-                issue_counts = {}
-                for issue in issues:
-                    issue_counts[issue] = issue_counts.get(issue, 0) + 1
-                niche_data['common_issues'] = sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:3]
-                
-                # Package distribution
-                package_counts = {}
-                for package in packages:
-                    package_counts[package] = package_counts.get(package, 0) + 1
-                niche_data['recommended_packages'] = package_counts
+                top_issues = issue_counts[issue_counts['niche'] == niche_name].head(3)
+                niche_data['common_issues'] = [(issue, int(count)) for issue, count in
+                                               zip(top_issues['issues'], top_issues['count'])]
+                niche_data['recommended_packages'] = {
+                    package: int(count) for package, count in package_counts.loc[niche_name].items()
+                }
             
             niche_analysis[niche_name] = niche_data
-            
+        
+        if self.finder.last_failures:
+            print(f"{self.finder.last_failures} searches/details failed - run again to retry them")
+        elif checkpoint:
+            checkpoint.finish()
         return niche_analysis
     
     def rank_niches(self, analysis: Dict) -> List[Dict]:
@@ -243,10 +255,14 @@ def main():
     analyzer = NicheAnalyzer(api_key)
     
     print("🔍 Analyzing Berlin business niches for GMB opportunities...")
-    print("This may take 5-10 minutes due to API rate limits...")
+    print("Fetching every niche in one concurrent, rate-limited sweep...")
     
-    # Analyze all niches
-    analysis = analyzer.analyze_all_niches(sample_size=30)
+    # Analyze all niches (checkpointed - an interrupted run resumes where it stopped)
+    try:
+        analysis = analyzer.analyze_all_niches(sample_size=30, checkpoint=SweepCheckpoint('niche:30'))
+    except KeyboardInterrupt:
+        print("\nInterrupted - progress is checkpointed, run again to resume")
+        return
     
     # Rank by opportunity
     ranked_niches = analyzer.rank_niches(analysis)
@@ -273,6 +289,7 @@ def main():
     print(f"\n✅ Analysis complete!")
     print(f"📊 Detailed data: niche_analysis_{timestamp}.json")
     print(f"📋 Report: niche_report_{timestamp}.md")
+    print(f"🗄️ Places cache: {analyzer.finder.cache.get_stats()}")
     
     # Show quick summary
     print(f"\n🏆 TOP 3 NICHES FOR GMB OPTIMIZATION:")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Streaming Opportunity Pipeline
+search -> details -> score -> filter -> sink, built from generators with incremental sinks
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from place_index import PlaceIndex
+from places_client import PlacesClient
+from scoring_engine import score_listings
+
+# A search unit: (category_group, category, query)
+Search = Tuple[str, str, str]
+# A fetched listing: (category_group, category, place_id, details)
+Listing = Tuple[str, str, str, Dict]
+
+def search_stage(client: PlacesClient, searches: Iterable[Search],
+                 **params) -> Iterator[Tuple[Search, List[Dict]]]:
+    """Yield (search, results) as each text search finishes (pagination interleaved)"""
+    searches = list(searches)
+    by_query = {query: (group, category, query) for group, category, query in searches}
+    for query, results in client.iter_search(by_query, **params):
+        yield by_query[query], results
+
+def details_stage(client: PlacesClient, search_results: Iterable[Tuple[Search, List[Dict]]],
+                  per_search: int = 20, fields: str = 'outreach',
+                  index: Optional[PlaceIndex] = None) -> Iterator[Listing]:
+    """Fetch details for each search's top places (concurrently per search) and yield listings
+    
+    With an index, places already seen under an earlier search are only
+    attributed to the new category, not fetched or yielded again.
+    """
+    for (group, category, _), results in search_results:
+        place_ids = [b.get('place_id') for b in results[:per_search] if b.get('place_id')]
+        if index is not None:
+            place_ids = [place_id for place_id in place_ids if index.add(place_id, group, category)]
+        details = client.details_many(place_ids, fields=fields)
+        for place_id in place_ids:
+            if details.get(place_id):
+                yield group, category, place_id, details[place_id]
+
+def score_stage(listings: Iterable[Listing], profile: str = 'finder',
+                batch_size: int = 100) -> Iterator[Tuple[Listing, Dict]]:
+    """Score listings in vectorized batches; yields (listing, scoring row)"""
+    listings = iter(listings)
+    while True:
+        batch = list(islice(listings, batch_size))
+        if not batch:
+            return
+        scored = score_listings([details for _, _, _, details in batch], profile)
+        yield from zip(batch, scored.to_dict('records'))
+
+def filter_stage(scored: Iterable[Tuple[Listing, Dict]],
+                 keep: Callable[[Dict], bool]) -> Iterator[Tuple[Listing, Dict]]:
+    """Pass through the scored listings `keep` accepts"""
+    return (item for item in scored if keep(item[1]))
+
+class CSVSink:
+    """Append rows to a CSV file (header written once), flushing every batch"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+        self.writer = None
+    
+    def write(self, rows: List[Dict]):
+        if not rows:
+            return
+        if self.writer is None:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self.file = open(self.path, 'a', newline='', encoding='utf-8')
+            self.writer = csv.DictWriter(self.file, fieldnames=list(rows[0]))
+            if new_file:
+                self.writer.writeheader()
+        
+        self.writer.writerows(
+            {k: ' | '.join(v) if isinstance(v, list) else v for k, v in row.items()} for row in rows
+        )
+        self.file.flush()
+    
+    def close(self):
+        if self.file:
+            self.file.close()
+
+class JSONLSink:
+    """Append one JSON object per row, flushing every batch"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+    
+    def write(self, rows: List[Dict]):
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+
+def _quote_identifier(name: str) -> str:
+    """SQLite identifier literal for a table or column name (embedded quotes doubled)"""
+    return '"' + name.replace('"', '""') + '"'
+
+class SQLiteSink:
+    """Insert rows into an SQLite table (created from the first row), committing every batch"""
+    
+    def __init__(self, path: str, table: str = 'opportunities'):
+        self.path = path
+        self.table = table
+        self.conn = sqlite3.connect(path)
+        self.columns = None
+    
+    def write(self, rows: List[Dict]):
+        if not rows:
+            return
+        table = _quote_identifier(self.table)
+        if self.columns is None:
+            self.columns = list(rows[0])
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(map(_quote_identifier, self.columns))})"
+            )
+        
+        placeholders = ', '.join('?' for _ in self.columns)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(map(_quote_identifier, self.columns))}) VALUES ({placeholders})",
+                [tuple(json.dumps(row[c]) if isinstance(row[c], list) else row[c] for c in self.columns)
+                 for row in rows]
+            )
+    
+    def close(self):
+        self.conn.close()
+
+def run_pipeline(rows: Iterable[Dict], sinks: List, batch_size: int = 50) -> int:
+    """Drain a row stream into every sink in small batches; returns rows written
+    
+    Sinks flush after each batch, so a crash keeps everything written so far
+    and memory stays bounded by one batch.
+    """
+    rows = iter(rows)
+    written = 0
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            for sink in sinks:
+                sink.write(batch)
+            written += len(batch)
+    finally:
+        for sink in sinks:
+            sink.close()
+    
+    return written
+
+def main():
+    """Stream Berlin opportunities straight to CSV/JSONL/SQLite files"""
+    from berlin_business_finder import BerlinBusinessFinder
+    
+    parser = argparse.ArgumentParser(description="Stream GMB opportunities to one or more sinks")
+    parser.add_argument('--niche', help="Only search one target category group")
+    parser.add_argument('--min-score', type=int, default=30)
+    parser.add_argument('--max-score', type=int, default=70)
+    parser.add_argument('--csv', help="Append rows to this CSV file")
+    parser.add_argument('--jsonl', help="Append rows to this JSON Lines file")
+    parser.add_argument('--sqlite', help="Insert rows into this SQLite database")
+    args = parser.parse_args()
+    
+    api_key = os.getenv('GOOGLE_PLACES_API_KEY')
+    if not api_key:
+        print("Please set your Google Places API key in GOOGLE_PLACES_API_KEY environment variable")
+        return
+    
+    sinks = []
+    if args.csv:
+        sinks.append(CSVSink(args.csv))
+    if args.jsonl:
+        sinks.append(JSONLSink(args.jsonl))
+    if args.sqlite:
+        sinks.append(SQLiteSink(args.sqlite))
+    if not sinks:
+        sinks.append(CSVSink('berlin_gmb_opportunities_stream.csv'))
+    
+    finder = BerlinBusinessFinder(api_key)
+    written = run_pipeline(
+        finder.iter_gmb_opportunities(niche=args.niche, min_score=args.min_score, max_score=args.max_score),
+        sinks
+    )
+    print(f"Wrote {written} opportunities")
+
+if __name__ == "__main__":
+    main()
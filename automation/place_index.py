@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Sweep Deduplication Index
+Tracks which categories each place_id was found under so it is fetched and scored once
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class PlaceIndex:
+    """Set-backed index of the place_ids seen in a sweep and every category they matched"""
+    
+    def __init__(self):
+        self._categories: Dict[str, List[Tuple[str, str]]] = {}
+        self.sightings = 0
+    
+    @classmethod
+    def from_searches(cls, searches: Iterable[Tuple[str, str, str]],
+                      place_ids_by_query: Dict[str, List[str]]) -> 'PlaceIndex':
+        """Index (category_group, category, query) searches in order"""
+        index = cls()
+        for group, category, query in searches:
+            for place_id in place_ids_by_query.get(query, []):
+                index.add(place_id, group, category)
+        return index
+    
+    def add(self, place_id: str, group: str, category: str) -> bool:
+        """Record a sighting; True if this is the first time the place was seen"""
+        self.sightings += 1
+        categories = self._categories.get(place_id)
+        if categories is None:
+            self._categories[place_id] = [(group, category)]
+            return True
+        if (group, category) not in categories:
+            categories.append((group, category))
+        return False
+    
+    def __contains__(self, place_id: str) -> bool:
+        return place_id in self._categories
+    
+    def __len__(self) -> int:
+        return len(self._categories)
+    
+    @property
+    def duplicates(self) -> int:
+        """Sightings that did not need a fetch or a score of their own"""
+        return self.sightings - len(self._categories)
+    
+    def categories(self, place_id: str) -> List[Tuple[str, str]]:
+        """Every (category_group, category) the place matched, first sighting first"""
+        return self._categories.get(place_id, [])
+    
+    def places(self, group: Optional[str] = None) -> List[str]:
+        """Unique place_ids in first-seen order, optionally only those found in one group"""
+        if group is None:
+            return list(self._categories)
+        return [place_id for place_id, categories in self._categories.items()
+                if any(g == group for g, _ in categories)]
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Persistent Places API Response Cache
+Content-addressed SQLite cache with per-endpoint TTLs and LRU eviction
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CACHE_PATH = os.getenv('PLACES_CACHE_PATH', 'places_cache.db')
+
+# Seconds before a cached response is considered stale
+DEFAULT_TTLS = {
+    'details': 7 * 24 * 3600,
+    'textsearch': 24 * 3600,
+    'nearbysearch': 24 * 3600
+}
+DEFAULT_MAX_ENTRIES = 100000
+# Other processes may write the same file, so the in-memory entry count is
+# re-read from the table at least this often and before any eviction
+RECOUNT_INTERVAL = 1000
+
+class PlacesResponseCache:
+    """Cache Places responses on disk, keyed on endpoint + request params"""
+    
+    def __init__(self, path: str = CACHE_PATH, ttls: Optional[Dict[str, int]] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._recount()
+    
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> str:
+        """Stable hash of endpoint + params (the API key is never part of the key)"""
+        material = {k: v for k, v in params.items() if k != 'key'}
+        blob = json.dumps([endpoint, material], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+    
+    def _recount(self):
+        """Resync the entry count with the table (caller holds the lock, or is __init__)"""
+        self._entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        self._inserts_since_recount = 0
+    
+    def get(self, endpoint: str, params: Dict) -> Optional[Any]:
+        """Return the cached payload, or None on a miss or expired entry"""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            
+            if row[1] <= now:
+                self._entries -= self.conn.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.stats['hits'] += 1
+        
+        return json.loads(row[0])
+    
+    def set(self, endpoint: str, params: Dict, payload: Any):
+        """Store a payload with the endpoint's TTL, evicting least-recently-used entries"""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        ttl = self.ttls.get(endpoint, DEFAULT_TTLS['details'])
+        blob = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+        
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO responses (key, endpoint, payload, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, blob, now + ttl, now)
+            )
+            if cursor.rowcount:
+                self._entries += 1
+                self._inserts_since_recount += 1
+            else:
+                self.conn.execute(
+                    "UPDATE responses SET payload = ?, expires_at = ?, last_access = ? WHERE key = ?",
+                    (blob, now + ttl, now, key)
+                )
+            
+            if self._entries > self.max_entries or self._inserts_since_recount >= RECOUNT_INTERVAL:
+                self._recount()
+                if self._entries > self.max_entries:
+                    self._evict(self._entries - self.max_entries)
+    
+    def _evict(self, count: int):
+        """Drop the `count` least-recently-used entries (caller holds the lock)"""
+        removed = self.conn.execute('''
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_access LIMIT ?
+            )
+        ''', (count,)).rowcount
+        self._entries -= removed
+        self.stats['evictions'] += removed
+    
+    def purge_expired(self) -> int:
+        """Delete every expired entry; returns how many were removed"""
+        with self._lock:
+            removed = self.conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._entries -= removed
+        return removed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current size and hit rate"""
+        with self._lock:
+            stats = dict(self.stats, entries=self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def default_cache() -> PlacesResponseCache:
+    """Process-wide cache at CACHE_PATH, shared by the finder scripts"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PlacesResponseCache()
+        return _default_cache
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Google Places API Client
+Concurrent, rate-limited search and details fetching with retry and backoff
+"""
+
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from places_cache import PlacesResponseCache
+
+PLACES_BASE_URL = "https://maps.googleapis.com/maps/api/place"
+
+# Details fields each pipeline actually reads. Scoring only needs len(photos) and
+# user_ratings_total, so the bulky `reviews` array is never requested.
+SCORING_FIELDS = ('name', 'formatted_address', 'formatted_phone_number', 'website',
+                  'opening_hours', 'photos', 'rating', 'user_ratings_total')
+FIELD_PROFILES = {
+    'scoring': ','.join(SCORING_FIELDS),
+    'outreach': ','.join(SCORING_FIELDS + ('url',))
+}
+# Superset of every profile. The cache is keyed on the mask, so all profiles are
+# fetched and cached under this one; its extra field (url) is Basic Data and
+# adds nothing to the billed SKUs.
+DETAILS_FIELDS = FIELD_PROFILES['outreach']
+_DETAILS_FIELD_SET = set(DETAILS_FIELDS.split(','))
+
+# Places statuses that are transient and worth retrying
+RETRYABLE_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+# Details statuses meaning the place_id no longer resolves; retrying won't help
+GONE_STATUSES = {'NOT_FOUND', 'INVALID_REQUEST'}
+RETRYABLE_HTTP_CODES = {429, 500, 502, 503, 504}
+
+# A next_page_token answers INVALID_REQUEST until it becomes valid (~2s after issue);
+# poll it on a short interval instead of sleeping a fixed worst case
+PAGE_TOKEN_FIRST_POLL = 1.5
+PAGE_TOKEN_POLL_INTERVAL = 0.5
+PAGE_TOKEN_MAX_POLLS = 10
+
+def resolve_fields(fields: str) -> str:
+    """Mask to request for a profile name ('scoring', 'outreach') or explicit mask
+    
+    Anything DETAILS_FIELDS covers is widened to it, so one cached response
+    serves every pipeline; other masks are requested as given.
+    """
+    mask = FIELD_PROFILES.get(fields, fields)
+    return DETAILS_FIELDS if set(mask.split(',')) <= _DETAILS_FIELD_SET else mask
+
+def compact_details(result: Dict) -> Dict:
+    """Shrink a details result for storage, keeping everything the scorers read
+    
+    Photos and reviews keep their list length (scorers count them) but lose
+    attributions and review text; opening_hours keeps only weekday_text.
+    """
+    compact = dict(result)
+    if 'photos' in compact:
+        compact['photos'] = [{'photo_reference': p.get('photo_reference')} for p in compact['photos']]
+    if 'reviews' in compact:
+        compact['reviews'] = [{'rating': r.get('rating'), 'time': r.get('time')} for r in compact['reviews']]
+    if compact.get('opening_hours'):
+        compact['opening_hours'] = {'weekday_text': compact['opening_hours'].get('weekday_text', [])}
+    return compact
+
+class SearchResults(list):
+    """Results of one paginated search; `complete` is False when a request failed part-way"""
+    
+    def __init__(self, results: Iterable[Dict] = (), complete: bool = True):
+        super().__init__(results)
+        self.complete = complete
+
+class TokenBucket:
+    """Thread-safe token bucket limiting requests per second"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class PlacesClient:
+    """Places API client with bounded concurrency, rate limiting and retries"""
+    
+    def __init__(self, api_key: str, base_url: str = PLACES_BASE_URL, max_workers: int = 8,
+                 requests_per_second: float = 10, max_retries: int = 4,
+                 backoff_base: float = 0.5, timeout: float = 10,
+                 cache: Optional[PlacesResponseCache] = None, compact: bool = True):
+        self.api_key = api_key
+        self.cache = cache
+        self.compact = compact
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.limiter = TokenBucket(requests_per_second)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._local = threading.local()
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0, 'page_polls': 0}
+        self._stats_lock = threading.Lock()
+    
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    @property
+    def session(self) -> requests.Session:
+        """One requests.Session per worker thread (sessions aren't thread-safe)"""
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+    
+    def _backoff(self, attempt: int):
+        """Exponential backoff with jitter"""
+        time.sleep(self.backoff_base * (2 ** attempt) * (0.5 + random.random()))
+    
+    def request(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """GET an endpoint (e.g. 'details/json'), retrying transient failures"""
+        url = f"{self.base_url}/{endpoint}"
+        params = dict(params, key=self.api_key)
+        
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            self._count('requests')
+            
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code in RETRYABLE_HTTP_CODES:
+                    raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.raise_for_status()
+                data = response.json()
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                retryable = not isinstance(e, requests.HTTPError) or (
+                    e.response is not None and e.response.status_code in RETRYABLE_HTTP_CODES
+                )
+                if retryable and attempt < self.max_retries:
+                    self._count('retries')
+                    self._backoff(attempt)
+                    continue
+                print(f"Error requesting {endpoint}: {e}")
+                self._count('errors')
+                return None
+            except (requests.RequestException, ValueError) as e:
+                print(f"Error requesting {endpoint}: {e}")
+                self._count('errors')
+                return None
+            
+            if data.get('status') in RETRYABLE_STATUSES and attempt < self.max_retries:
+                self._count('retries')
+                self._backoff(attempt)
+                continue
+            
+            return data
+        
+        self._count('errors')
+        return None
+    
+    def text_search(self, query: str, **params) -> List[Dict]:
+        """Run a text search and follow next_page_token pagination"""
+        return self.search_many([query], **params)[query]
+    
+    def details(self, place_id: str, fields: str = DETAILS_FIELDS) -> Optional[Dict]:
+        """Get detailed information about a single place
+        
+        `fields` is a FIELD_PROFILES name or an explicit comma-separated mask.
+        Returns {} when the place no longer exists and None when the request
+        failed, so callers can tell a finished lookup from one to retry.
+        """
+        params = {'place_id': place_id, 'fields': resolve_fields(fields)}
+        
+        if self.cache:
+            cached = self.cache.get('details', params)
+            if cached is not None:
+                return cached
+        
+        data = self.request('details/json', params)
+        
+        if data and data.get('status') == 'OK':
+            result = data.get('result', {})
+            if self.compact:
+                result = compact_details(result)
+            if self.cache:
+                self.cache.set('details', params, result)
+            return result
+        if data and data.get('status') in GONE_STATUSES:
+            return {}
+        return None
+    
+    def search_many(self, queries: Iterable[str], **params) -> Dict[str, List[Dict]]:
+        """Run several text searches concurrently; returns results per query"""
+        queries = list(queries)
+        results = dict(self.iter_search(queries, **params))
+        return {query: results[query] for query in queries}
+    
+    def iter_search(self, queries: Iterable[str], **params) -> Iterator[Tuple[str, SearchResults]]:
+        """Run several text searches concurrently, yielding (query, results) as each finishes"""
+        searches = {query: dict(params, query=query) for query in queries}
+        return self.iter_paginated('textsearch', searches)
+    
+    def iter_nearby(self, searches: Dict[Hashable, Dict]) -> Iterator[Tuple[Hashable, SearchResults]]:
+        """Run several nearby searches (location/radius/type params) concurrently, yielding (key, results) as each finishes"""
+        return self.iter_paginated('nearbysearch', searches)
+    
+    def iter_paginated(self, endpoint: str, searches: Dict[Hashable, Dict]) -> Iterator[Tuple[Hashable, SearchResults]]:
+        """Run paginated searches ('textsearch' or 'nearbysearch') concurrently
+        
+        `searches` maps any hashable key to the request params; yields
+        (key, results) as each search finishes. Pagination is interleaved
+        across searches: each next_page_token is scheduled on a heap and
+        polled as soon as it may be valid, so one search's token delay
+        overlaps with requests for the others. A search whose request failed
+        yields the pages it got with `results.complete` False.
+        """
+        url = f'{endpoint}/json'
+        results = {}
+        pending = {}
+        
+        for key, search_params in searches.items():
+            # Page tokens expire quickly, so the merged result list is what gets cached
+            cached = self.cache.get(endpoint, search_params) if self.cache else None
+            if cached is not None:
+                yield key, SearchResults(cached)
+            else:
+                results[key] = SearchResults()
+                pending[key] = search_params
+        
+        in_flight = {}  # future -> (key, page_token, polls)
+        waiting = []    # heap of (ready_at, seq, key, page_token, polls)
+        seq = 0
+        
+        for key, search_params in pending.items():
+            future = self.executor.submit(self.request, url, search_params)
+            in_flight[future] = (key, None, 0)
+        
+        while in_flight or waiting:
+            now = time.monotonic()
+            while waiting and waiting[0][0] <= now:
+                _, _, key, token, polls = heapq.heappop(waiting)
+                future = self.executor.submit(self.request, url, {'pagetoken': token})
+                in_flight[future] = (key, token, polls)
+            
+            timeout = max(0.0, waiting[0][0] - now) if waiting else None
+            if not in_flight:
+                time.sleep(timeout)
+                continue
+            
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, token, polls = in_flight.pop(future)
+                data = future.result()
+                status = data.get('status') if data else None
+                
+                if token and status == 'INVALID_REQUEST' and polls < PAGE_TOKEN_MAX_POLLS:
+                    # Token not live yet - poll again shortly
+                    self._count('page_polls')
+                    seq += 1
+                    heapq.heappush(waiting, (time.monotonic() + PAGE_TOKEN_POLL_INTERVAL, seq, key, token, polls + 1))
+                    continue
+                
+                if status == 'OK':
+                    results[key].extend(data.get('results', []))
+                    if 'next_page_token' in data:
+                        seq += 1
+                        heapq.heappush(waiting, (time.monotonic() + PAGE_TOKEN_FIRST_POLL, seq, key, data['next_page_token'], 0))
+                        continue
+                    complete = True
+                else:
+                    complete = status == 'ZERO_RESULTS'
+                
+                # Only complete result lists are cached; failed searches yield what they got
+                if self.cache and complete:
+                    self.cache.set(endpoint, pending[key], results[key])
+                results[key].complete = complete
+                yield key, results.pop(key)
+    
+    def details_many(self, place_ids: Iterable[str], fields: str = DETAILS_FIELDS) -> Dict[str, Optional[Dict]]:
+        """Fetch details for many places concurrently; returns details per place_id"""
+        place_ids = list(dict.fromkeys(place_ids))
+        results = self.executor.map(lambda pid: self.details(pid, fields), place_ids)
+        return dict(zip(place_ids, results))
+    
+    def close(self):
+        """Shut down the worker threads"""
+        self.executor.shutdown(wait=True)
@@ -8,6 +8,10 @@ import requests
 import pandas as pd
 import time
 import os
+from places_cache import default_cache
+from places_client import compact_details, resolve_fields
+from scoring_engine import score_listing
+from listing_tracker import ListingTracker, print_delta
 
 def search_businesses(query, api_key):
     """Search for businesses in Berlin"""
@@ -38,16 +42,24 @@ def get_business_details(place_id, api_key):
     url = "https://maps.googleapis.com/maps/api/place/details/json"
     params = {
         'place_id': place_id,
-        'fields': 'name,formatted_address,formatted_phone_number,website,opening_hours,photos,reviews,rating,user_ratings_total',
+        'fields': resolve_fields('scoring'),
         'key': api_key
     }
     
+    # Reuse details fetched by any earlier run or script
+    cache = default_cache()
+    cached = cache.get('details', params)
+    if cached is not None:
+        return cached
+    
     try:
         response = requests.get(url, params=params)
         data = response.json()
         
         if data.get('status') == 'OK':
-            return data.get('result', {})
+            result = compact_details(data.get('result', {}))
+            cache.set('details', params, result)
+            return result
         else:
             return {}
             
@@ -57,78 +69,22 @@ def get_business_details(place_id, api_key):
 def analyze_gmb_opportunity(business):
     """Analyze real optimization opportunities"""
     
-    issues = []
-    improvements = []
-    
-    # Check what's missing or could be improved
-    phone = business.get('formatted_phone_number', '')
-    website = business.get('website', '')
-    hours = business.get('opening_hours', {})
-    photos = business.get('photos', [])
-    rating = business.get('rating', 0)
-    review_count = business.get('user_ratings_total', 0)
-    
-    # Identify specific opportunities
-    if not phone:
-        issues.append("No phone number listed")
-        improvements.append("Add phone number")
-    
-    if not website:
-        issues.append("No website listed") 
-        improvements.append("Add website URL")
-    
-    if not hours:
-        issues.append("Business hours not specified")
-        improvements.append("Add complete business hours")
-    
-    photo_count = len(photos)
-    if photo_count < 5:
-        issues.append("Only {} photos".format(photo_count))
-        improvements.append("Add more photos (need 10+ for best results)")
-    elif photo_count < 10:
-        improvements.append("Add more photos (currently {} - aim for 15+)".format(photo_count))
-    
-    if review_count < 5:
-        issues.append("Only {} reviews".format(review_count))
-        improvements.append("Implement review generation strategy")
-    elif review_count < 15:
-        improvements.append("Could benefit from more reviews (currently {})".format(review_count))
-    
-    if rating > 0 and rating < 4.0:
-        issues.append("Low rating: {} stars".format(rating))
-        improvements.append("Address review management and customer service")
-    
-    # Determine if this is a good prospect
-    issue_count = len(issues)
-    improvement_count = len(improvements)
-    
-    if issue_count >= 2:
-        opportunity_level = "HIGH"
-        package = "Premium Package (€700)"
-        priority = 1
-    elif issue_count >= 1 or improvement_count >= 3:
-        opportunity_level = "MEDIUM"
-        package = "Standard Package (€400)"
-        priority = 2
-    elif improvement_count >= 1:
-        opportunity_level = "LOW"
-        package = "Basic Optimization (€250)"
-        priority = 3
-    else:
+    row = score_listing(business, 'realistic')
+    if row['opportunity_level'] is None:
         return None  # Already well optimized
     
     return {
-        'opportunity_level': opportunity_level,
-        'package': package,
-        'priority': priority,
-        'issues': issues,
-        'improvements': improvements,
-        'photo_count': photo_count,
-        'rating': rating,
-        'review_count': review_count,
-        'missing_phone': not bool(phone),
-        'missing_website': not bool(website),
-        'missing_hours': not bool(hours)
+        'opportunity_level': row['opportunity_level'],
+        'package': row['package'],
+        'priority': int(row['priority']),
+        'issues': row['issues'],
+        'improvements': row['improvements'],
+        'photo_count': int(row['photo_count']),
+        'rating': business.get('rating', 0),
+        'review_count': business.get('user_ratings_total', 0),
+        'missing_phone': not row['has_phone'],
+        'missing_website': not row['has_website'],
+        'missing_hours': not row['has_hours']
     }
 
 def main():
@@ -149,17 +105,17 @@ def main():
         "barber shop Berlin"
     ]
     
-    all_opportunities = []
+    listings = []
     
     for query in search_queries:
         print("\n🔍 Searching:", query)
         businesses = search_businesses(query, api_key)
         print("Found {} businesses".format(len(businesses)))
         
-        # Analyze each business for opportunities
+        # Fetch details (cached listings are only re-fetched once they expire)
         for i, business in enumerate(businesses[:3]):  # Limit to 3 per search
             name = business.get('name', 'Unknown')
-            print("  Analyzing {}/3: {}".format(i+1, name))
+            print("  Fetching {}/3: {}".format(i+1, name))
             
             place_id = business.get('place_id')
             if not place_id:
@@ -170,32 +126,49 @@ def main():
             if not details:
                 continue
             
-            # Analyze opportunities
-            analysis = analyze_gmb_opportunity(details)
-            
-            if analysis:  # Only include if there are opportunities
-                opportunity = {
-                    'name': details.get('name', 'Unknown'),
-                    'address': details.get('formatted_address', ''),
-                    'phone': details.get('formatted_phone_number', 'MISSING - OPPORTUNITY!'),
-                    'website': details.get('website', 'MISSING - OPPORTUNITY!'),
-                    'opportunity_level': analysis['opportunity_level'],
-                    'package': analysis['package'],
-                    'priority': analysis['priority'],
-                    'photos': analysis['photo_count'],
-                    'rating': analysis['rating'],
-                    'reviews': analysis['review_count'],
-                    'main_issues': ' | '.join(analysis['issues']),
-                    'improvements': ' | '.join(analysis['improvements'][:2]),
-                    'category': query.split()[0]
-                }
-                all_opportunities.append(opportunity)
-                print("    ✅ OPPORTUNITY FOUND: {} - {}".format(analysis['opportunity_level'], analysis['package']))
-            else:
-                print("    ❌ Already well optimized")
-            
+            listings.append((query, place_id, details))
             time.sleep(0.5)  # Be nice to API
     
+    # Analyze opportunities - only listings that changed since the last run are re-scored
+    all_opportunities = []
+    delta = None
+    if listings:
+        tracker = ListingTracker(profile='realistic')
+        analyzed, delta = tracker.update(
+            [place_id for _, place_id, _ in listings],
+            [details for _, _, details in listings],
+            lambda f: f['opportunity_level'].notna()
+        )
+        tracker.close()
+    
+    for query, place_id, details in listings:
+        analysis = analyzed.loc[place_id]
+        
+        if analysis['is_prospect']:  # Only include if there are opportunities
+            opportunity = {
+                'name': details.get('name', 'Unknown'),
+                'address': details.get('formatted_address', ''),
+                'phone': details.get('formatted_phone_number', 'MISSING - OPPORTUNITY!'),
+                'website': details.get('website', 'MISSING - OPPORTUNITY!'),
+                'opportunity_level': analysis['opportunity_level'],
+                'package': analysis['package'],
+                'priority': int(analysis['priority']),
+                'photos': int(analysis['photo_count']),
+                'rating': details.get('rating', 0),
+                'reviews': details.get('user_ratings_total', 0),
+                'main_issues': ' | '.join(analysis['issues']),
+                'improvements': ' | '.join(analysis['improvements'][:2]),
+                'category': query.split()[0]
+            }
+            all_opportunities.append(opportunity)
+            print("  ✅ OPPORTUNITY FOUND: {} - {} - {}".format(
+                opportunity['name'], analysis['opportunity_level'], analysis['package']))
+        else:
+            print("  ❌ Already well optimized: {}".format(details.get('name', 'Unknown')))
+    
+    if delta:
+        print_delta(delta)
+    
     # Results
     if all_opportunities:
         print("\n" + "="*60)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+GMB Listing Scoring Engine
+Vectorized scoring of place details with the finders' rule sets as named profiles
+"""
+
+import hashlib
+import re
+from types import CodeType
+from typing import Dict, Iterable, List, Union
+
+import numpy as np
+import pandas as pd
+
+# Columns every profile scores from; extract_features builds them from details dicts
+FEATURE_COLUMNS = ['has_name', 'has_address', 'has_phone', 'has_website', 'has_hours',
+                   'photo_count', 'rating', 'review_count', 'has_reviews']
+
+# (min photos, points, tier) - first matching tier wins
+PHOTO_TIERS = [(10, 20, 'sufficient'), (5, 15, 'some'), (1, 10, 'few')]
+# (min rating, min reviews, points, tier)
+REVIEW_TIERS = [(4.5, 20, 25, 'excellent'), (4.0, 10, 20, 'good'), (3.5, 5, 15, 'average'), (0, 1, 10, 'some')]
+
+def _missing(column: str):
+    return lambda f: ~f[column]
+
+# Rule sets of the original per-dict scorers. Scored profiles add up the basic info,
+# photo and review points plus `base_points`; `levels` are (score below, level, package).
+# The realistic profile has no score and grades on how many issues/improvements fire.
+PROFILES = {
+    'finder': {
+        'base_points': 10,
+        'activity_points': 10,
+        'levels': [(40, 'High Opportunity', 'Premium Package (€700)'),
+                   (60, 'Medium Opportunity', 'Standard Package (€400)'),
+                   (None, 'Low Opportunity', 'Basic Touch-up (€200)')],
+        'issues': [
+            ('Add business hours', _missing('has_hours')),
+            ('Add phone number', _missing('has_phone')),
+            ('Add website', _missing('has_website')),
+            ('Add more photos', lambda f: f['photo_tier'] != 'sufficient'),
+            ('Improve review strategy', lambda f: f['review_tier'] != 'good')
+        ]
+    },
+    'simple': {
+        'base_points': 15,
+        'levels': [(40, 'HIGH', 'Premium Package (€700)'),
+                   (60, 'MEDIUM', 'Standard Package (€400)'),
+                   (None, 'LOW', 'Basic Package (€200)')],
+        'issues': [
+            ('Missing phone number', _missing('has_phone')),
+            ('Missing website', _missing('has_website')),
+            ('Missing business hours', _missing('has_hours')),
+            ('No photos', lambda f: f['photo_count'] == 0),
+            ('Need more photos', lambda f: f['photo_count'] < 10),
+            ('No reviews', lambda f: f['review_tier'] == ''),
+            ('Need more reviews', lambda f: f['review_count'] < 10)
+        ]
+    },
+    'opportunities': {
+        'base_points': 15,
+        'levels': [(40, 'HIGH', 'Premium Package (€700)'),
+                   (60, 'MEDIUM', 'Standard Package (€400)'),
+                   (None, 'LOW', 'Basic Package (€200)')],
+        'issues': [
+            ('Missing phone number', _missing('has_phone')),
+            ('Missing website', _missing('has_website')),
+            ('Missing business hours', _missing('has_hours')),
+            ('No photos', lambda f: f['photo_count'] == 0),
+            ('Need more photos ({photo_count} currently)', lambda f: f['photo_count'] < 8),
+            ('No reviews', lambda f: f['review_tier'] == ''),
+            ('Need more reviews ({review_count} currently)', lambda f: f['review_count'] < 10)
+        ]
+    },
+    'realistic': {
+        'issues': [
+            ('No phone number listed', _missing('has_phone')),
+            ('No website listed', _missing('has_website')),
+            ('Business hours not specified', _missing('has_hours')),
+            ('Only {photo_count} photos', lambda f: f['photo_count'] < 5),
+            ('Only {review_count} reviews', lambda f: f['review_count'] < 5),
+            ('Low rating: {rating} stars', lambda f: (f['rating'] > 0) & (f['rating'] < 4.0))
+        ],
+        'improvements': [
+            ('Add phone number', _missing('has_phone')),
+            ('Add website URL', _missing('has_website')),
+            ('Add complete business hours', _missing('has_hours')),
+            ('Add more photos (need 10+ for best results)', lambda f: f['photo_count'] < 5),
+            ('Add more photos (currently {photo_count} - aim for 15+)',
+             lambda f: (f['photo_count'] >= 5) & (f['photo_count'] < 10)),
+            ('Implement review generation strategy', lambda f: f['review_count'] < 5),
+            ('Could benefit from more reviews (currently {review_count})',
+             lambda f: (f['review_count'] >= 5) & (f['review_count'] < 15)),
+            ('Address review management and customer service',
+             lambda f: (f['rating'] > 0) & (f['rating'] < 4.0))
+        ]
+    }
+}
+
+def extract_features(records: Iterable[Dict]) -> pd.DataFrame:
+    """Columnar FEATURE_COLUMNS frame from Places details dicts (one row per record)"""
+    records = list(records)
+    return pd.DataFrame({
+        'has_name': np.array([bool(r.get('name')) for r in records], dtype=bool),
+        'has_address': np.array([bool(r.get('formatted_address')) for r in records], dtype=bool),
+        'has_phone': np.array([bool(r.get('formatted_phone_number')) for r in records], dtype=bool),
+        'has_website': np.array([bool(r.get('website')) for r in records], dtype=bool),
+        'has_hours': np.array([bool(r.get('opening_hours')) for r in records], dtype=bool),
+        'photo_count': np.array([len(r.get('photos') or ()) for r in records], dtype=np.int64),
+        'rating': np.array([r.get('rating') or 0 for r in records], dtype=np.float64),
+        'review_count': np.array([r.get('user_ratings_total') or 0 for r in records], dtype=np.int64),
+        'has_reviews': np.array([bool(r.get('reviews')) for r in records], dtype=bool)
+    })
+
+def _format_value(value) -> str:
+    """Print a feature the way str.format printed the original JSON value"""
+    return '{:g}'.format(value) if isinstance(value, float) else str(value)
+
+def _apply_rules(frame: pd.DataFrame, rules: List) -> tuple:
+    """Evaluate (label, condition) rules; returns (per-row bitmask of fired rules, per-row counts)"""
+    flags = np.zeros(len(frame), dtype=np.int64)
+    count = np.zeros(len(frame), dtype=np.int64)
+    
+    for bit, (_, condition) in enumerate(rules):
+        mask = np.asarray(condition(frame), dtype=bool)
+        flags |= mask.astype(np.int64) << bit
+        count += mask
+    
+    return flags, count
+
+def rule_labels(frame: pd.DataFrame, rules: List, flags: np.ndarray) -> List[List[str]]:
+    """Expand rule bitmasks into per-row label lists, filling {column} placeholders
+    
+    Fixed labels are resolved once per distinct bitmask; only templated labels
+    are formatted per row, and only for the rows where their rule fired.
+    """
+    masks, inverse = np.unique(flags, return_inverse=True)
+    per_mask = [[label for bit, (label, _) in enumerate(rules) if mask >> bit & 1] for mask in masks]
+    labels = [list(per_mask[i]) for i in inverse]
+    
+    for bit, (label, _) in enumerate(rules):
+        fields = re.findall(r'\{(\w+)\}', label)
+        if not fields:
+            continue
+        
+        rows = np.flatnonzero(flags >> bit & 1)
+        columns = [frame[field].to_numpy()[rows].tolist() for field in fields]
+        texts = {}  # counts repeat a lot, so format each distinct value once
+        for row, *values in zip(rows.tolist(), *columns):
+            key = tuple(values)
+            if key not in texts:
+                texts[key] = label.format(**{field: _format_value(value) for field, value in zip(fields, key)})
+            row_labels = labels[row]
+            row_labels[row_labels.index(label)] = texts[key]
+    
+    return labels
+
+def _tier(conditions: List, tiers: List[str], points: List[int]) -> tuple:
+    """First-match tier name and points for every row"""
+    return (np.select(conditions, tiers, default=''),
+            np.select(conditions, points, default=0))
+
+def score_listings(data: Union[pd.DataFrame, Iterable[Dict]], profile: str = 'finder',
+                   labels: bool = True) -> pd.DataFrame:
+    """Score a batch of listings with a named profile in vectorized passes
+    
+    `data` is either details dicts or a frame already holding FEATURE_COLUMNS
+    (e.g. a cached feature table). Returns the features plus score, tiers,
+    opportunity_level, package, priority and issue bitmasks/counts; with
+    `labels` the issue (and improvement) text lists are added as well.
+    """
+    rules = PROFILES[profile]
+    frame = data.copy() if isinstance(data, pd.DataFrame) else extract_features(data)
+    
+    photos = frame['photo_count'].to_numpy()
+    frame['photo_tier'], photo_points = _tier(
+        [photos >= minimum for minimum, _, _ in PHOTO_TIERS],
+        [tier for _, _, tier in PHOTO_TIERS],
+        [points for _, points, _ in PHOTO_TIERS]
+    )
+    
+    rating = frame['rating'].to_numpy()
+    reviews = frame['review_count'].to_numpy()
+    frame['review_tier'], review_points = _tier(
+        [(rating >= min_rating) & (reviews >= min_reviews) for min_rating, min_reviews, _, _ in REVIEW_TIERS],
+        [tier for _, _, _, tier in REVIEW_TIERS],
+        [points for _, _, points, _ in REVIEW_TIERS]
+    )
+    
+    issue_flags, frame['issue_count'] = _apply_rules(frame, rules['issues'])
+    frame['issue_flags'] = issue_flags
+    if labels:
+        frame['issues'] = rule_labels(frame, rules['issues'], issue_flags)
+    
+    if 'levels' in rules:
+        basic = frame[['has_name', 'has_address', 'has_phone', 'has_website', 'has_hours']].sum(axis=1) * 5
+        score = basic.to_numpy() + photo_points + review_points + rules['base_points']
+        if rules.get('activity_points'):
+            active = frame['has_reviews'].to_numpy() | (reviews > 0)
+            score = score + np.where(active, rules['activity_points'], 0)
+        frame['score'] = score
+        
+        conditions = [score < limit if limit is not None else np.ones(len(frame), dtype=bool)
+                      for limit, _, _ in rules['levels']]
+        frame['opportunity_level'] = np.select(conditions, [level for _, level, _ in rules['levels']])
+        frame['package'] = np.select(conditions, [package for _, _, package in rules['levels']])
+        frame['priority'] = np.select(conditions, list(range(1, len(conditions) + 1)))
+    else:
+        improvement_flags, improvement_count = _apply_rules(frame, rules['improvements'])
+        frame['improvement_flags'] = improvement_flags
+        if labels:
+            frame['improvements'] = rule_labels(frame, rules['improvements'], improvement_flags)
+        issue_count = frame['issue_count'].to_numpy()
+        conditions = [issue_count >= 2,
+                      (issue_count >= 1) | (improvement_count >= 3),
+                      improvement_count >= 1]
+        # Rows matching no condition are already well optimized (level None)
+        frame['opportunity_level'] = np.select(conditions, ['HIGH', 'MEDIUM', 'LOW'], default=None)
+        frame['package'] = np.select(
+            conditions, ['Premium Package (€700)', 'Standard Package (€400)', 'Basic Optimization (€250)'], default=None
+        )
+        frame['priority'] = np.select(conditions, [1, 2, 3], default=0)
+    
+    return frame
+
+def _code_key(code: CodeType) -> tuple:
+    """Bytecode, constants and names of a function (not its line numbers), so edited rules read as changed"""
+    consts = tuple(_code_key(c) if isinstance(c, CodeType) else repr(c) for c in code.co_consts)
+    return code.co_code.hex(), consts, code.co_names
+
+def _rules_key(value):
+    if callable(value):
+        cells = tuple(_rules_key(cell.cell_contents) for cell in value.__closure__ or ())
+        return _code_key(value.__code__), cells
+    if isinstance(value, dict):
+        return tuple((key, _rules_key(item)) for key, item in sorted(value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_rules_key(item) for item in value)
+    return repr(value)
+
+def profile_version(profile: str) -> str:
+    """Digest of everything a profile scores with; it changes whenever the profile's results could"""
+    material = repr((_rules_key(PROFILES[profile]), PHOTO_TIERS, REVIEW_TIERS, _code_key(score_listings.__code__)))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:16]
+
+def score_listing(record: Dict, profile: str = 'finder') -> Dict:
+    """Score a single details dict; returns the result row as a dict"""
+    return score_listings([record], profile).iloc[0].to_dict()
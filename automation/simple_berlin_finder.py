@@ -7,6 +7,9 @@ import requests
 import pandas as pd
 import time
 import os
+from places_cache import default_cache
+from places_client import compact_details, resolve_fields
+from scoring_engine import score_listing
 
 def search_berlin_restaurants(api_key):
     """Find Berlin restaurants with GMB issues"""
@@ -37,16 +40,24 @@ def get_business_details(place_id, api_key):
     url = "https://maps.googleapis.com/maps/api/place/details/json"
     params = {
         'place_id': place_id,
-        'fields': 'name,formatted_address,formatted_phone_number,website,opening_hours,photos,reviews,rating,user_ratings_total',
+        'fields': resolve_fields('scoring'),
         'key': api_key
     }
     
+    # Reuse details fetched by any earlier run or script
+    cache = default_cache()
+    cached = cache.get('details', params)
+    if cached is not None:
+        return cached
+    
     try:
         response = requests.get(url, params=params)
         data = response.json()
         
         if data.get('status') == 'OK':
-            return data.get('result', {})
+            result = compact_details(data.get('result', {}))
+            cache.set('details', params, result)
+            return result
         else:
             return {}
             
@@ -57,77 +68,14 @@ def get_business_details(place_id, api_key):
 def score_gmb_listing(business):
     """Score a business GMB listing 0-100"""
     
-    score = 0
-    issues = []
-    
-    # Basic info (25 points)
-    if business.get('name'):
-        score += 5
-    if business.get('formatted_address'):
-        score += 5
-    if business.get('formatted_phone_number'):
-        score += 5
-    else:
-        issues.append("Missing phone number")
-    if business.get('website'):
-        score += 5
-    else:
-        issues.append("Missing website")
-    if business.get('opening_hours'):
-        score += 5
-    else:
-        issues.append("Missing business hours")
-    
-    # Photos (20 points)
-    photos = business.get('photos', [])
-    if len(photos) >= 10:
-        score += 20
-    elif len(photos) >= 5:
-        score += 15
-    elif len(photos) >= 1:
-        score += 10
-    else:
-        issues.append("No photos")
-    
-    if len(photos) < 10:
-        issues.append("Need more photos")
-    
-    # Reviews (25 points)
-    rating = business.get('rating', 0)
-    review_count = business.get('user_ratings_total', 0)
-    
-    if rating >= 4.5 and review_count >= 20:
-        score += 25
-    elif rating >= 4.0 and review_count >= 10:
-        score += 20
-    elif rating >= 3.5 and review_count >= 5:
-        score += 15
-    elif review_count > 0:
-        score += 10
-    else:
-        issues.append("No reviews")
-    
-    if review_count < 10:
-        issues.append("Need more reviews")
-    
-    # Assume average for description and activity (30 points)
-    score += 15
-    
-    # Suggest package based on score
-    if score < 40:
-        package = "Premium Package (€700)"
-    elif score < 60:
-        package = "Standard Package (€400)"
-    else:
-        package = "Basic Package (€200)"
-    
+    row = score_listing(business, 'simple')
     return {
-        'score': score,
-        'issues': issues,
-        'package': package,
-        'photo_count': len(photos),
-        'rating': rating,
-        'review_count': review_count
+        'score': int(row['score']),
+        'issues': row['issues'],
+        'package': row['package'],
+        'photo_count': int(row['photo_count']),
+        'rating': business.get('rating', 0),
+        'review_count': business.get('user_ratings_total', 0)
     }
 
 def main():
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Sweep Checkpointing
+Durable record of finished search/details units so interrupted sweeps resume without re-spending quota
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+CHECKPOINT_PATH = os.getenv('SWEEP_CHECKPOINT_PATH', 'sweep_checkpoint.db')
+
+class SweepCheckpoint:
+    """Finished units of one named sweep (e.g. 'find:restaurants'), kept until the sweep completes"""
+    
+    def __init__(self, sweep: str, path: str = CHECKPOINT_PATH):
+        self.sweep = sweep
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS sweep_units (
+                sweep TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                done_at REAL NOT NULL,
+                PRIMARY KEY (sweep, unit, key)
+            )
+        ''')
+        self.conn.commit()
+    
+    def _load(self, unit: str, keys: Iterable[str]) -> Dict[str, object]:
+        keys = list(keys)
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT key, payload FROM sweep_units WHERE sweep = ? AND unit = ? AND key IN ({', '.join('?' * len(chunk))})",
+                [self.sweep, unit, *chunk]
+            )
+            found.update((key, json.loads(payload)) for key, payload in rows)
+        return found
+    
+    def _save(self, unit: str, items: Dict[str, object]):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sweep_units (sweep, unit, key, payload, done_at) VALUES (?, ?, ?, ?, ?)",
+                [(self.sweep, unit, key, json.dumps(payload), now) for key, payload in items.items()]
+            )
+    
+    def searches(self, queries: Iterable[str]) -> Dict[str, Dict]:
+        """Finished searches: query -> {'place_ids': [...], 'total': n}"""
+        return self._load('search', queries)
+    
+    def save_search(self, query: str, place_ids: List[str], total: int):
+        self._save('search', {query: {'place_ids': place_ids, 'total': total}})
+    
+    def places(self, place_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Details already fetched in this sweep: place_id -> details"""
+        return self._load('place', place_ids)
+    
+    def save_places(self, details: Dict[str, Dict]):
+        self._save('place', details)
+    
+    def finish(self):
+        """Forget the sweep once it has completed, so the next run starts fresh"""
+        with self.conn:
+            self.conn.execute("DELETE FROM sweep_units WHERE sweep = ?", (self.sweep,))
+    
+    def close(self):
+        self.conn.close()
+
+class SweepProgress:
+    """Progress line with an ETA from the rate of units finished in this run"""
+    
+    def __init__(self, label: str, total: int, done: int = 0, stream=sys.stdout):
+        self.label = label
+        self.total = total
+        self.done = done
+        self.resumed = done
+        self.started = time.monotonic()
+        self.stream = stream
+        if done:
+            self.stream.write(f"  {label}: resuming with {done}/{total} already done\n")
+    
+    def eta(self) -> Optional[float]:
+        """Seconds left at the current rate (None until something has finished)"""
+        finished = self.done - self.resumed
+        if finished <= 0:
+            return None
+        rate = finished / max(time.monotonic() - self.started, 1e-6)
+        return (self.total - self.done) / rate
+    
+    def advance(self, count: int = 1):
+        self.done += count
+        eta = self.eta()
+        eta_text = f"{int(eta // 60):02d}:{int(eta % 60):02d}" if eta is not None else "--:--"
+        percent = 100 * self.done / self.total if self.total else 100
+        self.stream.write(f"\r  {self.label}: {self.done}/{self.total} ({percent:.0f}%) ETA {eta_text}")
+        if self.done >= self.total:
+            self.stream.write("\n")
+        self.stream.flush()
+
+def chunked(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The dashboard lives at the repo root; the automation scripts import their siblings flat
+for path in (ROOT, os.path.join(ROOT, 'automation')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
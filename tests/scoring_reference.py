@@ -0,0 +1,189 @@
+"""Reference copies of the per-dict scorers the scoring engine replaced"""
+
+def finder_score(business):
+    """BerlinBusinessFinder.score_gmb_listing plus its level/package/fixes helpers"""
+    score = 0
+    details = {}
+    for field, flag in (('name', 'has_name'), ('formatted_address', 'has_address'),
+                        ('formatted_phone_number', 'has_phone'), ('website', 'has_website'),
+                        ('opening_hours', 'has_hours')):
+        if business.get(field):
+            score += 5
+            details[flag] = True
+    
+    photos = business.get('photos', [])
+    if len(photos) >= 10:
+        score += 20
+        details['sufficient_photos'] = True
+    elif len(photos) >= 5:
+        score += 15
+        details['some_photos'] = True
+    elif len(photos) >= 1:
+        score += 10
+        details['few_photos'] = True
+    
+    rating = business.get('rating', 0)
+    review_count = business.get('user_ratings_total', 0)
+    if rating >= 4.5 and review_count >= 20:
+        score += 25
+        details['excellent_reviews'] = True
+    elif rating >= 4.0 and review_count >= 10:
+        score += 20
+        details['good_reviews'] = True
+    elif rating >= 3.5 and review_count >= 5:
+        score += 15
+        details['average_reviews'] = True
+    elif review_count > 0:
+        score += 10
+        details['some_reviews'] = True
+    
+    score += 10
+    details['description_assumed'] = True
+    if business.get('reviews') or review_count:
+        score += 10
+        details['some_activity'] = True
+    
+    details['total_score'] = score
+    details['scoring_breakdown'] = {'basic_info': min(25, score), 'photos': len(photos),
+                                    'rating': rating, 'review_count': review_count}
+    
+    fixes = []
+    if not details.get('has_hours'):
+        fixes.append("Add business hours")
+    if not details.get('has_phone'):
+        fixes.append("Add phone number")
+    if not details.get('has_website'):
+        fixes.append("Add website")
+    if details.get('few_photos') or not details.get('sufficient_photos'):
+        fixes.append("Add more photos")
+    if details.get('average_reviews') or not details.get('good_reviews'):
+        fixes.append("Improve review strategy")
+    
+    if score < 40:
+        level, package = "High Opportunity", "Premium Package (€700)"
+    elif score < 60:
+        level, package = "Medium Opportunity", "Standard Package (€400)"
+    else:
+        level, package = "Low Opportunity", "Basic Touch-up (€200)"
+    return details, level, package, fixes
+
+def _basic_and_tiers(business, issues):
+    score = 0
+    if business.get('name'):
+        score += 5
+    if business.get('formatted_address'):
+        score += 5
+    for field, issue in (('formatted_phone_number', "Missing phone number"), ('website', "Missing website"),
+                         ('opening_hours', "Missing business hours")):
+        if business.get(field):
+            score += 5
+        else:
+            issues.append(issue)
+    
+    photo_count = len(business.get('photos', []))
+    if photo_count >= 10:
+        score += 20
+    elif photo_count >= 5:
+        score += 15
+    elif photo_count >= 1:
+        score += 10
+    else:
+        issues.append("No photos")
+    return score, photo_count
+
+def _review_points(rating, review_count, issues):
+    if rating >= 4.5 and review_count >= 20:
+        return 25
+    if rating >= 4.0 and review_count >= 10:
+        return 20
+    if rating >= 3.5 and review_count >= 5:
+        return 15
+    if review_count > 0:
+        return 10
+    issues.append("No reviews")
+    return 0
+
+def simple_score(business):
+    """simple_berlin_finder.score_gmb_listing"""
+    issues = []
+    score, photo_count = _basic_and_tiers(business, issues)
+    if photo_count < 10:
+        issues.append("Need more photos")
+    rating = business.get('rating', 0)
+    review_count = business.get('user_ratings_total', 0)
+    score += _review_points(rating, review_count, issues)
+    if review_count < 10:
+        issues.append("Need more reviews")
+    score += 15
+    package = ("Premium Package (€700)" if score < 40 else
+               "Standard Package (€400)" if score < 60 else "Basic Package (€200)")
+    return {'score': score, 'issues': issues, 'package': package, 'photo_count': photo_count,
+            'rating': rating, 'review_count': review_count}
+
+def opportunities_score(business):
+    """find_opportunities.score_gmb_listing"""
+    issues = []
+    score, photo_count = _basic_and_tiers(business, issues)
+    if photo_count < 8:
+        issues.append("Need more photos ({} currently)".format(photo_count))
+    rating = business.get('rating', 0)
+    review_count = business.get('user_ratings_total', 0)
+    score += _review_points(rating, review_count, issues)
+    if review_count < 10:
+        issues.append("Need more reviews ({} currently)".format(review_count))
+    score += 15
+    if score < 40:
+        package, level = "Premium Package (€700)", "HIGH"
+    elif score < 60:
+        package, level = "Standard Package (€400)", "MEDIUM"
+    else:
+        package, level = "Basic Package (€200)", "LOW"
+    return {'score': score, 'issues': issues, 'package': package, 'opportunity_level': level,
+            'photo_count': photo_count, 'rating': rating, 'review_count': review_count}
+
+def realistic_analysis(business):
+    """realistic_finder.analyze_gmb_opportunity"""
+    issues = []
+    improvements = []
+    phone = business.get('formatted_phone_number', '')
+    website = business.get('website', '')
+    hours = business.get('opening_hours', {})
+    photo_count = len(business.get('photos', []))
+    rating = business.get('rating', 0)
+    review_count = business.get('user_ratings_total', 0)
+    
+    if not phone:
+        issues.append("No phone number listed")
+        improvements.append("Add phone number")
+    if not website:
+        issues.append("No website listed")
+        improvements.append("Add website URL")
+    if not hours:
+        issues.append("Business hours not specified")
+        improvements.append("Add complete business hours")
+    if photo_count < 5:
+        issues.append("Only {} photos".format(photo_count))
+        improvements.append("Add more photos (need 10+ for best results)")
+    elif photo_count < 10:
+        improvements.append("Add more photos (currently {} - aim for 15+)".format(photo_count))
+    if review_count < 5:
+        issues.append("Only {} reviews".format(review_count))
+        improvements.append("Implement review generation strategy")
+    elif review_count < 15:
+        improvements.append("Could benefit from more reviews (currently {})".format(review_count))
+    if rating > 0 and rating < 4.0:
+        issues.append("Low rating: {} stars".format(rating))
+        improvements.append("Address review management and customer service")
+    
+    if len(issues) >= 2:
+        level, package, priority = "HIGH", "Premium Package (€700)", 1
+    elif issues or len(improvements) >= 3:
+        level, package, priority = "MEDIUM", "Standard Package (€400)", 2
+    elif improvements:
+        level, package, priority = "LOW", "Basic Optimization (€250)", 3
+    else:
+        return None
+    return {'opportunity_level': level, 'package': package, 'priority': priority, 'issues': issues,
+            'improvements': improvements, 'photo_count': photo_count, 'rating': rating,
+            'review_count': review_count, 'missing_phone': not bool(phone),
+            'missing_website': not bool(website), 'missing_hours': not bool(hours)}
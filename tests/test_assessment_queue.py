@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+from assessment_queue import AssessmentQueue, QueueWorker
+from email_automation import AssessmentEmailer
+
+SUBMISSION = {'firstName': 'Maria', 'businessName': 'Café Beispiel', 'email': 'maria@example.de',
+              'customer_acquisition': 'foot_traffic', 'tech_comfort': 'not_comfortable'}
+
+class FakeMailer:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+    
+    def send(self, message):
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.sent.append(message['To'])
+        return True
+    
+    def close(self):
+        pass
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = AssessmentQueue(str(tmp_path / 'queue.db'))
+    yield queue
+    queue.close()
+
+@pytest.fixture
+def emailer(tmp_path, monkeypatch):
+    monkeypatch.setenv('GMAIL_USER', 'sender@example.de')
+    monkeypatch.setenv('GMAIL_APP_PASSWORD', 'secret')
+    monkeypatch.chdir(tmp_path)
+    emailer = AssessmentEmailer(pool_size=2, leads_path=str(tmp_path / 'leads.db'),
+                                queue_path=str(tmp_path / 'queue.db'))
+    emailer._mailer = FakeMailer()
+    yield emailer
+    emailer.close()
+
+def statuses(queue):
+    return queue.conn.execute("SELECT status, attempts FROM assessment_jobs ORDER BY id").fetchall()
+
+def test_claim_complete_retry_and_fail_transitions(queue):
+    queue.enqueue_many([('a@example.de', {}), ('b@example.de', {}), ('c@example.de', {})])
+    jobs = queue.claim(2)
+    assert [job['recipient'] for job in jobs] == ['a@example.de', 'b@example.de']
+    assert queue.claim(5)[0]['recipient'] == 'c@example.de'
+    assert queue.claim(5) == []
+    
+    queue.complete(jobs[0]['id'])
+    queue.retry(jobs[1]['id'], 'send failed', delay=60)
+    queue.fail(jobs[1]['id'] + 1, 'send failed')
+    assert statuses(queue) == [('sent', 1), ('queued', 1), ('failed', 1)]
+    
+    # A backed-off job is not claimable until its delay has passed
+    assert queue.claim(5) == []
+    assert 50 < queue.next_ready_in() <= 60
+    assert queue.counts() == {'sent': 1, 'queued': 1, 'failed': 1}
+
+def test_requeue_stale_counts_an_attempt_and_fails_at_the_limit(queue):
+    queue.enqueue('a@example.de', {})
+    for attempt in range(1, 4):
+        queue.claim(1)
+        assert queue.requeue_stale(older_than=-1, max_attempts=3) == 1
+        assert statuses(queue) == [('queued' if attempt < 3 else 'failed', attempt)]
+    assert queue.claim(1) == []
+
+def test_worker_retries_failed_sends_with_backoff(emailer):
+    emailer._mailer = FakeMailer(failures=2)
+    emailer.enqueue_assessment('maria@example.de', SUBMISSION)
+    
+    worker = QueueWorker(emailer, emailer.queue, workers=2, max_attempts=3, backoff_base=0.01)
+    report = worker.run()
+    assert (report['sent'], report['retries'], report['failed']) == (1, 2, 0)
+    assert statuses(emailer.queue) == [('sent', 3)]
+    assert emailer.leads.count() == 1
+
+def test_worker_fails_job_after_max_attempts(emailer):
+    emailer._mailer = FakeMailer(failures=10)
+    emailer.enqueue_assessment('maria@example.de', SUBMISSION)
+    
+    report = QueueWorker(emailer, emailer.queue, workers=1, max_attempts=2, backoff_base=0.01).run()
+    assert (report['sent'], report['retries'], report['failed']) == (0, 1, 1)
+    assert statuses(emailer.queue) == [('failed', 2)]
+    assert report['latency_p50_s'] is None
+
+def test_lead_logging_failure_keeps_the_job_sent_and_the_drain_going(emailer, monkeypatch):
+    def broken_log_lead(data, content):
+        raise RuntimeError('disk full')
+    
+    monkeypatch.setattr(emailer, 'log_lead', broken_log_lead)
+    for i in range(3):
+        emailer.enqueue_assessment(f'lead{i}@example.de', SUBMISSION)
+    
+    report = QueueWorker(emailer, emailer.queue, workers=2).run()
+    assert (report['sent'], report['errors']) == (3, 3)
+    assert statuses(emailer.queue) == [('sent', 1)] * 3
+    assert emailer.queue.requeue_stale(older_than=-1) == 0
+    assert len(emailer.mailer.sent) == 3
+
+def test_lazy_resources_are_built_once_across_worker_threads(tmp_path, monkeypatch):
+    import threading
+    import email_automation
+    
+    built = []
+    
+    class SlowPool(FakeMailer):
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.05)
+            built.append(self)
+            super().__init__()
+    
+    monkeypatch.setattr(email_automation, 'SMTPDeliveryPool', SlowPool)
+    monkeypatch.chdir(tmp_path)
+    emailer = AssessmentEmailer(leads_path=str(tmp_path / 'leads.db'), queue_path=str(tmp_path / 'queue.db'))
+    
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append((emailer.mailer, emailer.leads, emailer.queue)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(built) == 1
+    assert len(set(seen)) == 1
+    emailer.close()
+
+def test_queue_summary_without_sends_has_no_latency(emailer, capsys):
+    emailer._mailer = FakeMailer(failures=10)
+    emailer.enqueue_assessment('maria@example.de', SUBMISSION)
+    emailer.process_queue(workers=1, max_attempts=1)
+    assert 'None' not in capsys.readouterr().out
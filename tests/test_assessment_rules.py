@@ -0,0 +1,91 @@
+from itertools import product
+
+from assessment_rules import OUTCOMES, answer_signature, assessment_outcome
+from email_automation import AssessmentEmailer
+
+ANSWERS = {
+    'customer_acquisition': ['foot_traffic', 'word_of_mouth', 'social_media', 'google_search', 'other', None],
+    'tech_comfort': ['very_comfortable', 'somewhat_comfortable', 'not_comfortable', 'what_is_digital', None],
+    'biggest_challenge': ['not_enough_customers', 'customers_not_spending', 'competition', 'time', None],
+    'previous_attempts': ['nothing_too_busy', 'tried_social_media', 'agency', None]
+}
+
+def reference_outcome(data):
+    """The emailer's original if/elif rules"""
+    tech, acquisition = data.get('tech_comfort', ''), data.get('customer_acquisition', '')
+    if tech == 'very_comfortable' and acquisition == 'social_media':
+        business_type = 'Digital Native'
+    elif tech == 'not_comfortable' and acquisition == 'foot_traffic':
+        business_type = 'Traditional Business'
+    else:
+        business_type = 'Hybrid Business'
+    
+    by_acquisition = {
+        'foot_traffic': ['🏪 Google My Business Profil vollständig optimieren für lokale Suchen',
+                         '📸 Instagram für visuelle Kundenbindung nutzen (Fotos von Produkten/Atmosphäre)',
+                         '⭐ Systematisches Review-Management implementieren'],
+        'word_of_mouth': ['🎁 Empfehlungsprogramm für bestehende Kunden erstellen',
+                          '⭐ Zufriedene Kunden aktiv um Google-Bewertungen bitten',
+                          '📱 WhatsApp Business für einfache Kundenkommunikation nutzen'],
+        'social_media': ['📊 Instagram/Facebook Analytics nutzen für bessere Zielgruppenansprache',
+                         '🎯 Bezahlte Social Media Werbung für lokale Zielgruppe testen',
+                         '📸 User-generated Content fördern (Kunden posten über Sie)']
+    }
+    recommendations = list(by_acquisition.get(acquisition, [
+        '🔍 Google My Business Optimierung für bessere Sichtbarkeit',
+        '📝 Lokale SEO-Strategie entwickeln',
+        '💰 Google Ads für lokale Suchanfragen testen'
+    ]))
+    if tech == 'very_comfortable':
+        recommendations.append('📊 Google Analytics einrichten für datenbasierte Entscheidungen')
+    elif tech == 'not_comfortable':
+        recommendations.append('🤝 Mit einfachen, bewährten Tools starten (WhatsApp Business, Google My Business)')
+    challenge = data.get('biggest_challenge', '')
+    if challenge == 'not_enough_customers':
+        recommendations.append('🎯 Lokale Online-Präsenz stärken (Google, Facebook, Instagram)')
+    elif challenge == 'customers_not_spending':
+        recommendations.append('💡 Upselling-Strategien entwickeln (Kombi-Angebote, Loyalty Programme)')
+    elif challenge == 'competition':
+        recommendations.append('💎 Einzigartiges Wertversprechen entwickeln und kommunizieren')
+    
+    if data.get('previous_attempts') == 'nothing_too_busy':
+        steps = ['Google My Business Profil in 30 Minuten komplett ausfüllen',
+                 'Erste 10 Fotos von Ihrem Business hochladen',
+                 'System für Kundenbewertungen einrichten']
+    else:
+        steps = ['Performance der bisherigen Maßnahmen analysieren',
+                 'Profitabelste Kanäle identifizieren und verstärken',
+                 'Konkurrenzanalyse durchführen']
+    steps += ['Kundenfeedback-System implementieren', 'Monatliche 15-Minuten Marketing-Reviews einplanen']
+    
+    score = ((challenge == 'not_enough_customers') * 3 + (data.get('previous_attempts') == 'nothing_too_busy') * 2
+             + (acquisition == 'foot_traffic') * 2 + (tech in ['not_comfortable', 'what_is_digital']))
+    level = 'HIGH' if score >= 5 else 'MEDIUM' if score >= 3 else 'LOW'
+    
+    return business_type, recommendations[:4], steps[:4], level
+
+COMBINATIONS = [
+    {field: answer for field, answer in zip(ANSWERS, answers) if answer is not None}
+    for answers in product(*ANSWERS.values())
+]
+
+def decided(data):
+    outcome = assessment_outcome(data)
+    return (outcome.business_type['type'], list(outcome.recommendations), list(outcome.next_steps),
+            outcome.priority['level'])
+
+def test_rule_table_matches_original_rules():
+    assert [data for data in COMBINATIONS if decided(data) != reference_outcome(data)] == []
+    assert len(COMBINATIONS) == 600
+
+def test_unreferenced_answers_share_a_signature():
+    assert answer_signature({'customer_acquisition': 'google_search'}) == answer_signature({})
+    assert set(map(answer_signature, COMBINATIONS)) <= set(OUTCOMES)
+
+def test_emailer_methods_return_copies():
+    emailer = AssessmentEmailer()
+    data = {'customer_acquisition': 'foot_traffic', 'tech_comfort': 'not_comfortable'}
+    emailer.generate_recommendations(data, None).clear()
+    emailer.classify_business_type(data)['type'] = 'changed'
+    assert assessment_outcome(data).recommendations
+    assert assessment_outcome(data).business_type['type'] == 'Traditional Business'
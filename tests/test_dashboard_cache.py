@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from GMB_Dashboard_Code_Framework import DATABASE_PATH, DatabaseManager
+
+DASHBOARD = os.path.join(ROOT, 'GMB_Dashboard_Code_Framework.py')
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    """AppTest for a logged-in professional client over a fresh database"""
+    monkeypatch.chdir(tmp_path)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    
+    db = DatabaseManager(DATABASE_PATH)
+    client_id = db.add_client("Test Café", "owner@test.de", "secret", "professional")
+    db.add_performance_data_bulk(
+        (client_id, (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d'), {'profile_views': 1000 + i})
+        for i in range(30)
+    )
+    db.close()
+    
+    at = AppTest.from_file(DASHBOARD, default_timeout=30)
+    at.session_state['client'] = {'id': client_id, 'business_name': "Test Café",
+                                  'subscription_tier': 'professional', 'is_active': 1}
+    yield at
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+def profile_views(at):
+    return next(metric.value for metric in at.metric if metric.label == "Profile Views")
+
+def stored_profile_views():
+    with sqlite3.connect(DATABASE_PATH) as conn:
+        return conn.execute("SELECT profile_views FROM gmb_performance ORDER BY date DESC LIMIT 1").fetchone()[0]
+
+def test_refresh_invalidates_cached_views_on_later_reruns(dashboard):
+    at = dashboard.run()
+    assert profile_views(at) == "1,000"
+    
+    next(button for button in at.button if button.label == "Refresh Data").click().run()
+    refreshed = f"{stored_profile_views():,}"
+    assert refreshed != "1,000"
+    assert profile_views(at) == refreshed
+    
+    # Reruns after the write must not fall back to the pre-refresh cache entries
+    at.selectbox[0].set_value("Last 7 days").run()
+    assert profile_views(at) == refreshed
+    at.selectbox[0].set_value("Last 30 days").run()
+    assert profile_views(at) == refreshed
+    assert not at.exception
+
+def test_long_windows_chart_rollups_but_compare_days(dashboard):
+    at = dashboard.run()
+    at.selectbox[0].set_value("Last 90 days").run()
+    
+    metric = next(metric for metric in at.metric if metric.label == "Profile Views")
+    assert (metric.value, metric.delta) == ("1,000", "-1")
+    
+    # Only the charts switch to weekly buckets: 30 days span at most 6 Mondays
+    views = json.loads(at.get('plotly_chart')[0].proto.spec)['data'][0]
+    assert 4 <= len(views['x']) <= 6
+    assert not at.exception
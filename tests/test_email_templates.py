@@ -0,0 +1,52 @@
+import html
+
+import pytest
+
+from email_templates import ASSESSMENT_HTML, ASSESSMENT_TEXT, CompiledTemplate, RenderCache
+
+VALUES = {
+    'first_name': 'Zoë <script>', 'business_name': 'Café "Eck" & Co', 'created_at': '01.02.2026 um 10:00',
+    'type_icon': '🔄', 'type_name': 'Hybrid Business', 'type_description': 'a < b',
+    'recommendations': '<li>raw</li>', 'next_steps': '<li>steps</li>', 'priority_level': 'HIGH',
+    'priority_description': 'Hohe Priorität', 'priority_recommendation': 'Jetzt & sofort'
+}
+
+def reference(source, raw=(), escape=True):
+    """str.format over the same source, escaping every non-raw value"""
+    return source.format(**{slot: value if not escape or slot in raw else html.escape(value)
+                            for slot, value in VALUES.items()})
+
+def test_render_matches_str_format_with_escaping():
+    source = "<p>{first_name}</p>{{literal}} {recommendations} {business_name}{business_name}"
+    template = CompiledTemplate(source, raw=('recommendations',))
+    assert template.render(**VALUES) == reference(source, raw=('recommendations',))
+    assert CompiledTemplate(source, escape=False).render(**VALUES) == reference(source, escape=False)
+
+def test_assessment_templates_render_every_slot():
+    html_email = ASSESSMENT_HTML.render(**VALUES)
+    assert 'Zoë &lt;script&gt;' in html_email and '<li>raw</li>' in html_email
+    assert '{' not in html_email.replace('{ ', '').replace('{\n', '')
+    assert 'Zoë <script>' in ASSESSMENT_TEXT.render(**VALUES)
+
+@pytest.mark.parametrize('template', [ASSESSMENT_HTML, ASSESSMENT_TEXT])
+def test_partial_renders_like_the_full_template(template):
+    baked = {slot: VALUES[slot] for slot in ('type_name', 'recommendations', 'priority_level')}
+    partial = template.partial(**baked)
+    assert set(partial.slots) == set(template.slots) - set(baked)
+    assert partial.render(**VALUES) == template.render(**VALUES)
+
+def test_slot_names_are_plain_keys():
+    template = CompiledTemplate("{class}-{def}-{str}-{_escape}-{unused}")
+    assert template.render(**{'class': '<a>', 'def': 1, 'str': 2, '_escape': 3, 'unused': 4}) == '&lt;a&gt;-1-2-3-4'
+    with pytest.raises(ValueError):
+        CompiledTemplate("{name:>10}")
+    with pytest.raises(ValueError):
+        CompiledTemplate("{user.name}")
+
+def test_render_cache_builds_each_key_once():
+    cache = RenderCache(max_entries=2)
+    builds = []
+    for key in ['a', 'b', 'a', 'c', 'a']:
+        cache.get(key, lambda: builds.append(key) or key)
+    assert builds == ['a', 'b', 'c', 'a']
+    assert cache.get_stats() == {'hits': 1, 'misses': 4, 'evictions': 2, 'entries': 2, 'hit_rate': 0.2}
@@ -0,0 +1,70 @@
+import json
+import threading
+
+import pytest
+
+from email_automation import AssessmentEmailer
+from lead_store import LEGACY_LEADS_FILE, LeadStore
+
+def lead(timestamp='2025-01-06T10:00:00', email='maria@example.de', **fields):
+    return dict({'timestamp': timestamp, 'first_name': 'Maria', 'email': email, 'business_name': 'Café Beispiel',
+                 'priority_level': 'HIGH', 'assessment_responses': {'tech_comfort': 'not_comfortable'}}, **fields)
+
+@pytest.fixture
+def store(tmp_path):
+    store = LeadStore(str(tmp_path / 'leads.db'))
+    yield store
+    store.close()
+
+def test_add_skips_a_lead_already_stored(store):
+    assert store.add(lead())
+    assert not store.add(lead(first_name='Changed'))
+    assert store.add(lead(timestamp='2025-01-07T10:00:00'))
+    assert store.add(lead(email='jan@example.de'))
+    assert store.count() == 3
+    
+    stored = list(store.leads())
+    assert stored[0]['first_name'] == 'Maria'
+    assert stored[0]['assessment_responses'] == {'tech_comfort': 'not_comfortable'}
+    assert [row['email'] for row in store.leads('HIGH')] == ['maria@example.de'] * 2 + ['jan@example.de']
+
+def test_add_many_counts_only_new_leads(store):
+    assert store.add_many([lead(), lead(), lead(email='jan@example.de')]) == 2
+    assert store.add_many([lead(), lead(email='eva@example.de', priority_level='LOW')]) == 1
+    assert store.count() == 3
+    assert [row['email'] for row in store.leads('LOW')] == ['eva@example.de']
+
+def test_concurrent_writers_lose_nothing(store, tmp_path):
+    other = LeadStore(str(tmp_path / 'leads.db'))
+    
+    def write(writer, worker):
+        for i in range(50):
+            writer.add(lead(timestamp=f'2025-01-06T10:{i:02d}:00', email=f'{worker}@example.de'))
+    
+    threads = [threading.Thread(target=write, args=(writer, worker))
+               for worker, writer in enumerate([store, store, other, other])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.count() == 200
+    other.close()
+
+def test_emailer_imports_the_legacy_file_once(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    legacy = [lead(), lead(), lead(email='jan@example.de')]
+    (tmp_path / LEGACY_LEADS_FILE).write_text(json.dumps(legacy), encoding='utf-8')
+    
+    def leads_in_new_emailer():
+        emailer = AssessmentEmailer(leads_path=str(tmp_path / 'leads.db'), queue_path=str(tmp_path / 'queue.db'))
+        try:
+            return emailer.leads.count()
+        finally:
+            emailer.close()
+    
+    assert leads_in_new_emailer() == 2
+    assert f"Imported 2 leads from {LEGACY_LEADS_FILE}" in capsys.readouterr().out
+    
+    # The store is no longer empty, so later emailers leave the legacy file alone
+    assert leads_in_new_emailer() == 2
+    assert "Imported" not in capsys.readouterr().out
@@ -0,0 +1,78 @@
+import pytest
+
+import listing_tracker
+import scoring_engine
+from listing_tracker import ListingTracker
+
+BASIC = {'name': 'Café', 'formatted_address': 'Berlin'}
+PLACES = {
+    'a': BASIC,                                                    # 20
+    'b': dict(BASIC, rating=4.6, user_ratings_total=25),           # 55
+    'c': {'name': 'Bar'},                                          # 15
+    'c_improved': {'name': 'Bar', 'website': 'https://bar.de', 'photos': [{}] * 10},  # 40
+    'd': BASIC                                                     # 20
+}
+
+def prospects(frame):
+    return frame['score'] <= 40
+
+@pytest.fixture
+def scored_rows(monkeypatch):
+    """Number of rows each update sent through the scoring engine"""
+    counts = []
+    
+    def score_listings(frame, profile):
+        counts.append(len(frame))
+        return scoring_engine.score_listings(frame, profile)
+    
+    monkeypatch.setattr(listing_tracker, 'score_listings', score_listings)
+    return counts
+
+def sweep(tracker, places, complete=False):
+    place_ids = [place_id.split('_')[0] for place_id in places]
+    return tracker.update(place_ids, [PLACES[place_id] for place_id in places], prospects, complete=complete)
+
+def test_only_changed_listings_are_rescored(tmp_path, scored_rows):
+    tracker = ListingTracker(str(tmp_path / 'tracker.db'))
+    frame, delta = sweep(tracker, ['a', 'b', 'c'])
+    assert list(frame['score']) == [20, 55, 15]
+    assert sorted(delta['new'].index) == ['a', 'c']
+    
+    frame, delta = sweep(tracker, ['b', 'c_improved', 'd'], complete=True)
+    assert scored_rows == [3, 2]
+    assert list(frame['score']) == [55, 40, 20]
+    assert list(delta['new'].index) == ['d']
+    assert list(delta['improved'].index) == ['c']
+    assert list(delta['dropped'].index) == ['a']
+    assert list(delta['dropped']['reason']) == ['not found']
+    tracker.close()
+
+def test_rule_changes_rescore_every_listing(tmp_path, scored_rows, monkeypatch):
+    path = str(tmp_path / 'tracker.db')
+    tracker = ListingTracker(path)
+    sweep(tracker, ['a', 'b', 'c'])
+    sweep(tracker, ['a', 'b', 'c'])
+    tracker.close()
+    assert scored_rows == [3]
+    
+    monkeypatch.setitem(scoring_engine.PROFILES['finder'], 'base_points', 40)
+    tracker = ListingTracker(path)
+    frame, delta = sweep(tracker, ['a', 'b', 'c'])
+    assert scored_rows == [3, 3]
+    assert list(frame['score']) == [50, 85, 45]
+    # Higher scores from new rules are not listing improvements, but prospects are re-judged
+    assert delta['improved'].empty
+    assert sorted(delta['dropped'].index) == ['a', 'c']
+    
+    sweep(tracker, ['a', 'b', 'c'])
+    assert scored_rows == [3, 3]
+    tracker.close()
+
+def test_profile_version_follows_rule_thresholds(monkeypatch):
+    version = scoring_engine.profile_version('simple')
+    assert scoring_engine.profile_version('simple') == version
+    
+    issues = list(scoring_engine.PROFILES['simple']['issues'])
+    issues[4] = ('Need more photos', lambda f: f['photo_count'] < 8)
+    monkeypatch.setitem(scoring_engine.PROFILES['simple'], 'issues', issues)
+    assert scoring_engine.profile_version('simple') != version
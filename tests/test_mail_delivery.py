@@ -0,0 +1,78 @@
+import socketserver
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+from mail_delivery import SMTPDeliveryPool
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: refuses some recipients and can hang up after a message"""
+    
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+    
+    def handle(self):
+        server = self.server
+        server.sessions += 1
+        self.reply('220 localhost ready')
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command.split(':')[0].split(' ')[0].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif verb == 'RCPT' and any(address in command for address in server.refused):
+                self.reply('550 No such user')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                for data in self.rfile:
+                    if data == b'.\r\n':
+                        break
+                server.delivered += 1
+                self.reply('250 OK')
+                if server.hang_up:
+                    server.hang_up = False
+                    return
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPHandler)
+    server.daemon_threads = True
+    server.sessions = server.delivered = 0
+    server.refused = set()
+    server.hang_up = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def pool(smtp_server):
+    pool = SMTPDeliveryPool('127.0.0.1', smtp_server.server_address[1], use_tls=False, timeout=5)
+    yield pool
+    pool.close()
+
+def message(recipient):
+    msg = EmailMessage()
+    msg['From'] = 'sender@example.de'
+    msg['To'] = recipient
+    msg['Subject'] = 'Test'
+    msg.set_content('Hallo')
+    return msg
+
+def test_stale_session_is_replaced_once(smtp_server, pool):
+    smtp_server.hang_up = True
+    assert pool.send_many([message('a@example.de'), message('b@example.de')]) == [True, True]
+    assert pool.get_stats() == {'sent': 2, 'failed': 0, 'connections': 2, 'reconnects': 1}
+    assert smtp_server.delivered == 2
+
+def test_refused_recipient_keeps_the_session(smtp_server, pool):
+    smtp_server.refused.add('bad@example.de')
+    assert pool.send_many([message('bad@example.de'), message('good@example.de')]) == [False, True]
+    assert pool.get_stats() == {'sent': 1, 'failed': 1, 'connections': 1, 'reconnects': 0}
+    assert smtp_server.sessions == 1
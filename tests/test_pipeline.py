@@ -0,0 +1,89 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from pipeline import CSVSink, JSONLSink, SQLiteSink, details_stage, filter_stage, run_pipeline, score_stage, search_stage
+
+SEARCHES = [('food', category, f'{category} in Berlin') for category in ('restaurant', 'cafe', 'bakery', 'bar')]
+
+class FakeClient:
+    """Three places per search; the details request for search number `fail_on` loses the connection"""
+    
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.details_calls = 0
+    
+    def iter_search(self, queries, **params):
+        for query in queries:
+            yield query, [{'place_id': f'{query.split()[0]}-{i}'} for i in range(3)]
+    
+    def details_many(self, place_ids, fields):
+        self.details_calls += 1
+        if self.details_calls == self.fail_on:
+            raise ConnectionError('connection lost')
+        return {place_id: {'name': place_id} for place_id in place_ids}
+
+class ProgressSink:
+    """Records how many details requests had been made when each batch arrived"""
+    
+    def __init__(self, client):
+        self.client = client
+        self.seen = []
+    
+    def write(self, rows):
+        self.seen.append(self.client.details_calls)
+    
+    def close(self):
+        pass
+
+def opportunity_rows(client):
+    listings = details_stage(client, search_stage(client, SEARCHES))
+    scored = filter_stage(score_stage(listings, batch_size=3), lambda row: row['score'] < 70)
+    for (group, category, place_id, details), row in scored:
+        yield {'place_id': place_id, 'category': category, 'gmb_score': int(row['score']),
+               'priority_fixes': list(row['issues'])}
+
+def sinks(tmp_path):
+    return [CSVSink(str(tmp_path / 'rows.csv')), JSONLSink(str(tmp_path / 'rows.jsonl')),
+            SQLiteSink(str(tmp_path / 'rows.db'))]
+
+def written(tmp_path):
+    with open(tmp_path / 'rows.csv', newline='', encoding='utf-8') as f:
+        csv_ids = [row['place_id'] for row in csv.DictReader(f)]
+    with open(tmp_path / 'rows.jsonl', encoding='utf-8') as f:
+        jsonl_ids = [json.loads(line)['place_id'] for line in f]
+    conn = sqlite3.connect(str(tmp_path / 'rows.db'))
+    sqlite_ids = [place_id for place_id, in conn.execute("SELECT place_id FROM opportunities ORDER BY rowid")]
+    conn.close()
+    return csv_ids, jsonl_ids, sqlite_ids
+
+def test_rows_stream_through_the_stages_into_every_sink(tmp_path):
+    client = FakeClient()
+    progress = ProgressSink(client)
+    assert run_pipeline(opportunity_rows(client), sinks(tmp_path) + [progress], batch_size=3) == 12
+    
+    expected = [f'{category}-{i}' for _, category, _ in SEARCHES for i in range(3)]
+    assert written(tmp_path) == (expected, expected, expected)
+    # Each batch is written as soon as its searches are fetched, not after the whole sweep
+    assert progress.seen == [1, 2, 3, 4]
+
+def test_rows_written_before_a_crash_survive(tmp_path):
+    with pytest.raises(ConnectionError):
+        run_pipeline(opportunity_rows(FakeClient(fail_on=3)), sinks(tmp_path), batch_size=2)
+    
+    expected = [f'{category}-{i}' for category in ('restaurant', 'cafe') for i in range(3)]
+    assert written(tmp_path) == (expected, expected, expected)
+    
+    # A rerun appends to the same files without repeating the CSV header
+    run_pipeline(opportunity_rows(FakeClient()), sinks(tmp_path), batch_size=2)
+    assert [len(ids) for ids in written(tmp_path)] == [18, 18, 18]
+
+def test_sqlite_sink_quotes_table_and_column_names(tmp_path):
+    sink = SQLiteSink(str(tmp_path / 'rows.db'), table='leads "2025"; DROP TABLE x')
+    sink.write([{'place id': 'a', 'group': 'food', 'fixes': ['Add website']}])
+    conn = sink.conn
+    assert conn.execute('SELECT "place id", "group", fixes FROM "leads ""2025""; DROP TABLE x"').fetchall() == [
+        ('a', 'food', '["Add website"]')]
+    sink.close()
@@ -0,0 +1,64 @@
+import itertools
+
+import pytest
+
+import places_cache
+from places_cache import PlacesResponseCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time.time that only moves when the test advances it (1s per call otherwise)"""
+    now = itertools.count(1_000_000)
+    state = {'offset': 0}
+    monkeypatch.setattr(places_cache.time, 'time', lambda: next(now) + state['offset'])
+    return state
+
+def open_cache(tmp_path, **kwargs):
+    return PlacesResponseCache(str(tmp_path / 'cache.db'), **kwargs)
+
+def test_ttl_expiry_is_per_endpoint(tmp_path, clock):
+    cache = open_cache(tmp_path, ttls={'textsearch': 60, 'details': 3600})
+    cache.set('textsearch', {'query': 'cafe'}, [{'place_id': 'a'}])
+    cache.set('details', {'place_id': 'a'}, {'name': 'Café'})
+    assert cache.get('textsearch', {'query': 'cafe'}) == [{'place_id': 'a'}]
+    
+    clock['offset'] += 600
+    assert cache.get('textsearch', {'query': 'cafe'}) is None
+    assert cache.get('details', {'place_id': 'a'}) == {'name': 'Café'}
+    assert cache.get_stats() == {'hits': 2, 'misses': 1, 'expired': 1, 'evictions': 0,
+                                 'entries': 1, 'hit_rate': 0.667}
+    cache.close()
+
+def test_api_key_is_not_part_of_the_key(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.set('details', {'place_id': 'a', 'key': 'one'}, {'name': 'Café'})
+    assert cache.get('details', {'place_id': 'a', 'key': 'two'}) == {'name': 'Café'}
+    assert cache.get('details', {'place_id': 'b'}) is None
+    cache.close()
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path, clock):
+    cache = open_cache(tmp_path, max_entries=3)
+    for place_id in 'abc':
+        cache.set('details', {'place_id': place_id}, {'name': place_id})
+    cache.get('details', {'place_id': 'a'})
+    cache.set('details', {'place_id': 'd'}, {'name': 'd'})
+    cache.set('details', {'place_id': 'e'}, {'name': 'e'})
+    
+    assert [place_id for place_id in 'abcde' if cache.get('details', {'place_id': place_id})] == ['a', 'd', 'e']
+    assert cache.get_stats()['evictions'] == 2
+    cache.close()
+
+def test_bound_holds_when_another_process_writes_the_file(tmp_path, clock):
+    first, second = open_cache(tmp_path, max_entries=4), open_cache(tmp_path, max_entries=4)
+    for place_id in 'abc':
+        first.set('details', {'place_id': place_id}, {})
+    for place_id in 'defgh':
+        second.set('details', {'place_id': place_id}, {})
+    
+    rows = first.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    assert rows == 4
+    assert second.get_stats()['entries'] == 4
+    # The survivors are the most recently written ones
+    assert [place_id for place_id in 'abcdefgh' if first.get('details', {'place_id': place_id}) is not None] == list('efgh')
+    first.close()
+    second.close()
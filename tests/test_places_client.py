@@ -0,0 +1,190 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+import places_client
+from places_cache import PlacesResponseCache
+from places_client import DETAILS_FIELDS, FIELD_PROFILES, PlacesClient, TokenBucket, resolve_fields
+
+class PlacesHandler(BaseHTTPRequestHandler):
+    """Answers each GET with whatever the test's `respond(endpoint, params)` returns"""
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint, params = url.path.lstrip('/'), dict(parse_qsl(url.query))
+        with self.server.lock:
+            self.server.calls.append((time.monotonic(), endpoint, params))
+        code, body = self.server.respond(endpoint, params)
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def places_api():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PlacesHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.calls = []
+    server.respond = lambda endpoint, params: (200, {'status': 'OK', 'result': {'name': params.get('place_id')}})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def api_client(places_api):
+    client = PlacesClient('test-key', base_url=f'http://127.0.0.1:{places_api.server_address[1]}',
+                          backoff_base=0, requests_per_second=1e6, max_retries=3)
+    yield client
+    client.close()
+
+def fake_client(cache):
+    client = PlacesClient('test-key', cache=cache, max_workers=2)
+    client.calls = []
+    
+    def request(endpoint, params):
+        client.calls.append((endpoint, params['fields']))
+        return {'status': 'OK', 'result': {'place_id': params['place_id'], 'name': 'Café', 'url': 'https://maps'}}
+    
+    client.request = request
+    return client
+
+def test_every_profile_shares_one_cached_details_mask():
+    assert {resolve_fields(profile) for profile in FIELD_PROFILES} == {DETAILS_FIELDS}
+    assert resolve_fields('name,reviews') == 'name,reviews'
+
+def test_scoring_run_reuses_details_fetched_for_outreach(tmp_path):
+    cache = PlacesResponseCache(str(tmp_path / 'cache.db'))
+    finder, niche = fake_client(cache), fake_client(cache)
+    
+    finder.details_many(['a', 'b'], fields='outreach')
+    details = niche.details_many(['a', 'b', 'c'], fields='scoring')
+    
+    assert set(details) == {'a', 'b', 'c'}
+    assert finder.calls == [('details/json', DETAILS_FIELDS)] * 2
+    assert niche.calls == [('details/json', DETAILS_FIELDS)]
+    finder.close()
+    niche.close()
+    cache.close()
+
+def test_transient_http_errors_are_retried_then_give_up(places_api, api_client):
+    places_api.respond = lambda endpoint, params: (503, {})
+    
+    assert api_client.request('details/json', {'place_id': 'a'}) is None
+    assert len(places_api.calls) == 4
+    assert api_client.stats == {'requests': 4, 'retries': 3, 'errors': 1, 'page_polls': 0}
+
+def test_over_query_limit_is_retried_until_it_clears(places_api, api_client):
+    answers = iter([{'status': 'OVER_QUERY_LIMIT'}] * 2 + [{'status': 'OK', 'result': {'name': 'Café'}}])
+    places_api.respond = lambda endpoint, params: (200, next(answers))
+    
+    assert api_client.details('a') == {'name': 'Café'}
+    assert api_client.stats['retries'] == 2
+    assert places_api.calls[0][2]['key'] == 'test-key'
+
+def test_non_retryable_http_error_is_not_retried(places_api, api_client):
+    places_api.respond = lambda endpoint, params: (403, {})
+    
+    assert api_client.request('details/json', {'place_id': 'a'}) is None
+    assert len(places_api.calls) == 1
+
+def test_details_tells_a_gone_place_from_a_failed_request(places_api, api_client):
+    def respond(endpoint, params):
+        if params['place_id'] == 'gone':
+            return 200, {'status': 'NOT_FOUND'}
+        if params['place_id'] == 'stale':
+            return 200, {'status': 'INVALID_REQUEST'}
+        if params['place_id'] == 'down':
+            return 500, {}
+        return 200, {'status': 'OK', 'result': {'name': params['place_id']}}
+    places_api.respond = respond
+    
+    assert api_client.details_many(['ok', 'gone', 'stale', 'down']) == {
+        'ok': {'name': 'ok'}, 'gone': {}, 'stale': {}, 'down': None}
+
+def test_concurrent_callers_stay_within_the_rate(places_api, api_client):
+    rate = 40
+    api_client.limiter = TokenBucket(rate)
+    api_client.details_many([f'p{i}' for i in range(2 * rate)])
+    
+    # The bucket allows a burst of `rate`, then refills at `rate` per second
+    times = sorted(when for when, _, _ in places_api.calls)
+    assert len(times) == 2 * rate
+    assert times[-1] - times[0] >= 0.9
+    window = 0.25
+    for i, start in enumerate(times):
+        in_window = sum(1 for when in times[i:] if when < start + window)
+        assert in_window <= rate + rate * window + 1
+
+@pytest.fixture
+def paginated_api(places_api, monkeypatch):
+    monkeypatch.setattr(places_client, 'PAGE_TOKEN_FIRST_POLL', 0.01)
+    monkeypatch.setattr(places_client, 'PAGE_TOKEN_POLL_INTERVAL', 0.01)
+    monkeypatch.setattr(places_client, 'PAGE_TOKEN_MAX_POLLS', 3)
+    
+    # query -> pages, each (place_ids, polls before its token goes live); None marks a failing page
+    pages = {
+        'cafe': [(['c0', 'c1'], 0), (['c2', 'c3'], 2), (['c4'], 0)],
+        'bar': [(['b0', 'b1'], 0), None],
+        'club': [(['k0'], 0), (['k1'], 99)],
+        'gym': []
+    }
+    tokens = {}
+    
+    def page(query, number):
+        entry = pages[query][number]
+        if entry is None:
+            return 500, {}
+        place_ids, _ = entry
+        data = {'status': 'OK', 'results': [{'place_id': place_id} for place_id in place_ids]}
+        if number + 1 < len(pages[query]):
+            token = f'{query}-{number + 1}'
+            following = pages[query][number + 1]
+            tokens[token] = [query, number + 1, following[1] if following else 0]
+            data['next_page_token'] = token
+        return 200, data
+    
+    def respond(endpoint, params):
+        if 'pagetoken' in params:
+            state = tokens[params['pagetoken']]
+            if state[2] > 0:
+                state[2] -= 1
+                return 200, {'status': 'INVALID_REQUEST'}
+            return page(state[0], state[1])
+        query = params['query']
+        return page(query, 0) if pages[query] else (200, {'status': 'ZERO_RESULTS', 'results': []})
+    
+    places_api.respond = respond
+    return places_api
+
+def test_pagination_polls_tokens_and_caches_only_complete_searches(paginated_api, api_client, tmp_path):
+    api_client.cache = PlacesResponseCache(str(tmp_path / 'cache.db'))
+    queries = ['cafe', 'bar', 'club', 'gym']
+    
+    results = dict(api_client.iter_search(queries))
+    
+    assert {query: [r['place_id'] for r in results[query]] for query in queries} == {
+        'cafe': ['c0', 'c1', 'c2', 'c3', 'c4'], 'bar': ['b0', 'b1'], 'club': ['k0'], 'gym': []}
+    assert {query: results[query].complete for query in queries} == {
+        'cafe': True, 'bar': False, 'club': False, 'gym': True}
+    # Two early polls for cafe, then club's token never goes live within the limit
+    assert api_client.stats['page_polls'] == 2 + 3
+    
+    cached = {query: api_client.cache.get('textsearch', {'query': query}) for query in queries}
+    assert cached == {'cafe': [{'place_id': f'c{i}'} for i in range(5)], 'bar': None, 'club': None, 'gym': []}
+    
+    # A rerun serves the complete searches from the cache and asks again only for the partial ones
+    paginated_api.calls.clear()
+    assert set(dict(api_client.iter_search(queries))) == set(queries)
+    assert {params['query'] for _, _, params in paginated_api.calls if 'query' in params} == {'bar', 'club'}
+    api_client.cache.close()
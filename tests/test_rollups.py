@@ -0,0 +1,54 @@
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+
+from GMB_Dashboard_Code_Framework import PERFORMANCE_METRICS, DatabaseManager
+
+def expected_rollups(conn, period):
+    """Aggregate the raw daily rows in pandas"""
+    raw = pd.read_sql_query("SELECT * FROM gmb_performance", conn, parse_dates=['date'])
+    if period == 'week':
+        start = raw['date'] - pd.to_timedelta(raw['date'].dt.weekday, unit='D')
+    else:
+        start = raw['date'].dt.to_period('M').dt.start_time
+    raw['period_start'] = start.dt.strftime('%Y-%m-%d')
+    grouped = raw.groupby(['client_id', 'period_start'])
+    frame = grouped[PERFORMANCE_METRICS].sum()
+    frame.insert(0, 'days_count', grouped.size())
+    return frame.sort_index()
+
+def stored_rollups(conn, period):
+    table = {'week': 'gmb_performance_weekly', 'month': 'gmb_performance_monthly'}[period]
+    frame = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+    return frame.set_index(['client_id', 'period_start']).sort_index()[['days_count'] + PERFORMANCE_METRICS]
+
+def test_rollups_stay_exact_through_inserts_and_overwrites(tmp_path):
+    rng = random.Random(7)
+    db = DatabaseManager(str(tmp_path / 'dashboard.db'))
+    start = date(2026, 1, 1)
+    
+    db.add_performance_data_bulk(
+        (client_id, start + timedelta(days=day), {metric: rng.randint(0, 500) for metric in PERFORMANCE_METRICS})
+        for client_id in (1, 2, 3) for day in range(120)
+    )
+    # Overwrite days across week and month boundaries, one at a time and in bulk
+    for day in (0, 6, 30, 31, 59):
+        db.add_performance_data(2, (start + timedelta(days=day)).isoformat(), {'profile_views': 1})
+    db.add_performance_data_bulk(pd.DataFrame({
+        'client_id': 3, 'date': pd.date_range('2026-02-25', periods=10), 'phone_calls': 9
+    }))
+    
+    with db.connection() as conn:
+        for period in ('week', 'month'):
+            pd.testing.assert_frame_equal(stored_rollups(conn, period), expected_rollups(conn, period),
+                                          check_dtype=False)
+    
+    db.rebuild_rollups()
+    with db.connection() as conn:
+        for period in ('week', 'month'):
+            pd.testing.assert_frame_equal(stored_rollups(conn, period), expected_rollups(conn, period),
+                                          check_dtype=False)
+    
+    assert db.get_monthly_rollup(1, '2026-02')['days_count'] == 28
+    db.close()
@@ -0,0 +1,56 @@
+import sqlite3
+
+import pytest
+
+from GMB_Dashboard_Code_Framework import (SCHEMA_MIGRATIONS, DatabaseManager, SchemaMigrator,
+                                          _migration_base_tables)
+
+def tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+
+def test_fresh_database_reaches_latest_version(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'dashboard.db'))
+    migrator = SchemaMigrator()
+    
+    assert migrator.migrate(conn) == [version for version, _, _ in SCHEMA_MIGRATIONS]
+    assert SchemaMigrator.current_version(conn) == migrator.latest_version
+    assert {'clients', 'gmb_performance', 'gmb_performance_weekly', 'gmb_performance_monthly',
+            'idx_gmb_performance_client_date'} <= tables(conn)
+    assert migrator.migrate(conn) == []
+    conn.close()
+
+def test_legacy_database_is_deduplicated_before_the_unique_index(tmp_path):
+    path = str(tmp_path / 'dashboard.db')
+    conn = sqlite3.connect(path)
+    _migration_base_tables(conn)
+    conn.executemany("INSERT INTO gmb_performance (client_id, date, profile_views) VALUES (?, ?, ?)",
+                     [(1, '2026-01-05', 10), (1, '2026-01-05', 20), (1, '2026-01-06', 30)])
+    conn.commit()
+    conn.close()
+    
+    db = DatabaseManager(path)
+    with db.connection() as conn:
+        assert SchemaMigrator.current_version(conn) == SchemaMigrator().latest_version
+        assert conn.execute("SELECT date, profile_views FROM gmb_performance ORDER BY date").fetchall() == [
+            ('2026-01-05', 20), ('2026-01-06', 30)]
+        # The backfilled rollups see the de-duplicated rows
+        assert conn.execute("SELECT profile_views FROM gmb_performance_weekly").fetchall() == [(50,)]
+    
+    # Later writes to the same day replace instead of appending
+    db.add_performance_data(1, '2026-01-05', {'profile_views': 5})
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*), SUM(profile_views) FROM gmb_performance").fetchone() == (2, 35)
+    db.close()
+
+def test_failed_migration_rolls_back_every_step(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'dashboard.db'))
+    
+    def broken(conn):
+        raise RuntimeError('boom')
+    
+    migrator = SchemaMigrator(SCHEMA_MIGRATIONS + [(99, 'broken', broken)])
+    with pytest.raises(RuntimeError):
+        migrator.migrate(conn)
+    assert SchemaMigrator.current_version(conn) == 0
+    assert 'clients' not in tables(conn)
+    conn.close()
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+import find_opportunities
+import realistic_finder
+import simple_berlin_finder
+from berlin_business_finder import BerlinBusinessFinder
+from scoring_engine import score_listings
+
+import scoring_reference
+
+def random_listing(rng):
+    listing = {}
+    for field in ('name', 'formatted_address', 'formatted_phone_number', 'website'):
+        if rng.random() < 0.7:
+            listing[field] = f'{field} value'
+    if rng.random() < 0.6:
+        listing['opening_hours'] = {'weekday_text': ['Mo: 9-18']}
+    if rng.random() < 0.9:
+        listing['photos'] = [{'photo_reference': 'x'}] * rng.choice([0, 1, 4, 5, 7, 8, 9, 10, 25])
+    if rng.random() < 0.9:
+        # Whole ratings arrive as JSON integers, as the Places API sends them
+        listing['rating'] = rng.choice([1, 3.4, 3.5, 3.9, 4, 4.2, 4.5, 5])
+    if rng.random() < 0.9:
+        listing['user_ratings_total'] = rng.choice([0, 1, 4, 5, 9, 10, 14, 15, 19, 20, 300])
+    if rng.random() < 0.1:
+        listing['reviews'] = [{'rating': 5}]
+    return listing
+
+LISTINGS = [random_listing(random.Random(seed)) for seed in range(2000)]
+
+@pytest.fixture(scope='module')
+def finder():
+    finder = BerlinBusinessFinder('test-key', cache_path=None)
+    yield finder
+    finder.client.close()
+
+def test_finder_scoring_matches_original(finder):
+    scored = score_listings(LISTINGS, 'finder')
+    for listing, row in zip(LISTINGS, scored.to_dict('records')):
+        details, level, package, fixes = scoring_reference.finder_score(listing)
+        scoring = finder.score_gmb_listing(listing)
+        assert {key: scoring[key] for key in details} == details
+        assert (finder._get_opportunity_level(details['total_score']), finder._suggest_package(scoring),
+                finder._identify_priority_fixes(scoring)) == (level, package, fixes)
+        assert (row['score'], row['opportunity_level'], row['package'], list(row['issues'])) == (
+            details['total_score'], level, package, fixes)
+
+@pytest.mark.parametrize('scorer, reference', [
+    (simple_berlin_finder.score_gmb_listing, scoring_reference.simple_score),
+    (find_opportunities.score_gmb_listing, scoring_reference.opportunities_score),
+    (realistic_finder.analyze_gmb_opportunity, scoring_reference.realistic_analysis)
+])
+def test_script_scorers_match_originals(scorer, reference):
+    assert [listing for listing in LISTINGS if scorer(listing) != reference(listing)] == []
@@ -0,0 +1,29 @@
+import importlib
+
+import streamlit as st
+
+import GMB_Dashboard_Code_Framework as dashboard
+
+def test_resources_and_metrics_survive_reruns(tmp_path):
+    st.cache_resource.clear()
+    db_path = str(tmp_path / 'dashboard.db')
+    
+    module = dashboard
+    managers = []
+    for _ in range(3):
+        # A Streamlit rerun re-executes the module; cached resources must outlive it
+        module = importlib.reload(module)
+        managers.append(module.get_database_manager(db_path))
+        module.get_gmb_collector('key')
+    
+    assert managers[0] is managers[1] is managers[2]
+    assert module.get_resource_metrics() == {'DatabaseManager': 1, 'GMBDataCollector': 1}
+    managers[0].close()
+    st.cache_resource.clear()
+
+def test_dashboard_and_automation_share_one_mail_delivery_module():
+    import sys
+    import email_automation
+    
+    assert dashboard.SMTPDeliveryPool is email_automation.SMTPDeliveryPool
+    assert [name for name in sys.modules if name.rsplit('.', 1)[-1] == 'mail_delivery'] == ['mail_delivery']
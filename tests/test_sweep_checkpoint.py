@@ -0,0 +1,119 @@
+import pytest
+
+from berlin_business_finder import BerlinBusinessFinder
+from listing_tracker import ListingTracker
+from sweep_checkpoint import SweepCheckpoint
+
+PLACES = {'restaurant': ['r1', 'r2'], 'cafe': ['c1', 'c2']}
+
+@pytest.fixture
+def finder():
+    finder = BerlinBusinessFinder('test-key', cache_path=None, requests_per_second=1e6)
+    finder.target_categories = {'restaurants': ['restaurant', 'cafe']}
+    finder.failing = set()
+    finder.requested = []
+    
+    def request(endpoint, params):
+        unit = params.get('query', '').split(' ')[0] or params.get('place_id')
+        finder.requested.append(unit)
+        if unit in finder.failing:
+            return None
+        if endpoint == 'textsearch/json':
+            return {'status': 'OK', 'results': [{'place_id': place_id} for place_id in PLACES[unit]]}
+        if unit == 'gone':
+            return {'status': 'NOT_FOUND'}
+        return {'status': 'OK', 'result': {'name': unit, 'rating': 4.0, 'user_ratings_total': 3}}
+    
+    finder.client.request = request
+    yield finder
+    finder.client.close()
+
+def test_failed_units_keep_the_checkpoint_and_are_retried(finder, tmp_path):
+    checkpoint = SweepCheckpoint('find:test', str(tmp_path / 'checkpoint.db'))
+    finder.failing = {'cafe', 'r2'}
+    
+    first = finder.find_gmb_opportunities(min_score=0, max_score=100, checkpoint=checkpoint)
+    assert finder.last_failures == 2
+    assert list(first['place_id']) == ['r1']
+    assert set(checkpoint.searches(['restaurant in Berlin, Germany', 'cafe in Berlin, Germany'])) == {
+        'restaurant in Berlin, Germany'}
+    assert set(checkpoint.places(['r1', 'r2'])) == {'r1'}
+    
+    finder.failing = set()
+    finder.requested = []
+    second = finder.find_gmb_opportunities(min_score=0, max_score=100, checkpoint=checkpoint)
+    assert finder.last_failures == 0
+    assert sorted(finder.requested) == ['c1', 'c2', 'cafe', 'r2']
+    assert sorted(second['place_id']) == ['c1', 'c2', 'r1', 'r2']
+    # Completed without failures, so the sweep is forgotten
+    assert checkpoint.searches(['restaurant in Berlin, Germany']) == {}
+    checkpoint.close()
+
+def test_fetch_details_reports_its_failures_without_touching_the_sweep_count(finder):
+    finder.failing = {'cafe', 'r2'}
+    finder.fetch_sweep(['restaurant in Berlin, Germany', 'cafe in Berlin, Germany'])
+    assert finder.last_failures == 2
+    
+    assert finder.fetch_details(['r1', 'r2']) == ({'r1': {'name': 'r1', 'rating': 4.0, 'user_ratings_total': 3}}, 1)
+    assert finder.last_failures == 2
+    
+    finder.failing = set()
+    finder.fetch_sweep(['cafe in Berlin, Germany'])
+    assert finder.last_failures == 0
+
+def test_places_that_no_longer_exist_count_as_done(finder, tmp_path):
+    PLACES['cafe'] = ['c1', 'gone']
+    try:
+        checkpoint = SweepCheckpoint('find:test', str(tmp_path / 'checkpoint.db'))
+        finder.failing = {'c1'}
+        finder.find_gmb_opportunities(min_score=0, max_score=100, checkpoint=checkpoint)
+        assert finder.last_failures == 1
+        assert checkpoint.places(['c1', 'gone']) == {'gone': {}}
+        
+        finder.failing = set()
+        finder.requested = []
+        finder.find_gmb_opportunities(min_score=0, max_score=100, checkpoint=checkpoint)
+        assert finder.requested == ['c1']
+        checkpoint.close()
+    finally:
+        PLACES['cafe'] = ['c1', 'c2']
+
+def test_failed_details_are_not_reported_as_dropped(finder, tmp_path):
+    tracker = ListingTracker(str(tmp_path / 'tracker.db'))
+    finder.find_gmb_opportunities(min_score=0, max_score=100, tracker=tracker)
+    
+    finder.failing = {'c2'}
+    finder.find_gmb_opportunities(min_score=0, max_score=100, tracker=tracker)
+    assert finder.last_delta['dropped'].empty
+    
+    finder.failing = set()
+    PLACES['cafe'] = ['c1']
+    try:
+        finder.find_gmb_opportunities(min_score=0, max_score=100, tracker=tracker)
+    finally:
+        PLACES['cafe'] = ['c1', 'c2']
+    assert list(finder.last_delta['dropped'].index) == ['c2']
+
+def test_grid_sweep_does_not_record_failed_cells(tmp_path):
+    from grid_sweep import GridSweep
+    from places_client import PlacesClient
+    
+    client = PlacesClient('test-key', requests_per_second=1e6)
+    calls = []
+    
+    def request(endpoint, params):
+        calls.append(params['location'])
+        return None if len(calls) == 1 else {'status': 'ZERO_RESULTS', 'results': []}
+    
+    client.request = request
+    checkpoint = SweepCheckpoint('grid:test', str(tmp_path / 'checkpoint.db'))
+    grid = GridSweep(client, rows=2, cols=2)
+    
+    grid.run(['cafe'], checkpoint)
+    assert grid.stats['failed'] == 1
+    assert checkpoint.conn.execute("SELECT COUNT(*) FROM sweep_units").fetchone()[0] == 3
+    
+    grid.run(['cafe'], checkpoint)
+    assert (grid.stats['failed'], len(calls)) == (0, 5)
+    checkpoint.close()
+    client.close()